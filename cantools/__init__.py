@@ -7,6 +7,7 @@ import os
 from . import tester
 from . import j1939
 from . import logreader
+from . import logformats
 from .errors import Error
 
 # Remove once less users are using the old package structure.
@@ -2,5 +2,7 @@ from .database import Database
 from .message import Message
 from .message import EncodeError
 from .message import DecodeError
+from .decode_cache import DecodeCache
 from .signal import Signal
 from .node import Node
+from .dispatch import FrameIdDispatcher
@@ -6,6 +6,7 @@ from typing import (
     Optional,
     TextIO,
     Union,
+    Iterable,
 )
 
 from .bus import Bus
@@ -17,11 +18,13 @@ from .formats.arxml import AutosarDatabaseSpecifics
 from .formats.dbc import DbcSpecifics
 from .internal_database import InternalDatabase
 from .message import Message, EncodeInputType, DecodeResultType
+from .decode_cache import DecodeCache
+from .dispatch import FrameIdDispatcher
 from .node import Node
 from ..errors import DecodeError
 from ..utils import type_sort_signals, sort_signals_by_start_bit, SORT_SIGNALS_DEFAULT
 from ...compat import fopen
-from ...typechecking import StringPathLike
+from ...typechecking import Buffer, StringPathLike
 
 LOGGER = logging.getLogger(__name__)
 
@@ -60,6 +63,9 @@ class Database(object):
         self._buses = buses or []
         self._name_to_message: Dict[str, Message] = {}
         self._frame_id_to_message: Dict[int, Message] = {}
+        self._dispatcher: FrameIdDispatcher[Message] = FrameIdDispatcher()
+        # id(message) -> (name, masked frame id) it is indexed by
+        self._message_keys: Dict[int, Tuple[str, int]] = {}
         self._version = version
         self._dbc = dbc_specifics
         self._autosar = autosar_specifics
@@ -70,6 +76,7 @@ class Database(object):
         self._frame_id_mask = frame_id_mask
         self._strict = strict
         self._sort_signals = sort_signals
+        self._decode_cache: Optional[DecodeCache] = None
         self.refresh()
 
     @property
@@ -100,6 +107,20 @@ class Database(object):
 
         return self._buses
 
+    @property
+    def decode_cache(self) -> Optional[DecodeCache]:
+        """The :class:`DecodeCache<cantools.database.can.DecodeCache>`
+        used by :meth:`.decode_message()`, or ``None`` if decoded
+        messages are not cached.
+
+        """
+
+        return self._decode_cache
+
+    @decode_cache.setter
+    def decode_cache(self, value: Optional[DecodeCache]) -> None:
+        self._decode_cache = value
+
     @property
     def version(self) -> Optional[str]:
         """The database version, or ``None`` if unavailable.
@@ -297,7 +318,8 @@ class Database(object):
 
         """
 
-        if message.name in self._name_to_message:
+        if message.name in self._name_to_message \
+           and self._name_to_message[message.name] is not message:
             LOGGER.warning("Overwriting message '%s' with '%s' in the "
                            "name to message dictionary.",
                            self._name_to_message[message.name].name,
@@ -305,7 +327,8 @@ class Database(object):
 
         masked_frame_id = (message.frame_id & self._frame_id_mask)
 
-        if masked_frame_id in self._frame_id_to_message:
+        if masked_frame_id in self._frame_id_to_message \
+           and self._frame_id_to_message[masked_frame_id] is not message:
             LOGGER.warning(
                 "Overwriting message '%s' with '%s' in the frame id to message "
                 "dictionary because they have identical masked frame ids 0x%x.",
@@ -315,6 +338,75 @@ class Database(object):
 
         self._name_to_message[message.name] = message
         self._frame_id_to_message[masked_frame_id] = message
+        self._dispatcher.add(masked_frame_id, message)
+        self._message_keys[id(message)] = (message.name, masked_frame_id)
+
+    def _remove_message_keys(self,
+                             message: Message,
+                             name: Optional[str],
+                             masked_frame_id: Optional[int]) -> None:
+        """Remove given index entries if they still refer to given message.
+
+        """
+
+        if name is not None and self._name_to_message.get(name) is message:
+            del self._name_to_message[name]
+
+        if masked_frame_id is None:
+            return
+
+        if self._frame_id_to_message.get(masked_frame_id) is message:
+            del self._frame_id_to_message[masked_frame_id]
+            self._dispatcher.remove(masked_frame_id)
+
+        if self._decode_cache is not None:
+            self._decode_cache.invalidate(masked_frame_id)
+
+    def refresh_message(self, message: Message) -> None:
+        """Refresh given message after it was modified, and update the
+        lookup tables for it only. The message is added to the database
+        if it is not part of it yet.
+
+        The new codec of the message replaces the old one at once, so
+        messages may be decoded by other threads meanwhile. Lookups of
+        the old name or frame id of a renamed message may still find it
+        until this method returns.
+
+        """
+
+        message.refresh(self._strict)
+        old_keys = self._message_keys.get(id(message))
+
+        if old_keys is None:
+            self._messages.append(message)
+
+        # Index the new keys before removing the old ones, so that the
+        # message can always be found by one of them.
+        self._add_message(message)
+
+        if self._decode_cache is not None:
+            self._decode_cache.invalidate(message.frame_id & self._frame_id_mask)
+
+        if old_keys is not None:
+            old_name, old_frame_id = old_keys
+            name, frame_id = self._message_keys[id(message)]
+            self._remove_message_keys(message,
+                                      old_name if old_name != name else None,
+                                      old_frame_id if old_frame_id != frame_id else None)
+
+    def remove_message(self, message: Message) -> None:
+        """Remove given message from the database and its lookup tables.
+
+        """
+
+        old_keys = self._message_keys.pop(id(message), None)
+
+        if old_keys is None:
+            raise ValueError(f"Message '{message.name}' is not part of the "
+                             f"database.")
+
+        self._messages.remove(message)
+        self._remove_message_keys(message, *old_keys)
 
     def as_dbc_string(self, *, sort_signals:type_sort_signals=SORT_SIGNALS_DEFAULT) -> str:
         """Return the database as a string formatted as a DBC file.
@@ -356,7 +448,18 @@ class Database(object):
 
         """
 
-        return self._frame_id_to_message[frame_id & self._frame_id_mask]
+        return self._dispatcher[frame_id & self._frame_id_mask]
+
+    def get_message_slot(self, frame_id: int) -> int:
+        """Returns a small integer identifying the message of given frame
+        id `frame_id` (after applying the frame id mask), or -1 if there
+        is no such message. Slots are numbered from 0 in the order the
+        messages were added, and stay the same until the next
+        :meth:`.refresh()`.
+
+        """
+
+        return self._dispatcher.slot(frame_id & self._frame_id_mask)
 
     def get_node_by_name(self, name: str) -> Node:
         """Find the node object for given name `name`.
@@ -408,7 +511,7 @@ class Database(object):
         """
 
         if isinstance(frame_id_or_name, int):
-            message = self._frame_id_to_message[frame_id_or_name]
+            message = self._dispatcher[frame_id_or_name]
         elif isinstance(frame_id_or_name, str):
             message = self._name_to_message[frame_id_or_name]
         else:
@@ -418,10 +521,11 @@ class Database(object):
 
     def decode_message(self,
                        frame_id_or_name: Union[int, str],
-                       data: bytes,
+                       data: Buffer,
                        decode_choices: bool = True,
                        scaling: bool = True,
-                       decode_containers: bool = False
+                       decode_containers: bool = False,
+                       signals: Optional[Iterable[str]] = None
                        ) \
         -> DecodeResultType:
 
@@ -446,15 +550,37 @@ class Database(object):
         expect this to misbehave. Trying to decode a container message
         with `decode_containers` set to ``False`` will raise a
         `DecodeError`.
+
+        If `signals` is given only these signals are decoded, see
+        :meth:`Message.decode()<cantools.database.can.Message.decode()>`.
+        It is ignored for container frames.
+
+        If :attr:`.decode_cache` is set, recently decoded payloads are
+        taken from the cache.
         """
 
         if isinstance(frame_id_or_name, int):
-            message = self._frame_id_to_message[frame_id_or_name]
+            message = self._dispatcher[frame_id_or_name]
         elif isinstance(frame_id_or_name, str):
             message = self._name_to_message[frame_id_or_name]
         else:
             raise ValueError(f"Invalid frame_id_or_name '{frame_id_or_name}'")
 
+        if self._decode_cache is not None:
+            if message.is_container and not decode_containers:
+                raise DecodeError(f'Message "{message.name}" is a container '
+                                  f'message, but decoding such messages has '
+                                  f'not been enabled!')
+
+            # Keyed as refresh_message() and remove_message() invalidate.
+            return self._decode_cache.decode(message,
+                                             data,
+                                             decode_choices,
+                                             scaling,
+                                             decode_containers,
+                                             None if message.is_container else signals,
+                                             message.frame_id & self._frame_id_mask)
+
         if message.is_container:
             if decode_containers:
                 return message.decode(data,
@@ -466,7 +592,24 @@ class Database(object):
                                   f'message, but decoding such messages has '
                                   f'not been enabled!')
 
-        return message.decode(data, decode_choices, scaling)
+        return message.decode(data,
+                              decode_choices,
+                              scaling,
+                              signals=signals)
+
+    def generate_decoders(self, enabled: bool = True) -> None:
+        """Decode all messages with generated, layout specific Python
+        functions. See :meth:`Message.generate_decoders()
+        <cantools.database.can.Message.generate_decoders()>`.
+
+        """
+
+        for message in self._messages:
+            message.generate_decoders(enabled)
+
+            if message.contained_messages is not None:
+                for contained_message in message.contained_messages:
+                    contained_message.generate_decoders(enabled)
 
     def refresh(self) -> None:
         """Refresh the internal database state.
@@ -479,11 +622,16 @@ class Database(object):
 
         self._name_to_message = {}
         self._frame_id_to_message = {}
+        self._dispatcher.clear()
+        self._message_keys = {}
 
         for message in self._messages:
             message.refresh(self._strict)
             self._add_message(message)
 
+        if self._decode_cache is not None:
+            self._decode_cache.clear()
+
     def __repr__(self) -> str:
         lines = ["version('{}')".format(self._version), '']
 
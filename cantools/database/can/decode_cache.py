@@ -0,0 +1,201 @@
+"""Memoization of decoded messages, keyed by payload.
+
+Most frames on a bus repeat the payload of the previous frame with the
+same frame id for long stretches (status frames, configuration frames,
+...). A :class:`DecodeCache` remembers the decoded signals of the most
+recently seen payloads of each message, so that those frames are not
+decoded again.
+
+"""
+
+from collections import OrderedDict
+from typing import Dict, Hashable, Iterable, Optional, Tuple
+
+from .message import Message, DecodeResultType
+
+
+CacheKey = Tuple[bytes, bool, bool, bool, Optional[Hashable]]
+
+
+class DecodeCache:
+    """A least recently used cache of decoded payloads, with at most
+    `capacity` entries per frame id. Use :meth:`set_capacity()` to
+    give individual messages a different capacity, a capacity of 0
+    disables caching of that message.
+
+    Decode errors are not cached, the payload is decoded again (and
+    the error raised again) the next time it is seen.
+
+    The cache is keyed by frame id, so it must not be shared between
+    databases with different messages for the same frame id.
+
+    >>> cache = cantools.database.can.DecodeCache(16)
+    >>> db.decode_cache = cache
+    >>> db.decode_message(158, b'\\x01\\x45\\x23\\x00\\x11')
+    {'Bar': 1, 'Fum': 5.0}
+    >>> cache.hits, cache.misses
+    (0, 1)
+
+    """
+
+    def __init__(self, capacity: int = 16) -> None:
+        if capacity < 0:
+            raise ValueError(f'Invalid capacity {capacity}.')
+
+        self._capacity = capacity
+        self._capacities: Dict[int, int] = {}
+        self._entries: Dict[int, 'OrderedDict[CacheKey, DecodeResultType]'] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def capacity(self) -> int:
+        """The default number of cached payloads per frame id.
+
+        """
+
+        return self._capacity
+
+    def set_capacity(self, frame_id: int, capacity: Optional[int]) -> None:
+        """Set the number of cached payloads of given frame id. ``None``
+        restores the default capacity.
+
+        """
+
+        if capacity is None:
+            self._capacities.pop(frame_id, None)
+        elif capacity < 0:
+            raise ValueError(f'Invalid capacity {capacity}.')
+        else:
+            self._capacities[frame_id] = capacity
+
+        entries = self._entries.get(frame_id)
+
+        if entries is not None:
+            self._trim(entries, self._capacities.get(frame_id, self._capacity))
+
+    def _trim(self,
+              entries: 'OrderedDict[CacheKey, DecodeResultType]',
+              capacity: int) -> None:
+        while len(entries) > capacity:
+            entries.popitem(last=False)
+            self.evictions += 1
+
+    def decode(self,
+               message: Message,
+               data: bytes,
+               decode_choices: bool = True,
+               scaling: bool = True,
+               decode_containers: bool = False,
+               signals: Optional[Iterable[str]] = None,
+               frame_id: Optional[int] = None) -> DecodeResultType:
+        """Decode given data as given message, see
+        :meth:`Message.decode()<cantools.database.can.Message.decode()>`.
+        The result is taken from the cache if the same payload was
+        recently decoded with the same options.
+
+        `frame_id` is the key the payloads of the message are cached
+        (and invalidated) by, by default the frame id of the message. A
+        :class:`Database<cantools.database.can.Database>` passes the
+        frame id masked with its frame id mask.
+
+        """
+
+        if frame_id is None:
+            frame_id = message.frame_id
+
+        capacity = self._capacities.get(frame_id, self._capacity)
+
+        if capacity == 0:
+            self.misses += 1
+
+            return message.decode(data,
+                                  decode_choices,
+                                  scaling,
+                                  decode_containers,
+                                  signals)
+
+        if signals is not None and not isinstance(signals, frozenset):
+            signals = frozenset(signals)
+
+        key = (bytes(data), decode_choices, scaling, decode_containers, signals)
+
+        try:
+            entries = self._entries[frame_id]
+        except KeyError:
+            entries = OrderedDict()
+            self._entries[frame_id] = entries
+
+        try:
+            decoded = entries[key]
+        except KeyError:
+            self.misses += 1
+            decoded = message.decode(data,
+                                     decode_choices,
+                                     scaling,
+                                     decode_containers,
+                                     signals)
+            entries[key] = decoded
+            self._trim(entries, capacity)
+        else:
+            self.hits += 1
+            entries.move_to_end(key)
+
+        # Callers may modify the result, so never hand out the cached
+        # objects.
+        if isinstance(decoded, dict):
+            return dict(decoded)
+
+        return [
+            (contained_message, dict(contained_data))
+            if isinstance(contained_data, dict)
+            else (contained_message, contained_data)
+            for contained_message, contained_data in decoded
+        ]
+
+    def invalidate(self, frame_id: int) -> None:
+        """Drop all cached payloads of given frame id, for example after
+        the message was modified.
+
+        """
+
+        self._entries.pop(frame_id, None)
+
+    def clear(self) -> None:
+        """Drop all cached payloads. The counters are kept.
+
+        """
+
+        self._entries = {}
+
+    def reset_counters(self) -> None:
+        """Reset the hit, miss and eviction counters.
+
+        """
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        """The fraction of decodes served from the cache.
+
+        """
+
+        total = self.hits + self.misses
+
+        if total == 0:
+            return 0.0
+
+        return self.hits / total
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._entries.values())
+
+    def __repr__(self) -> str:
+        return (f'DecodeCache(capacity={self._capacity}, '
+                f'entries={len(self)}, '
+                f'hits={self.hits}, '
+                f'misses={self.misses})')
@@ -0,0 +1,124 @@
+"""Frame id to slot dispatching.
+
+Standard (11-bit) frame ids are looked up in a 2048 entry list, other
+frame ids in a dictionary. Each distinct frame id gets a slot, an index
+into :attr:`FrameIdDispatcher.values`, which can also be used to index
+other tables kept by the caller.
+
+"""
+
+from typing import Dict, Generic, Iterator, List, Optional, TypeVar
+
+
+T = TypeVar('T')
+
+STANDARD_FRAME_IDS = 2048
+
+
+class FrameIdDispatcher(Generic[T]):
+    """Maps frame ids to slots and values.
+
+    >>> dispatcher = FrameIdDispatcher()
+    >>> dispatcher.add(0x123, 'Foo')
+    0
+    >>> dispatcher.slot(0x123), dispatcher.slot(0x124)
+    (0, -1)
+    >>> dispatcher[0x123]
+    'Foo'
+
+    """
+
+    def __init__(self) -> None:
+        self._standard: List[int] = STANDARD_FRAME_IDS * [-1]
+        self._extended: Dict[int, int] = {}
+        self.frame_ids: List[int] = []
+        self.values: List[T] = []
+        self._count = 0
+
+    def add(self, frame_id: int, value: T) -> int:
+        """Map given frame id to given value and return its slot. A frame
+        id which is already mapped keeps its slot.
+
+        """
+
+        slot = self.slot(frame_id)
+
+        if slot != -1:
+            self.values[slot] = value
+
+            return slot
+
+        slot = len(self.values)
+        self._count += 1
+        self.frame_ids.append(frame_id)
+        self.values.append(value)
+
+        if 0 <= frame_id < STANDARD_FRAME_IDS:
+            self._standard[frame_id] = slot
+        else:
+            self._extended[frame_id] = slot
+
+        return slot
+
+    def remove(self, frame_id: int) -> None:
+        """Unmap given frame id. Its slot is not reused, the value in it
+        is set to ``None``.
+
+        """
+
+        slot = self.slot(frame_id)
+
+        if slot == -1:
+            raise KeyError(frame_id)
+
+        if 0 <= frame_id < STANDARD_FRAME_IDS:
+            self._standard[frame_id] = -1
+        else:
+            del self._extended[frame_id]
+
+        self.values[slot] = None  # type: ignore
+        self._count -= 1
+
+    def slot(self, frame_id: int) -> int:
+        """Returns the slot of given frame id, or -1 if it is not mapped.
+
+        """
+
+        if 0 <= frame_id < STANDARD_FRAME_IDS:
+            return self._standard[frame_id]
+
+        return self._extended.get(frame_id, -1)
+
+    def get(self, frame_id: int, default: Optional[T] = None) -> Optional[T]:
+        slot = self.slot(frame_id)
+
+        if slot == -1:
+            return default
+
+        return self.values[slot]
+
+    def clear(self) -> None:
+        self._standard = STANDARD_FRAME_IDS * [-1]
+        self._extended = {}
+        self.frame_ids = []
+        self.values = []
+        self._count = 0
+
+    def __getitem__(self, frame_id: int) -> T:
+        slot = self.slot(frame_id)
+
+        if slot == -1:
+            raise KeyError(frame_id)
+
+        return self.values[slot]
+
+    def __contains__(self, frame_id: int) -> bool:
+        return self.slot(frame_id) != -1
+
+    def __iter__(self) -> Iterator[int]:
+        return (frame_id
+                for slot, frame_id in enumerate(self.frame_ids)
+                if self.slot(frame_id) == slot)
+
+    def __len__(self) -> int:
+        return self._count
@@ -1,6 +1,5 @@
 # A CAN message.
 
-import binascii
 import logging
 from copy import deepcopy
 from re import S
@@ -12,11 +11,14 @@ from typing import (
     Union,
     Dict,
     TYPE_CHECKING,
-    Set
+    Set,
+    FrozenSet,
+    Iterable
 )
 
 from .signal import NamedSignalValue, Signal
 from .signal_group import SignalGroup
+from .python_source import generate_decoder, layout_matches_bitstruct
 from ..utils import format_or
 from ..utils import start_bit
 from ..utils import encode_data
@@ -28,7 +30,7 @@ from ..utils import SORT_SIGNALS_DEFAULT
 from ..errors import Error
 from ..errors import EncodeError
 from ..errors import DecodeError
-from ...typechecking import Comments, Codec
+from ...typechecking import Buffer, Comments, Codec
 
 if TYPE_CHECKING:
     from .formats.arxml import AutosarMessageSpecifics
@@ -53,6 +55,11 @@ ContainerEncodeInputType = Sequence[Tuple[ContainerHeaderSpecType,
                                           Union[bytes, SignalDictType]]]
 DecodeResultType = Union[SignalDictType, ContainerDecodeResultType]
 EncodeInputType = Union[SignalDictType, ContainerEncodeInputType]
+SubsetCodec = Tuple[Codec, Tuple[str, ...]]
+# Multiplexer name -> (big endian, shift, mask) of its raw value.
+MuxSelectors = Dict[str, Tuple[bool, int, int]]
+# Codecs, selectors and a table of mux value paths to flattened codecs.
+FlatMux = Tuple[Codec, MuxSelectors, Dict[Tuple[int, ...], Optional[Codec]]]
 
 class Message(object):
     """A CAN message with frame id, comment, signals and other
@@ -147,6 +154,10 @@ class Message(object):
         self._signal_tree = None
         self._strict = strict
         self._protocol = protocol
+        self._use_generated_decoders = False
+        self._subset_codecs: Dict[FrozenSet[str], SubsetCodec] = {}
+        self._flat_mux: Optional[FlatMux] = None
+        self._contained_index: Optional[Dict[int, Optional['Message']]] = None
         self.refresh()
 
     def _create_codec(self,
@@ -207,9 +218,313 @@ class Message(object):
             'signals': signals,
             'formats': create_encode_decode_formats(signals,
                                                     self._length),
-            'multiplexers': multiplexers
+            'multiplexers': multiplexers,
+            'decoder': None
         }
 
+    def _generate_decoders(self, node: Codec) -> None:
+        """Generate specialised decode functions for given codec and all
+        its multiplexed children. This is a recursive function.
+
+        """
+
+        def fallback(data, decode_choices, scaling):
+            return decode_data(data,
+                               node['signals'],
+                               node['formats'],
+                               decode_choices,
+                               scaling)
+
+        try:
+            node['decoder'] = generate_decoder(node['signals'],
+                                               self._length,
+                                               fallback)
+        except Exception as e:
+            LOGGER.debug('Failed to generate a decoder for message %s: %s',
+                         self._name,
+                         e)
+            node['decoder'] = None
+
+        for mux_codecs in node['multiplexers'].values():
+            for mux_codec in mux_codecs.values():
+                if mux_codec is not None:
+                    self._generate_decoders(mux_codec)
+
+    def _create_subset_codec(self,
+                             node: Codec,
+                             names: FrozenSet[str]) -> Optional[Codec]:
+        """Create a copy of given codec which only holds the signals in
+        `names` and the multiplexers. Returns ``None`` if no signal in
+        `names` is part of the codec and it has no multiplexers. This is
+        a recursive function.
+
+        All multiplexers are kept, also in branches without requested
+        signals, so that unknown multiplexer ids at any level raise the
+        same :class:`DecodeError` as a full decode.
+
+        """
+
+        multiplexers: Dict[str, Dict[int, Optional[Codec]]] = {}
+
+        for mux_name, mux_codecs in node['multiplexers'].items():
+            multiplexers[mux_name] = {
+                mux_id: self._create_subset_codec(mux_codec, names)
+                for mux_id, mux_codec in mux_codecs.items()
+            }
+
+        signals = [
+            signal for signal in node['signals']
+            if signal.name in names or signal.name in multiplexers
+        ]
+
+        if not multiplexers and not signals:
+            return None
+
+        return {
+            'signals': signals,
+            'formats': create_encode_decode_formats(signals,
+                                                    self._length),
+            'multiplexers': multiplexers,  # type: ignore
+            'decoder': None
+        }
+
+    def _get_subset_codec(self, names: FrozenSet[str]) -> SubsetCodec:
+        codecs = self._codecs
+        subset_codecs = self._subset_codecs
+
+        try:
+            return subset_codecs[names]
+        except KeyError:
+            pass
+
+        if codecs is None:
+            raise ValueError('Codec is not initialized.')
+
+        codec = self._create_subset_codec(codecs, names)
+
+        if codec is None:
+            # Not multiplexed and none of the requested signals are part
+            # of this message.
+            codec = {
+                'signals': [],
+                'formats': create_encode_decode_formats([], self._length),
+                'multiplexers': {},
+                'decoder': None
+            }
+
+        if self._use_generated_decoders:
+            self._generate_decoders(codec)
+
+        # Multiplexers which were not requested are removed from the
+        # result.
+        unwanted = []
+        nodes = [codec]
+
+        while nodes:
+            node = nodes.pop()
+
+            for mux_name, mux_codecs in node['multiplexers'].items():
+                if mux_name not in names:
+                    unwanted.append(mux_name)
+
+                nodes.extend(mux_codec
+                             for mux_codec in mux_codecs.values()
+                             if mux_codec is not None)
+
+        subset = (codec, tuple(unwanted))
+
+        # Do not cache subsets of a codec replaced by refresh() meanwhile.
+        if codecs is self._codecs:
+            subset_codecs[names] = subset
+
+        return subset
+
+    def _create_flat_mux(self, codecs: Codec) -> Optional[FlatMux]:
+        """Prepare decoding of multiplexed messages through flattened
+        codecs, see :meth:`_decode_flat()`. Returns ``None`` if the
+        message is not multiplexed or if its multiplexers cannot be
+        selected by their raw values.
+
+        """
+
+        if not codecs['multiplexers']:
+            return None
+
+        selectors: MuxSelectors = {}
+
+        for signal in self._signals:
+            if not signal.is_multiplexer:
+                continue
+
+            # The multiplexer id is the scaled value.
+            if signal.is_float \
+               or signal.is_signed \
+               or signal.scale != 1 \
+               or signal.offset != 0:
+                return None
+
+            if signal.byte_order == 'big_endian':
+                shift = 8 * self._length - start_bit(signal) - signal.length
+                selectors[signal.name] = (True, shift, (1 << signal.length) - 1)
+            else:
+                shift = signal.start
+                selectors[signal.name] = (False, shift, (1 << signal.length) - 1)
+
+            if shift < 0:
+                return None
+
+        return (codecs, selectors, {})
+
+    def _select_mux_path(self,
+                         node: Codec,
+                         selectors: MuxSelectors,
+                         big: int,
+                         little: int,
+                         path: List[int],
+                         nodes: List[Codec]) -> bool:
+        """Collect the codecs selected by the raw multiplexer values, in
+        the order :meth:`_decode()` visits them. Returns ``False`` for an
+        unknown multiplexer id. This is a recursive function.
+
+        """
+
+        nodes.append(node)
+
+        for signal, mux_codecs in node['multiplexers'].items():
+            is_big, shift, mask = selectors[signal]
+            mux = ((big if is_big else little) >> shift) & mask
+            path.append(mux)
+
+            try:
+                node = mux_codecs[mux]
+            except KeyError:
+                return False
+
+            if not self._select_mux_path(node,
+                                         selectors,
+                                         big,
+                                         little,
+                                         path,
+                                         nodes):
+                return False
+
+        return True
+
+    def _create_flat_codec(self, nodes: List[Codec]) -> Optional[Codec]:
+        """Create a codec of all signals of given codecs, or ``None`` if
+        they do not form a valid layout together.
+
+        """
+
+        # The result keeps the order of _decode(), while the formats
+        # need the signals sorted by start bit.
+        signals = [signal for node in nodes for signal in node['signals']]
+        layout_signals = sort_signals_by_start_bit(signals)
+
+        if not layout_matches_bitstruct(layout_signals, self._length):
+            return None
+
+        codec: Codec = {
+            'signals': signals,
+            'formats': create_encode_decode_formats(layout_signals,
+                                                    self._length),
+            'multiplexers': {},
+            'decoder': None
+        }
+
+        if self._use_generated_decoders:
+            def fallback(data, decode_choices, scaling):
+                return decode_data(data,
+                                   signals,
+                                   codec['formats'],
+                                   decode_choices,
+                                   scaling)
+
+            try:
+                codec['decoder'] = generate_decoder(signals,
+                                                    self._length,
+                                                    fallback,
+                                                    layout_signals)
+            except Exception as e:
+                LOGGER.debug('Failed to generate a decoder for message %s: %s',
+                             self._name,
+                             e)
+
+        return codec
+
+    def _decode_flat(self,
+                     flat_mux: FlatMux,
+                     data: Buffer,
+                     decode_choices: bool,
+                     scaling: bool) -> Optional[SignalDictType]:
+        """Decode a multiplexed message with a single codec holding all
+        signals selected by its multiplexer values. Returns ``None`` if
+        the generic decoder must be used instead.
+
+        """
+
+        codecs, selectors, table = flat_mux
+
+        if len(data) != self._length:
+            return None
+
+        path: List[int] = []
+        nodes: List[Codec] = []
+
+        if not self._select_mux_path(codecs,
+                                     selectors,
+                                     int.from_bytes(data, 'big'),
+                                     int.from_bytes(data, 'little'),
+                                     path,
+                                     nodes):
+            return None
+
+        key = tuple(path)
+
+        try:
+            codec = table[key]
+        except KeyError:
+            codec = self._create_flat_codec(nodes)
+            table[key] = codec
+
+        if codec is None:
+            return None
+
+        decoder = codec['decoder']
+
+        if decoder is not None:
+            return decoder(data, decode_choices, scaling)
+
+        return decode_data(data,
+                           codec['signals'],
+                           codec['formats'],
+                           decode_choices,
+                           scaling)
+
+    def _create_contained_index(self) -> Optional[Dict[int, Optional['Message']]]:
+        """Map the header ids of the contained messages to the messages.
+        Ambiguous header ids are mapped to ``None``.
+
+        """
+
+        if self._contained_messages is None:
+            return None
+
+        index: Dict[int, Optional[Message]] = {}
+
+        for contained_message in self._contained_messages:
+            header_id = contained_message.header_id
+
+            if header_id is None:
+                continue
+
+            if header_id in index:
+                index[header_id] = None
+            else:
+                index[header_id] = contained_message
+
+        return index
+
     def _create_signal_tree(self, codec):
         """Create a multiplexing tree node of given codec. This is a recursive
         function.
@@ -962,21 +1277,23 @@ class Message(object):
             encoded &= ~padding_mask
             encoded |= padding_mask & padding_pattern
 
-        encoded |= (0x80 << (8 * self._length))
-        encoded = hex(encoded)[4:].rstrip('L')
-
-        return binascii.unhexlify(encoded)[:self._length]
+        return encoded.to_bytes(self._length, 'big')
 
     def _decode(self,
                 node: Codec,
-                data: bytes,
+                data: Buffer,
                 decode_choices: bool,
                 scaling: bool) -> SignalDictType:
-        decoded = decode_data(data,
-                              node['signals'],
-                              node['formats'],
-                              decode_choices,
-                              scaling)
+        decoder = node['decoder']
+
+        if decoder is not None:
+            decoded = decoder(data, decode_choices, scaling)
+        else:
+            decoded = decode_data(data,
+                                  node['signals'],
+                                  node['formats'],
+                                  decode_choices,
+                                  scaling)
 
         multiplexers = node['multiplexers']
 
@@ -990,6 +1307,10 @@ class Message(object):
                     format_or(multiplexers[signal]),
                     mux))
 
+            if node is None:
+                # No requested signals in this branch of a subset codec.
+                continue
+
             decoded.update(self._decode(node,
                                         data,
                                         decode_choices,
@@ -997,35 +1318,34 @@ class Message(object):
 
         return decoded
 
-    def unpack_container(self,
-                          data: bytes) \
-                          -> ContainerUnpackResultType:
-        """Unwrap the contents of a container message.
-
-        This returns a list of ``(contained_message, contained_data)``
-        tuples, i.e., the data for the contained message are ``bytes``
-        objects, not decoded signal dictionaries. This is required for
-        verifying the correctness of the end-to-end protection or the
-        authenticity of a contained message.
+    def _walk_container(self,
+                        data: Buffer) \
+                        -> List[Tuple[Union['Message', int], memoryview]]:
+        """Split a container payload into ``(contained_message,
+        contained_data)`` tuples without copying, the data are
+        ``memoryview`` slices of `data`. ``contained_message`` is the
+        header id if the contained message is unknown.
 
-        Note that ``contained_message`` is the header ID integer value
-        if a contained message is unknown. Further, if something goes
-        seriously wrong, a ``DecodeError`` is raised.
         """
 
         if not self.is_container:
             raise DecodeError(f'Cannot unpack non-container message '
                               f'"{self.name}"')
 
-        if len(data) > self.length:
+        view = memoryview(data)
+        end = len(view)
+
+        if end > self.length:
             raise DecodeError(f'Container message "{self.name}" specified '
                               f'as exhibiting at most {self.length} but '
-                              f'received a {len(data)} bytes long frame')
+                              f'received a {end} bytes long frame')
 
-        result: ContainerUnpackListType = []
+        index = self._contained_index
+        result: List[Tuple[Union['Message', int], memoryview]] = []
         pos = 0
-        while pos < len(data):
-            if pos + 4 > len(data):
+
+        while pos < end:
+            if pos + 4 > end:
                 # TODO: better throw an exception? only warn in strict mode?
                 LOGGER.info(f'Malformed container message '
                             f'"{self.name}" encountered while decoding: '
@@ -1034,55 +1354,105 @@ class Message(object):
                             f'{pos}. Ignoring.')
                 return result
 
-            contained_id = int.from_bytes(data[pos:pos+3], 'big')
-            contained_len = data[pos+3]
+            contained_id = int.from_bytes(view[pos:pos+3], 'big')
+            contained_len = view[pos+3]
 
-            if pos + contained_len > len(data):
+            if pos + contained_len > end:
                 raise DecodeError(f'Malformed container message '
                                   f'"{self.name}": Contained message #'
                                   f'{len(result)+1} would exceed total message '
                                   f'size.')
 
-
-            contained_data = data[pos+4:pos+4+contained_len]
-            contained_msg = \
-                self.get_contained_message_by_header_id(contained_id)
+            contained_data = view[pos+4:pos+4+contained_len]
             pos += 4+contained_len
 
-            if contained_msg is None:
+            try:
+                contained_msg = index[contained_id]  # type: ignore
+            except KeyError:
                 result.append((contained_id, contained_data))
-            else:
-                result.append((contained_msg, contained_data))
+                continue
+
+            if contained_msg is None:
+                # Ambiguous header id, raise the usual error.
+                self.get_contained_message_by_header_id(contained_id)
+
+            result.append((contained_msg, contained_data))
 
         return result
 
+    def unpack_container(self,
+                          data: bytes) \
+                          -> ContainerUnpackResultType:
+        """Unwrap the contents of a container message.
+
+        This returns a list of ``(contained_message, contained_data)``
+        tuples, i.e., the data for the contained message are ``bytes``
+        objects, not decoded signal dictionaries. This is required for
+        verifying the correctness of the end-to-end protection or the
+        authenticity of a contained message.
+
+        Note that ``contained_message`` is the header ID integer value
+        if a contained message is unknown. Further, if something goes
+        seriously wrong, a ``DecodeError`` is raised.
+        """
+
+        return [
+            (contained_message, contained_data.tobytes())
+            for contained_message, contained_data in self._walk_container(data)
+        ]
+
     def _decode_contained(self,
                           data: bytes,
                           decode_choices: bool,
                           scaling: bool) \
                           -> ContainerDecodeResultType:
 
-        unpacked = self.unpack_container(data)
-
         result: ContainerDecodeResultListType = []
 
-        for contained_message, contained_data in unpacked:
+        for contained_message, contained_data in self._walk_container(data):
             if not isinstance(contained_message, Message):
-                result.append((contained_message, contained_data))
+                result.append((contained_message, contained_data.tobytes())) # type: ignore
                 continue
 
-            decoded = contained_message.decode(contained_data,
+            decoded = contained_message.decode(contained_data,  # type: ignore
                                                decode_choices,
                                                scaling)
             result.append((contained_message, decoded)) # type: ignore
 
         return result
 
+    def decode_container_frames(self,
+                                frames: Iterable[bytes],
+                                decode_choices: bool = True,
+                                scaling: bool = True) \
+                                -> List[ContainerDecodeResultType]:
+        """Decode all contained messages of many frames of this container
+        message. Returns one list of ``(contained_message, signals)``
+        tuples per frame, as :meth:`decode()` with `decode_containers`
+        set to ``True`` does.
+
+        A `DecodeError` is raised for the first frame which cannot be
+        decoded.
+
+        """
+
+        if not self.is_container:
+            raise DecodeError(f'Message "{self.name}" is not a container '
+                              f'message')
+
+        decode_contained = self._decode_contained
+
+        return [
+            decode_contained(data, decode_choices, scaling)
+            for data in frames
+        ]
+
     def decode(self,
-               data: bytes,
+               data: Buffer,
                decode_choices: bool = True,
                scaling: bool = True,
-               decode_containers: bool = False
+               decode_containers: bool = False,
+               signals: Optional[Iterable[str]] = None
                ) \
                -> DecodeResultType:
         """Decode given data as a message of this type.
@@ -1096,6 +1466,11 @@ class Message(object):
         >>> foo.decode(b'\\x01\\x45\\x23\\x00\\x11')
         {'Bar': 1, 'Fum': 5.0}
 
+        `data` may be any contiguous buffer (``bytes``, ``bytearray``,
+        ``memoryview``, ...), for example a slice of a receive buffer.
+        It is not copied unless the message has little endian signals
+        and no generated decoder.
+
         If `decode_containers` is ``True``, the inner messages are
         decoded if the current message is a container frame. The
         reason why this needs to be explicitly enabled is that the
@@ -1104,6 +1479,17 @@ class Message(object):
         that does not expect this to misbehave. Trying to decode a
         container message with `decode_containers` set to ``False``
         will raise a `DecodeError`.
+
+        If `signals` is given, only the signals with these names are
+        extracted and scaled, and the result only holds those of them
+        which are present in the data. Multiplexers are still decoded
+        to select the right signals. A codec is created and cached for
+        each distinct subset, pass a ``frozenset`` of signal names to
+        avoid converting the subset on every call.
+
+        >>> foo.decode(b'\\x01\\x45\\x23\\x00\\x11', signals=frozenset(['Fum']))
+        {'Fum': 5.0}
+
         """
 
         if self.is_container:
@@ -1120,17 +1506,69 @@ class Message(object):
         if self._codecs is None:
             raise ValueError('Codec is not initialized.')
 
-        data = data[:self._length]
+        if len(data) > self._length:
+            data = data[:self._length]
+
+        if signals is None:
+            flat_mux = self._flat_mux
 
-        return self._decode(self._codecs, data, decode_choices, scaling)
+            if flat_mux is not None:
+                decoded = self._decode_flat(flat_mux,
+                                            data,
+                                            decode_choices,
+                                            scaling)
+
+                if decoded is not None:
+                    return decoded
+
+            return self._decode(self._codecs, data, decode_choices, scaling)
+
+        if not isinstance(signals, frozenset):
+            signals = frozenset(signals)
+
+        codec, unwanted = self._get_subset_codec(signals)
+        decoded = self._decode(codec, data, decode_choices, scaling)
+
+        for name in unwanted:
+            decoded.pop(name, None)
+
+        return decoded
+
+    def generate_decoders(self, enabled: bool = True) -> None:
+        """Decode this message with generated, layout specific Python
+        functions instead of the generic decoder.
+
+        A straight-line function is generated (and ``exec``'d) for every
+        codec of the message. The functions are generated again on each
+        :meth:`refresh`, so call :meth:`refresh` after modifying the
+        signals of the message. Layouts which cannot be generated keep
+        using the generic decoder.
+
+        If `enabled` is ``False`` the generated functions are dropped.
+
+        """
+
+        self._use_generated_decoders = enabled
+        self.refresh()
 
     def get_contained_message_by_header_id(self, header_id: int) \
         -> Optional['Message']:
 
-        if self.contained_messages is None:
+        index = self._contained_index
+
+        if index is None:
+            return None
+
+        try:
+            contained_message = index[header_id]
+        except KeyError:
             return None
 
-        tmp = [ x for x in self.contained_messages if x.header_id == header_id ]
+        if contained_message is not None:
+            return contained_message
+
+        # Several contained messages have this header id.
+        tmp = [ x for x in self.contained_messages if x.header_id == header_id ] # type: ignore
 
         if len(tmp) == 0:
             return None
@@ -1264,7 +1702,15 @@ class Message(object):
         """
 
         self._check_signal_lengths()
-        self._codecs = self._create_codec()
+        codecs = self._create_codec()
+
+        if self._use_generated_decoders:
+            self._generate_decoders(codecs)
+
+        self._codecs = codecs
+        self._subset_codecs = {}
+        self._flat_mux = self._create_flat_mux(codecs)
+        self._contained_index = self._create_contained_index()
         self._signal_tree = self._create_signal_tree(self._codecs)
 
         if strict is None:
@@ -1274,6 +1720,28 @@ class Message(object):
             message_bits = 8 * self.length * [None]
             self._check_signal_tree(message_bits, self.signal_tree)
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+
+        # Subset and flattened codecs are created again on demand.
+        state['_subset_codecs'] = {}
+        state['_flat_mux'] = None
+
+        if self._use_generated_decoders:
+            # Generated functions cannot be pickled, they are generated
+            # again when unpickling.
+            state['_codecs'] = None
+
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+
+        if self._codecs is None:
+            self.refresh()
+        else:
+            self._flat_mux = self._create_flat_mux(self._codecs)
+
     def __repr__(self) -> str:
         return \
             f'message(' \
@@ -0,0 +1,219 @@
+"""Generation of specialised Python decode functions for message layouts.
+
+Instead of going through the generic :func:`decode_data` path (two
+bitstruct unpacks, a merged dictionary and a :func:`_decode_field` call
+per signal), a straight-line function is generated for a given list of
+signals. It converts the payload to an integer once and extracts every
+signal with a shift and a mask, followed by inline choice lookup and
+scaling.
+
+The generated functions return exactly what :func:`decode_data` would
+return for the same arguments. Layouts which bitstruct would decode
+differently from their nominal bit positions (overlapping or
+out-of-range signals) are not generated at all.
+
+"""
+
+import logging
+import struct
+from typing import Callable, Dict, List, Optional
+
+from .signal import Signal
+from ..utils import start_bit, sawtooth_to_network_bitnum
+
+
+LOGGER = logging.getLogger(__name__)
+
+DecodeFunction = Callable[[bytes, bool, bool], Dict]
+
+FLOAT_FORMATS = {
+    16: '>e',
+    32: '>f',
+    64: '>d'
+}
+
+
+def _is_int(value) -> bool:
+    return isinstance(value, int) or (isinstance(value, float) and value.is_integer())
+
+
+def layout_matches_bitstruct(signals: List[Signal], number_of_bytes: int) -> bool:
+    """Returns ``True`` if the nominal bit positions of all signals are
+    what the bitstruct formats of :func:`create_encode_decode_formats`
+    extract, i.e. if the signals neither overlap nor exceed the message.
+
+    """
+
+    format_length = 8 * number_of_bytes
+
+    big = sorted([signal for signal in signals
+                  if signal.byte_order == 'big_endian'],
+                 key=lambda signal: sawtooth_to_network_bitnum(signal.start))
+    end = 0
+
+    for signal in big:
+        if start_bit(signal) < end:
+            return False
+
+        end = start_bit(signal) + signal.length
+
+    if end > format_length:
+        return False
+
+    end = format_length
+
+    for signal in signals[::-1]:
+        if signal.byte_order == 'big_endian':
+            continue
+
+        if signal.start < 0 or signal.start + signal.length > end:
+            return False
+
+        end = signal.start
+
+    for signal in signals:
+        if signal.is_float and signal.length not in FLOAT_FORMATS:
+            return False
+
+    return True
+
+
+def generate_decoder_source(signals: List[Signal],
+                            number_of_bytes: int,
+                            name: str = 'decode',
+                            layout_signals: Optional[List[Signal]] = None) -> Optional[str]:
+    """Returns the source code of a decode function for given signals, or
+    ``None`` if the layout is not supported.
+
+    The layout is checked on `layout_signals` if given, i.e. the
+    signals in the order the bitstruct formats were created from.
+
+    The generated function refers to the names ``choices_<n>``,
+    ``scale_<n>``, ``offset_<n>``, ``unpack_<n>`` and ``fallback``
+    which must be provided in its namespace, see
+    :func:`generate_decoder`.
+
+    """
+
+    if layout_signals is None:
+        layout_signals = signals
+
+    if not layout_matches_bitstruct(layout_signals, number_of_bytes):
+        return None
+
+    format_length = 8 * number_of_bytes
+    has_big = any(signal.byte_order == 'big_endian' for signal in signals)
+    has_little = any(signal.byte_order != 'big_endian' for signal in signals)
+
+    lines = [
+        f'def {name}(data, decode_choices=True, scaling=True):',
+        f'    if len(data) != {number_of_bytes}:',
+        f'        return fallback(data, decode_choices, scaling)',
+    ]
+
+    if has_big:
+        lines.append("    big = int.from_bytes(data, 'big')")
+
+    if has_little:
+        lines.append("    little = int.from_bytes(data, 'little')")
+
+    values = []
+
+    for index, signal in enumerate(signals):
+        mask = (1 << signal.length) - 1
+
+        if signal.byte_order == 'big_endian':
+            shift = format_length - start_bit(signal) - signal.length
+            source = 'big'
+        else:
+            shift = signal.start
+            source = 'little'
+
+        raw = f'v{index}'
+        lines.append(f'    {raw} = ({source} >> {shift}) & {mask:#x}')
+
+        if signal.is_float:
+            lines.append(f'    {raw} = unpack_{index}({raw}.to_bytes('
+                         f'{signal.length // 8}, "big"))[0]')
+        elif signal.is_signed:
+            sign = 1 << (signal.length - 1)
+            lines.append(f'    {raw} -= ({raw} & {sign:#x}) << 1')
+
+        # Scaling, keeping the int/float semantics of _decode_field().
+        if signal.is_float \
+           or not _is_int(signal.scale) \
+           or not _is_int(signal.offset):
+            scaled = f'scale_{index} * {raw} + offset_{index}'
+        elif type(signal.scale) is int and type(signal.offset) is int:
+            if signal.scale == 1 and signal.offset == 0:
+                scaled = raw
+            elif signal.scale == 1:
+                scaled = f'{raw} + offset_{index}'
+            elif signal.offset == 0:
+                scaled = f'scale_{index} * {raw}'
+            else:
+                scaled = f'scale_{index} * {raw} + offset_{index}'
+        else:
+            scaled = f'int(scale_{index} * {raw} + offset_{index})'
+
+        value = f'd{index}'
+
+        if signal.choices:
+            lines += [
+                f'    if decode_choices and {raw} in choices_{index}:',
+                f'        {value} = choices_{index}[{raw}]',
+                f'    elif scaling:',
+                f'        {value} = {scaled}',
+                f'    else:',
+                f'        {value} = {raw}'
+            ]
+        elif scaled == raw:
+            value = raw
+        else:
+            lines.append(f'    {value} = {scaled} if scaling else {raw}')
+
+        values.append(f'{signal.name!r}: {value}')
+
+    lines.append('    return {' + ', '.join(values) + '}')
+
+    return '\n'.join(lines) + '\n'
+
+
+def generate_decoder(signals: List[Signal],
+                     number_of_bytes: int,
+                     fallback: DecodeFunction,
+                     layout_signals: Optional[List[Signal]] = None) -> Optional[DecodeFunction]:
+    """Generate and compile a decode function for given signals.
+
+    `fallback` is called with ``(data, decode_choices, scaling)`` for
+    payloads which do not have the expected length, so that the
+    generic path can raise its usual errors.
+
+    Returns ``None`` if the layout is not supported.
+
+    """
+
+    source = generate_decoder_source(signals,
+                                     number_of_bytes,
+                                     layout_signals=layout_signals)
+
+    if source is None:
+        return None
+
+    namespace = {'fallback': fallback}
+
+    for index, signal in enumerate(signals):
+        namespace[f'choices_{index}'] = signal.choices
+        namespace[f'scale_{index}'] = signal.scale
+        namespace[f'offset_{index}'] = signal.offset
+
+        if signal.is_float:
+            namespace[f'unpack_{index}'] = \
+                struct.Struct(FLOAT_FORMATS[signal.length]).unpack
+
+    code = compile(source, '<cantools decoder>', 'exec')
+    exec(code, namespace)
+    decoder = namespace['decode']
+    decoder.source = source
+
+    return decoder
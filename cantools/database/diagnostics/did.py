@@ -1,7 +1,5 @@
 # A DID.
 
-import binascii
-
 from ..utils import encode_data
 from ..utils import decode_data
 from ..utils import create_encode_decode_formats
@@ -94,10 +92,7 @@ class Did(object):
                               self._codec['datas'],
                               self._codec['formats'],
                               scaling)
-        encoded |= (0x80 << (8 * self._length))
-        encoded = hex(encoded)[4:].rstrip('L')
-
-        return binascii.unhexlify(encoded)[:self._length]
+        return encoded.to_bytes(self._length, 'big')
 
     def decode(self, data, decode_choices=True, scaling=True):
         """Decode given data as a DID of this type.
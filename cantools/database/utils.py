@@ -1,15 +1,17 @@
 # Utility functions.
 
-import binascii
 import os.path
 import re
+import sys
+import threading
+from collections import OrderedDict
 from decimal import Decimal
-from typing import Dict, Union, List, Callable
+from typing import Dict, Union, List, Callable, NamedTuple, Tuple
 
 from typing_extensions import Literal, Final
 
 from cantools.database.can.signal import NamedSignalValue, Signal
-from cantools.typechecking import Formats
+from cantools.typechecking import Buffer, Formats
 
 try:
     import bitstruct.c
@@ -17,6 +19,24 @@ except ImportError:
     import bitstruct
 
 
+class FormatsCacheInfo(NamedTuple):
+    entries: int
+    maxsize: int
+    hits: int
+    misses: int
+    codecs: int
+    bytes: int
+
+
+# Maximum number of distinct layouts kept by the compiled formats cache,
+# see create_encode_decode_formats().
+FORMATS_CACHE_SIZE: Final = 4096
+
+# Approximate size of the per field information kept by a format
+# compiled by bitstruct.c, which is not visible to sys.getsizeof().
+_C_FIELD_SIZE: Final = 48
+
+
 def format_or(items):
     items = [str(item) for item in items]
 
@@ -90,22 +110,38 @@ def encode_data(data, fields, formats, scaling):
         field.name: _encode_field(field, data, scaling)
         for field in fields
     }
-    big_packed = formats.big_endian.pack(unpacked)
-    little_packed = formats.little_endian.pack(unpacked)[::-1]
-    packed_union = int(binascii.hexlify(big_packed), 16)
-    packed_union |= int(binascii.hexlify(little_packed), 16)
+    packed_union = 0
+
+    if formats.has_big_endian:
+        packed_union = int.from_bytes(formats.big_endian.pack(unpacked), 'big')
+
+    if formats.has_little_endian:
+        packed_union |= int.from_bytes(formats.little_endian.pack(unpacked),
+                                       'little')
 
     return packed_union
 
 
-def decode_data(data: bytes,
+def decode_data(data: Buffer,
                 fields: List[Signal],
                 formats: Formats,
                 decode_choices: bool,
                 scaling: bool,
                 ) -> Dict[str, Union[float, str]]:
-    unpacked = formats.big_endian.unpack(bytes(data))
-    unpacked.update(formats.little_endian.unpack(bytes(data[::-1])))
+    # bitstruct unpacks any contiguous buffer, so `data` is only copied
+    # when it has to be reversed for the little endian fields.
+    if formats.has_big_endian:
+        unpacked = formats.big_endian.unpack(data)
+    else:
+        unpacked = {}
+
+    if formats.has_little_endian:
+        if isinstance(data, memoryview):
+            reversed_data = bytes(data[::-1])
+        else:
+            reversed_data = data[::-1]
+
+        unpacked.update(formats.little_endian.unpack(reversed_data))
 
     return {
         field.name: _decode_field(field,
@@ -116,6 +152,101 @@ def decode_data(data: bytes,
     }
 
 
+class _CachedFormat:
+    """A compiled layout in the formats cache, the number of codecs
+    sharing it and its approximate size in bytes.
+
+    """
+
+    __slots__ = ('compiled', 'codecs', 'size')
+
+    def __init__(self, compiled, size):
+        self.compiled = compiled
+        self.codecs = 0
+        self.size = size
+
+
+_formats_cache: 'OrderedDict[str, _CachedFormat]' = OrderedDict()
+_formats_cache_lock = threading.Lock()
+_formats_cache_hits = 0
+_formats_cache_misses = 0
+
+
+def _format_size(fmt, compiled):
+    """Returns the approximate size in bytes of given compiled format,
+    including its format string key.
+
+    """
+
+    size = sys.getsizeof(fmt) + sys.getsizeof(compiled)
+    infos = getattr(compiled, '_infos', None)
+
+    if infos is None:
+        # bitstruct.c keeps the fields out of sight.
+        size += _C_FIELD_SIZE * len(re.findall(r'[a-zA-Z]\d+', fmt))
+    else:
+        size += sys.getsizeof(compiled.__dict__) + sys.getsizeof(infos)
+        size += sum(sys.getsizeof(info) + sys.getsizeof(info.__dict__)
+                    for info in infos)
+
+    return size
+
+
+def _compile_format(fmt):
+    """Compile given bitstruct format without field names. The format
+    string only describes the layout (field types, lengths and padding),
+    so all codecs with that layout share the compiled format. At most
+    FORMATS_CACHE_SIZE layouts are kept, least recently used first out.
+
+    """
+
+    global _formats_cache_hits
+    global _formats_cache_misses
+
+    with _formats_cache_lock:
+        cached = _formats_cache.get(fmt)
+
+        if cached is None:
+            _formats_cache_misses += 1
+
+            try:
+                compiled = bitstruct.c.compile(fmt)
+            except Exception:
+                compiled = bitstruct.compile(fmt)
+
+            cached = _CachedFormat(compiled, _format_size(fmt, compiled))
+            _formats_cache[fmt] = cached
+
+            if len(_formats_cache) > FORMATS_CACHE_SIZE:
+                _formats_cache.popitem(last=False)
+        else:
+            _formats_cache_hits += 1
+            _formats_cache.move_to_end(fmt)
+
+        cached.codecs += 1
+
+        return cached.compiled
+
+
+class _NamedFormat:
+    """A shared compiled format packing and unpacking the fields of one
+    codec by name.
+
+    """
+
+    __slots__ = ('compiled', 'names')
+
+    def __init__(self, compiled, names):
+        self.compiled = compiled
+        self.names = tuple(names)
+
+    def pack(self, data):
+        return self.compiled.pack(*[data[name] for name in self.names])
+
+    def unpack(self, data):
+        return dict(zip(self.names, self.compiled.unpack(data)))
+
+
 def create_encode_decode_formats(datas, number_of_bytes):
     format_length = (8 * number_of_bytes)
 
@@ -202,26 +333,52 @@ def create_encode_decode_formats(datas, number_of_bytes):
         if format_length > 0:
             length = len(''.join([item[1] for item in items]))
             value = bitstruct.pack('u{}'.format(length), value)
-            value = int(binascii.hexlify(value[::-1]), 16)
+            value = int.from_bytes(value, 'little')
 
         return fmt(items), value, names(items)
 
     big_fmt, big_padding_mask, big_names = create_big()
     little_fmt, little_padding_mask, little_names = create_little()
 
-    try:
-        big_compiled = bitstruct.c.compile(big_fmt, big_names)
-    except Exception as e:
-        big_compiled = bitstruct.compile(big_fmt, big_names)
+    return Formats(_NamedFormat(_compile_format(big_fmt), big_names),
+                   _NamedFormat(_compile_format(little_fmt), little_names),
+                   big_padding_mask & little_padding_mask,
+                   len(big_names) > 0,
+                   len(little_names) > 0)
+
+
+def formats_cache_info() -> FormatsCacheInfo:
+    """Returns the number of distinct compiled layouts, the maximum
+    number kept, how many times a layout was reused (hits) or had to be
+    compiled (misses) by :func:`create_encode_decode_formats`, the
+    number of codec byte orders sharing the kept layouts, and the
+    approximate memory used by the kept layouts in bytes.
+
+    """
+
+    with _formats_cache_lock:
+        return FormatsCacheInfo(
+            len(_formats_cache),
+            FORMATS_CACHE_SIZE,
+            _formats_cache_hits,
+            _formats_cache_misses,
+            sum(cached.codecs for cached in _formats_cache.values()),
+            sum(cached.size for cached in _formats_cache.values()))
+
+
+def clear_formats_cache() -> None:
+    """Forget all shared compiled layouts and reset the counters.
+    Codecs which already use them are not affected.
+
+    """
 
-    try:
-        little_compiled = bitstruct.c.compile(little_fmt, little_names)
-    except Exception as e:
-        little_compiled = bitstruct.compile(little_fmt, little_names)
+    global _formats_cache_hits
+    global _formats_cache_misses
 
-    return Formats(big_compiled,
-                   little_compiled,
-                   big_padding_mask & little_padding_mask)
+    with _formats_cache_lock:
+        _formats_cache.clear()
+        _formats_cache_hits = 0
+        _formats_cache_misses = 0
 
 
 def sawtooth_to_network_bitnum(sawtooth_bitnum):
@@ -0,0 +1,341 @@
+"""Parallel decoding of CAN log files.
+
+The log file is split into shards at the checkpoints of its index (see
+:mod:`cantools.logindex`), so any supported format, BLF included, can
+be split. Each shard is a file offset and a number of frames. Shards
+are read and decoded in a pool of worker processes. Each worker loads
+the database once. The decoded frames of each shard are sorted by
+timestamp and the shards are merged into timestamp order with a k-way
+merge.
+
+>>> decoder = cantools.logdecode.ParallelDecoder('drive.blf', 'vehicle.dbc')
+>>> for frame in decoder:
+        print(frame.timestamp, frame.name, frame.signals)
+>>> for statistics in decoder.statistics.values():
+        print(statistics)
+
+"""
+
+import bisect
+import concurrent.futures
+import heapq
+import os
+import time
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from . import database as _database
+from . import logformats
+from . import logindex
+
+
+DEFAULT_SHARD_FRAMES = 16 * logformats.DEFAULT_BATCH_SIZE
+
+
+class DecodedFrame(NamedTuple):
+    """A decoded frame. `frame_number` is its position in the log file,
+    and `name` and `signals` the name and decoded signals of its
+    message."""
+    timestamp: Optional[float]
+    frame_number: int
+    channel: Optional[str]
+    frame_id: int
+    name: str
+    signals: Dict
+
+
+class Shard(NamedTuple):
+    """`frames` frames of a log file, from frame number `frame_number`
+    at file offset `offset`, read with parser state `state`."""
+    number: int
+    frame_number: int
+    offset: int
+    frames: int
+    state: Any = None
+
+
+class WorkerStatistics:
+    """Frames read and decoded by one worker process, and the time it
+    spent reading and decoding them."""
+
+    def __init__(self, pid):
+        self.pid = pid
+        self.shards = 0
+        self.frames = 0
+        self.decoded = 0
+        self.unknown = 0
+        self.errors = 0
+        self.seconds = 0.0
+
+    @property
+    def frames_per_second(self):
+        if self.seconds == 0:
+            return 0.0
+
+        return self.frames / self.seconds
+
+    def __repr__(self):
+        return ('WorkerStatistics(pid={}, shards={}, frames={}, decoded={}, '
+                'frames_per_second={:.0f})').format(self.pid,
+                                                    self.shards,
+                                                    self.frames,
+                                                    self.decoded,
+                                                    self.frames_per_second)
+
+
+# The database and decode options of a worker process, set once by
+# _init_worker().
+_worker = None
+
+
+def _init_worker(database, format_name, decode_choices, scaling):
+    global _worker
+
+    if isinstance(database, str):
+        database = _database.load_file(database)
+
+    _worker = (database, format_name, decode_choices, scaling)
+
+
+def _sort_key(frame):
+    timestamp = frame.timestamp
+
+    if timestamp is None:
+        timestamp = 0.0
+
+    return (timestamp, frame.frame_number)
+
+
+def _decode_shard(filename, shard):
+    """Read and decode given shard in a worker. Returns the shard, its
+    decoded frames sorted by timestamp and the worker's counters."""
+    start = time.perf_counter()
+    database, format_name, decode_choices, scaling = _worker
+    get_message_by_frame_id = database.get_message_by_frame_id
+    reader = logformats.open_log(filename, format_name)
+    decoded = []
+    frame_number = shard.frame_number
+    end = shard.frame_number + shard.frames
+    unknown = 0
+    errors = 0
+
+    for batch in reader.batches(shard.offset, shard.state):
+        for frame in batch[:end - frame_number]:
+            try:
+                message = get_message_by_frame_id(frame.frame_id)
+            except KeyError:
+                unknown += 1
+                frame_number += 1
+                continue
+
+            try:
+                signals = message.decode(frame.data, decode_choices, scaling)
+            except Exception:
+                errors += 1
+            else:
+                decoded.append(DecodedFrame(frame.timestamp,
+                                            frame_number,
+                                            frame.channel,
+                                            frame.frame_id,
+                                            message.name,
+                                            signals))
+
+            frame_number += 1
+
+        if frame_number >= end:
+            break
+
+    decoded.sort(key=_sort_key)
+    counters = (os.getpid(),
+                frame_number - shard.frame_number,
+                len(decoded),
+                unknown,
+                errors,
+                time.perf_counter() - start)
+
+    return shard, decoded, counters
+
+
+class ParallelDecoder:
+    """Decode a log file with given database in a pool of `processes`
+    processes (one per CPU by default, decoded in this process if 1).
+
+    `database` is a :class:`~cantools.database.can.Database`, which is
+    sent to each worker once, or the filename of a database, which each
+    worker loads. The log file is indexed first if it has no up to date
+    index, and split into shards of about `shard_frames` frames.
+
+    Iterating yields :class:`DecodedFrame` in timestamp order (frames
+    with equal timestamps, or without timestamps, in file order), as
+    long as frames are out of order by less than one shard. At most
+    two shards per process are decoded ahead of the consumer.
+    :attr:`statistics` holds the :class:`WorkerStatistics` of each
+    worker process, by process id.
+
+    """
+
+    def __init__(self,
+                 filename,
+                 database,
+                 processes=None,
+                 shard_frames=DEFAULT_SHARD_FRAMES,
+                 decode_choices=True,
+                 scaling=True,
+                 format=None):
+        self.filename = filename
+        self.database = database
+        self.processes = processes or os.cpu_count() or 1
+        self.shard_frames = shard_frames
+        self.decode_choices = decode_choices
+        self.scaling = scaling
+        self.format = format
+        self.index = None
+        self.statistics: Dict[int, WorkerStatistics] = {}
+        self.seconds = 0.0
+
+    @property
+    def frames_per_second(self):
+        """The overall throughput of the last decode."""
+        frames = sum([statistics.frames
+                      for statistics in self.statistics.values()])
+
+        if self.seconds == 0:
+            return 0.0
+
+        return frames / self.seconds
+
+    def shards(self) -> List[Shard]:
+        """Returns the shards of the log file, loading its index first if
+        needed."""
+        if self.index is None:
+            self.index = logindex.load_index(self.filename, self.format)
+
+        index = self.index
+        shards = []
+        checkpoints = index.checkpoints
+
+        for checkpoint in checkpoints:
+            if shards and checkpoint.frame_number - shards[-1].frame_number \
+               < self.shard_frames:
+                continue
+
+            shards.append(Shard(len(shards),
+                                checkpoint.frame_number,
+                                checkpoint.offset,
+                                0,
+                                checkpoint.state))
+
+        ends = [shard.frame_number for shard in shards[1:]] + [index.frames]
+
+        return [shard._replace(frames=end - shard.frame_number)
+                for shard, end in zip(shards, ends)]
+
+    def _add_statistics(self, counters):
+        pid, frames, decoded, unknown, errors, seconds = counters
+
+        try:
+            statistics = self.statistics[pid]
+        except KeyError:
+            statistics = WorkerStatistics(pid)
+            self.statistics[pid] = statistics
+
+        statistics.shards += 1
+        statistics.frames += frames
+        statistics.decoded += decoded
+        statistics.unknown += unknown
+        statistics.errors += errors
+        statistics.seconds += seconds
+
+    def _decoded_shards(self, shards):
+        """Yields the sorted decoded frames of given shards, in shard
+        order."""
+        initargs = (self.database,
+                    self.index.format_name,
+                    self.decode_choices,
+                    self.scaling)
+
+        if self.processes == 1:
+            _init_worker(*initargs)
+
+            for shard in shards:
+                _, decoded, counters = _decode_shard(self.filename, shard)
+                self._add_statistics(counters)
+
+                yield decoded
+
+            return
+
+        window = 2 * self.processes
+        shards = iter(shards)
+
+        with concurrent.futures.ProcessPoolExecutor(
+                self.processes,
+                initializer=_init_worker,
+                initargs=initargs) as executor:
+            def submit():
+                for shard in shards:
+                    return executor.submit(_decode_shard, self.filename, shard)
+
+            pending = []
+
+            for _ in range(window):
+                future = submit()
+
+                if future is None:
+                    break
+
+                pending.append(future)
+
+            while pending:
+                _, decoded, counters = pending.pop(0).result()
+                self._add_statistics(counters)
+                future = submit()
+
+                if future is not None:
+                    pending.append(future)
+
+                yield decoded
+
+    def __iter__(self):
+        """Yields the decoded frames in timestamp order.
+
+        The sorted shards received but not yet emitted are merged, all
+        at once, whenever `processes` new shards have been received.
+        Frames before the first frame of the newest shard are emitted,
+        the rest is kept for the next merge.
+
+        """
+
+        start = time.perf_counter()
+        self.statistics = {}
+        shards = self.shards()
+        pending = []
+        carry = []
+
+        def merge():
+            return list(heapq.merge(carry, *pending, key=_sort_key))
+
+        for decoded in self._decoded_shards(shards):
+            if not decoded:
+                continue
+
+            pending.append(decoded)
+
+            if len(pending) <= self.processes:
+                continue
+
+            newest = pending.pop()
+            merged = merge()
+            end = bisect.bisect_left([_sort_key(frame) for frame in merged],
+                                     _sort_key(newest[0]))
+            yield from merged[:end]
+            carry = merged[end:]
+            pending = [newest]
+
+        yield from merge()
+        self.seconds = time.perf_counter() - start
+
+
+def decode_log(filename, database, processes=None, **kwargs):
+    """Returns a list of the decoded frames of given log file in
+    timestamp order, see :class:`ParallelDecoder`."""
+    return list(ParallelDecoder(filename, database, processes, **kwargs))
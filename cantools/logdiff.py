@@ -0,0 +1,532 @@
+"""Statistical comparison of CAN captures.
+
+Reverse engineering a signal usually means recording captures with and
+without an action, for example with a button released and pressed,
+and looking for the bits that differ. Given two or more captures, each
+a log file or a time window of one, the following statistics are
+computed per capture and frame id, vectorized with numpy:
+
+- per bit, the fraction of frames with the bit set and the fraction of
+  consecutive frames where it toggles,
+
+- per byte, the distribution of its values.
+
+Adjacent bits whose statistics differ between captures, together with
+the bits around them that differ a little, are grouped into candidate
+bit ranges.
+A candidate is scored by the largest total variation distance between
+the distributions of its values in two captures and the largest
+difference of toggle rates of its bits, both between 0 and 1. Values
+that only appear in one capture are listed too. Rolling counters and
+checksums behave the same in all captures, and so score low.
+
+Bits are numbered as in big endian signals, from the most significant
+bit of the first byte, so a candidate is the start bit and length of a
+big endian signal, see :meth:`Candidate.to_signal()`. Candidates print
+their bits as ``BYTE.BIT-BYTE.BIT``, with bytes counted from 0 and
+bits from 0 (the least significant bit of a byte).
+
+>>> diff = cantools.logdiff.diff_logs(['released.blf', 'pressed.blf'])
+>>> for candidate in diff.candidates[:10]:
+        print(candidate)
+
+"""
+
+import concurrent.futures
+import itertools
+import os
+import re
+from typing import Dict, List, NamedTuple, Optional
+
+from .database.can.signal import Signal
+from .errors import Error
+from . import logformats
+from . import logindex
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+DEFAULT_MIN_SCORE = 0.2
+DEFAULT_MIN_EXTEND_SCORE = 0.05
+DEFAULT_MAX_LENGTH = 32
+
+# Values only seen in one capture, listed per candidate and capture.
+MAXIMUM_NEW_VALUES = 16
+
+RE_WINDOW = re.compile(r'^(?P<filename>.+)@(?P<start>[\d.]*):(?P<stop>[\d.]*)$')
+
+
+class DiffError(Error):
+    pass
+
+
+def _check_numpy():
+    if np is None:
+        raise DiffError('The numpy package is required to compare captures.')
+
+
+class Capture:
+    """The frames of a capture, per frame id the timestamps (NaN if the
+    log has none) and the payloads as a matrix of bytes, one row per
+    frame. Shorter payloads are padded with zeros.
+
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.timestamps: Dict[int, 'np.ndarray'] = {}
+        self.payloads: Dict[int, 'np.ndarray'] = {}
+
+    @classmethod
+    def from_frames(cls, frames, name='capture'):
+        """Returns a capture of given frames, for example
+        :class:`cantools.logformats.Frame` objects."""
+        _check_numpy()
+        columns = {}
+
+        for frame in frames:
+            try:
+                timestamps, datas = columns[frame.frame_id]
+            except KeyError:
+                timestamps = []
+                datas = []
+                columns[frame.frame_id] = (timestamps, datas)
+
+            timestamps.append(frame.timestamp)
+            datas.append(frame.data)
+
+        capture = cls(name)
+
+        for frame_id, (timestamps, datas) in columns.items():
+            capture._add_columns(frame_id, timestamps, datas)
+
+        return capture
+
+    def _add_columns(self, frame_id, timestamps, datas):
+        length = max([len(data) for data in datas])
+
+        if any([len(data) != length for data in datas]):
+            datas = [bytes(data).ljust(length, b'\x00') for data in datas]
+
+        self.timestamps[frame_id] = np.array(
+            [np.nan if timestamp is None else timestamp
+             for timestamp in timestamps],
+            dtype=np.float64)
+        self.payloads[frame_id] = np.frombuffer(
+            b''.join(datas), dtype=np.uint8).reshape(len(datas), length)
+
+    @property
+    def frames(self):
+        return sum([len(payloads) for payloads in self.payloads.values()])
+
+    @property
+    def duration(self):
+        """The time between the first and last frame, or None if the
+        capture has no timestamps."""
+        first = [timestamps[0] for timestamps in self.timestamps.values()
+                 if len(timestamps) > 0 and not np.isnan(timestamps[0])]
+
+        if not first:
+            return None
+
+        last = [np.nanmax(timestamps) for timestamps in self.timestamps.values()
+                if len(timestamps) > 0 and not np.isnan(timestamps[0])]
+
+        return float(max(last) - min(first))
+
+    def __repr__(self):
+        return "Capture('{}', {} frames, {} ids)".format(self.name,
+                                                         self.frames,
+                                                         len(self.payloads))
+
+
+def _first_timestamp(reader):
+    for batch in reader.batches():
+        for frame in batch:
+            return frame.timestamp
+
+    return None
+
+
+def load_capture(filename,
+                 start: Optional[float] = None,
+                 stop: Optional[float] = None,
+                 format: Optional[str] = None,
+                 name: Optional[str] = None) -> Capture:
+    """Read the frames of given log file into a :class:`Capture`. Only
+    frames from `start` to `stop` seconds after the first frame are
+    read, if given. Reading starts at the checkpoint before `start` if
+    the log file has an index (see :mod:`cantools.logindex`).
+
+    """
+
+    _check_numpy()
+    reader = logformats.open_log(filename, format)
+    offset = 0
+    state = None
+
+    if name is None:
+        name = os.path.basename(filename)
+
+    if start is None and stop is None:
+        return Capture.from_frames(reader, name)
+
+    index = logindex.read_index(filename)
+
+    if index is not None:
+        first = index.first_timestamp
+    else:
+        first = _first_timestamp(reader)
+
+    if first is None:
+        raise DiffError(
+            "Log file '{}' has no timestamps, so no time window can be "
+            "selected.".format(filename))
+
+    if start is not None:
+        start += first
+
+        if index is not None:
+            offset, state = index.position_at_time(start)
+
+    if stop is not None:
+        stop += first
+
+    def frames():
+        for batch in reader.batches(offset, state):
+            for frame in batch:
+                timestamp = frame.timestamp
+
+                if start is not None and timestamp < start:
+                    continue
+
+                if stop is not None and timestamp > stop:
+                    return
+
+                yield frame
+
+    return Capture.from_frames(frames(), name)
+
+
+def parse_capture(argument):
+    """Returns the file name, start and stop of given capture argument,
+    ``FILENAME`` or ``FILENAME@START:STOP`` with `START` and `STOP`
+    (both optional) in seconds from the start of the log."""
+    mo = RE_WINDOW.match(argument)
+
+    if mo is None:
+        return argument, None, None
+
+    start = mo.group('start')
+    stop = mo.group('stop')
+
+    return (mo.group('filename'),
+            float(start) if start else None,
+            float(stop) if stop else None)
+
+
+class Candidate(NamedTuple):
+    """A range of bits whose values differ between captures. `start`
+    and `length` are those of a big endian signal, and `first_bit` the
+    position of its most significant bit counted from the most
+    significant bit of the first byte. `shift` is the largest total
+    variation distance between the value distributions of two
+    captures, `toggle_change` the largest difference of the toggle rate
+    of a bit, and `new_values` the values (at most
+    ``MAXIMUM_NEW_VALUES``) seen in one capture only, per capture
+    name.
+
+    """
+
+    frame_id: int
+    start: int
+    length: int
+    first_bit: int
+    score: float
+    shift: float
+    toggle_change: float
+    new_values: Dict[str, List[int]]
+
+    def to_signal(self, name=None, **kwargs):
+        """Returns a big endian signal of the bits of the candidate."""
+        if name is None:
+            name = 'BITS_{}_{}'.format(self.start, self.length)
+
+        return Signal(name,
+                      self.start,
+                      self.length,
+                      byte_order='big_endian',
+                      **kwargs)
+
+    def __str__(self):
+        byte = self.first_bit // 8
+        last_bit = self.first_bit + self.length - 1
+        bits = '{}.{}'.format(byte, 7 - self.first_bit % 8)
+
+        if self.length > 1:
+            bits += '-{}.{}'.format(last_bit // 8, 7 - last_bit % 8)
+
+        new_values = ', '.join([
+            '{}: {}'.format(name, ' '.join([str(value) for value in values]))
+            for name, values in self.new_values.items()
+            if values
+        ])
+
+        return ('0x{:x} bits {} (start {}, length {}): score {:.2f}, '
+                'shift {:.2f}, toggle change {:.2f}{}'.format(
+                    self.frame_id,
+                    bits,
+                    self.start,
+                    self.length,
+                    self.score,
+                    self.shift,
+                    self.toggle_change,
+                    ', new values ' + new_values if new_values else ''))
+
+
+class IdDiff:
+    """The statistics of one frame id in each compared capture. Arrays
+    have one row per capture. `ones` and `toggles` have a column per
+    bit, `histograms` one row per byte of 256 value counts.
+    `byte_shift` and `bit_shift` are the largest total variation
+    distance between two captures per byte and per bit, and
+    `toggle_change` the largest difference of toggle rates per bit.
+
+    """
+
+    def __init__(self, frame_id, counts, rates, ones, toggles, histograms):
+        self.frame_id = frame_id
+        self.counts = counts
+        self.rates = rates
+        self.ones = ones
+        self.toggles = toggles
+        self.histograms = histograms
+        self.bit_shift = np.ptp(ones, axis=0)
+        self.toggle_change = np.ptp(toggles, axis=0)
+        distributions = histograms / counts[:, np.newaxis, np.newaxis]
+        self.byte_shift = np.max([
+            0.5 * np.abs(distributions[i] - distributions[j]).sum(axis=1)
+            for i, j in itertools.combinations(range(len(counts)), 2)
+        ], axis=0)
+
+    def new_byte_values(self, capture):
+        """Returns, per byte, the values only seen in given capture (an
+        index)."""
+        present = self.histograms > 0
+        others = np.delete(present, capture, axis=0).any(axis=0)
+
+        return [np.flatnonzero(row).tolist()
+                for row in present[capture] & ~others]
+
+
+class CaptureDiff:
+    """The result of :func:`diff_captures()`: the statistics of each
+    frame id in all captures, the frame ids missing in some captures
+    (with the names of the captures they are in) and candidates, best
+    first."""
+
+    def __init__(self, names):
+        self.names = names
+        self.ids: Dict[int, IdDiff] = {}
+        self.only_in: Dict[int, List[str]] = {}
+        self.candidates: List[Candidate] = []
+
+
+def _runs(mask):
+    steps = np.diff(mask.astype(np.int8), prepend=0, append=0)
+
+    return zip(np.flatnonzero(steps == 1), np.flatnonzero(steps == -1))
+
+
+def _values(bits, first, length):
+    weights = np.left_shift(np.uint64(1),
+                            np.arange(length - 1, -1, -1, dtype=np.uint64))
+
+    return bits[:, first:first + length].astype(np.uint64) @ weights
+
+
+def _value_statistics(values, names):
+    """Returns the largest total variation distance between the
+    distributions of given values of each capture, and the values only
+    seen in one capture, per capture name."""
+    unique, inverse = np.unique(np.concatenate(values), return_inverse=True)
+    distributions = []
+    position = 0
+
+    for capture_values in values:
+        counts = np.bincount(inverse[position:position + len(capture_values)],
+                             minlength=len(unique))
+        distributions.append(counts / len(capture_values))
+        position += len(capture_values)
+
+    distributions = np.array(distributions)
+    shift = max([0.5 * np.abs(distributions[i] - distributions[j]).sum()
+                 for i, j in itertools.combinations(range(len(values)), 2)])
+    present = distributions > 0
+    new_values = {}
+
+    for i, name in enumerate(names):
+        only = present[i] & ~np.delete(present, i, axis=0).any(axis=0)
+        new_values[name] = unique[only][:MAXIMUM_NEW_VALUES].tolist()
+
+    return float(shift), new_values
+
+
+def _id_statistics(capture, frame_id, length):
+    payloads = capture.payloads[frame_id]
+
+    if payloads.shape[1] < length:
+        payloads = np.pad(payloads, ((0, 0), (0, length - payloads.shape[1])))
+
+    bits = np.unpackbits(payloads, axis=1)
+    ones = bits.mean(axis=0)
+
+    if len(bits) > 1:
+        toggles = (bits[1:] != bits[:-1]).mean(axis=0)
+    else:
+        toggles = np.zeros(bits.shape[1])
+
+    histograms = np.bincount(
+        (payloads.astype(np.int64) + 256 * np.arange(length)).ravel(),
+        minlength=256 * length).reshape(length, 256)
+    timestamps = capture.timestamps[frame_id]
+    rate = None
+
+    if len(timestamps) > 1 and not np.isnan(timestamps).any():
+        duration = timestamps[-1] - timestamps[0]
+
+        if duration > 0:
+            rate = (len(timestamps) - 1) / duration
+
+    return bits, ones, toggles, histograms, rate
+
+
+def diff_captures(captures: List[Capture],
+                  min_score: float = DEFAULT_MIN_SCORE,
+                  max_length: int = DEFAULT_MAX_LENGTH,
+                  frame_ids=None,
+                  min_extend_score: float = DEFAULT_MIN_EXTEND_SCORE) -> CaptureDiff:
+    """Compare given captures, at least two, and return a
+    :class:`CaptureDiff`. Bits whose set or toggle fraction differ by
+    at least `min_score` between two captures, and the adjacent bits
+    whose fractions differ by at least `min_extend_score`, are grouped
+    into candidates of at most `max_length` bits. Only given
+    `frame_ids` are compared, if given.
+
+    """
+
+    _check_numpy()
+
+    if len(captures) < 2:
+        raise DiffError('At least two captures are required, but got {}.'.format(
+            len(captures)))
+
+    names = [capture.name for capture in captures]
+
+    if len(set(names)) != len(names):
+        names = ['{}#{}'.format(name, i + 1) for i, name in enumerate(names)]
+
+    diff = CaptureDiff(names)
+    all_ids = set()
+
+    for capture in captures:
+        all_ids.update(capture.payloads)
+
+    if frame_ids is not None:
+        all_ids &= set(frame_ids)
+
+    for frame_id in sorted(all_ids):
+        present = [frame_id in capture.payloads for capture in captures]
+
+        if not all(present):
+            diff.only_in[frame_id] = [name
+                                      for name, is_present in zip(names, present)
+                                      if is_present]
+            continue
+
+        length = max([capture.payloads[frame_id].shape[1]
+                      for capture in captures])
+
+        if length == 0:
+            continue
+
+        statistics = [_id_statistics(capture, frame_id, length)
+                      for capture in captures]
+        bits = [bits for bits, _, _, _, _ in statistics]
+        id_diff = IdDiff(
+            frame_id,
+            np.array([len(capture_bits) for capture_bits in bits]),
+            [rate for _, _, _, _, rate in statistics],
+            np.array([ones for _, ones, _, _, _ in statistics]),
+            np.array([toggles for _, _, toggles, _, _ in statistics]),
+            np.array([histograms for _, _, _, histograms, _ in statistics]))
+        diff.ids[frame_id] = id_diff
+        bit_scores = np.maximum(id_diff.bit_shift, id_diff.toggle_change)
+        selected = bit_scores >= min_score
+
+        # Extend the selected bits over adjacent bits which differ a
+        # little, as the low bits of a value often do. Bits which only
+        # change the same way in all captures, like those of a counter
+        # or checksum next to a flag, are not part of the candidate.
+        differing = (bit_scores >= min_extend_score) | selected
+
+        for run_first, run_end in _runs(differing):
+            if not selected[run_first:run_end].any():
+                continue
+
+            for first in range(run_first, run_end, max_length):
+                length = min(max_length, run_end - first)
+                shift, new_values = _value_statistics(
+                    [_values(capture_bits, first, length)
+                     for capture_bits in bits],
+                    names)
+                toggle_change = float(
+                    id_diff.toggle_change[first:first + length].max())
+                diff.candidates.append(
+                    Candidate(frame_id,
+                              8 * (first // 8) + 7 - first % 8,
+                              int(length),
+                              int(first),
+                              max(shift, toggle_change),
+                              shift,
+                              toggle_change,
+                              new_values))
+
+    diff.candidates.sort(key=lambda candidate: (-candidate.score,
+                                                candidate.frame_id,
+                                                candidate.first_bit))
+
+    return diff
+
+
+def _load_capture(argument, format):
+    filename, start, stop = parse_capture(argument)
+
+    return load_capture(filename, start, stop, format, argument)
+
+
+def diff_logs(arguments: List[str],
+              processes: Optional[int] = None,
+              format: Optional[str] = None,
+              **kwargs) -> CaptureDiff:
+    """Load and compare the captures of given arguments, see
+    :func:`parse_capture()`, in a pool of `processes` processes (one
+    per CPU by default, at most one per capture, in this process if 1).
+    Keyword arguments are passed to :func:`diff_captures()`.
+
+    """
+
+    processes = min(processes or os.cpu_count() or 1, len(arguments))
+
+    if processes <= 1:
+        captures = [_load_capture(argument, format) for argument in arguments]
+    else:
+        with concurrent.futures.ProcessPoolExecutor(processes) as executor:
+            captures = list(executor.map(_load_capture,
+                                         arguments,
+                                         itertools.repeat(format)))
+
+    return diff_captures(captures, **kwargs)
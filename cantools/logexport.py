@@ -0,0 +1,577 @@
+"""Export of decoded log files to columnar files.
+
+Frames read from a log file (any format of :mod:`cantools.logformats`)
+are decoded with a database and written to one file per message, with a
+``timestamp`` column and one column per signal. Rows are buffered per
+message and written in row groups of `row_group_size` rows, so memory
+use is bounded by the number of messages times the row group size.
+
+Output formats are Parquet and Arrow IPC files, which require the
+pyarrow package, and compressed NumPy ``.npz`` archives, which require
+numpy. The npz archives hold one array per column and row group, named
+``<column>.<row group>``, use :func:`read_npz()` to concatenate them.
+:func:`read_columns()` reads the columns of files of any format.
+
+:func:`export_resampled()` instead writes all signals to one file,
+resampled onto a common time grid (see :mod:`cantools.resample`).
+
+>>> db = cantools.database.load_file('vehicle.dbc')
+>>> cantools.logexport.export_log('drive.blf', db, 'drive/')
+ExportSummary(frames=1200000, decoded=1187021, unknown=12979, errors=0)
+
+"""
+
+import os
+import tempfile
+import zipfile
+from typing import Dict, Iterable, Optional
+
+from .errors import Error
+from . import logformats
+from . import resample
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+FORMATS = ('parquet', 'arrow', 'npz')
+DEFAULT_ROW_GROUP_SIZE = 65536
+
+
+class ExportSummary:
+    """The number of frames read, decoded, of unknown frame ids and which
+    failed to decode, and the rows written and file of each
+    message."""
+
+    def __init__(self):
+        self.frames = 0
+        self.decoded = 0
+        self.unknown = 0
+        self.errors = 0
+        self.rows: Dict[str, int] = {}
+        self.files: Dict[str, str] = {}
+
+    def __repr__(self):
+        return 'ExportSummary(frames={}, decoded={}, unknown={}, errors={})'.format(
+            self.frames,
+            self.decoded,
+            self.unknown,
+            self.errors)
+
+
+def default_format():
+    """Returns 'parquet' if pyarrow is installed, otherwise 'npz'."""
+    if pyarrow is not None:
+        return 'parquet'
+
+    return 'npz'
+
+
+def _check_format(format):
+    if format not in FORMATS:
+        raise Error(
+            "expected format in {}, but got '{}'".format(FORMATS, format))
+
+    if format in ('parquet', 'arrow') and pyarrow is None:
+        raise Error(
+            "The pyarrow package is required for the {} format.".format(
+                format))
+
+    if format == 'npz' and np is None:
+        raise Error('The numpy package is required for the npz format.')
+
+
+def _column_type(signal, decode_choices, scaling):
+    """Returns 'str', 'int' or 'float'."""
+    if decode_choices and signal.choices:
+        return 'str'
+
+    if signal.is_float:
+        return 'float'
+
+    # Does not fit an int64 column.
+    if signal.length >= 64 and not signal.is_signed:
+        return 'float'
+
+    if not scaling:
+        return 'int'
+
+    for value in (signal.scale, signal.offset):
+        if not isinstance(value, int) \
+           and not (isinstance(value, float) and value.is_integer()):
+            return 'float'
+
+    return 'int'
+
+
+def _write_npz_row_group(archive, arrays, row_group):
+    for name, array in arrays.items():
+        entry = '{}.{:06d}.npy'.format(name, row_group)
+
+        with archive.open(entry, 'w', force_zip64=True) as fout:
+            np.lib.format.write_array(fout, array, allow_pickle=False)
+
+
+class _MessageWriter:
+    """Buffers the rows of one message and writes them in row groups."""
+
+    def __init__(self, path, format, message, signals, decode_choices, scaling):
+        self.path = path
+        self.format = format
+        self.names = [signal.name for signal in message.signals
+                      if signals is None or signal.name in signals]
+        self.types = {
+            signal.name: _column_type(signal, decode_choices, scaling)
+            for signal in message.signals
+        }
+        self.nullable = {
+            signal.name: signal.multiplexer_ids is not None
+            for signal in message.signals
+        }
+        self.timestamps = []
+        self.columns = {name: [] for name in self.names}
+        self.rows = 0
+        self.row_groups = 0
+        self._writer = None
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def append(self, timestamp, decoded):
+        self.timestamps.append(timestamp)
+
+        for name in self.names:
+            value = decoded.get(name)
+
+            # Choice values are NamedSignalValue objects.
+            if value is not None and self.types[name] == 'str':
+                value = str(value)
+
+            self.columns[name].append(value)
+
+    def _arrow_table(self):
+        arrow_types = {
+            'str': pyarrow.string(),
+            'int': pyarrow.int64(),
+            'float': pyarrow.float64()
+        }
+        arrays = [pyarrow.array(self.timestamps, type=pyarrow.float64())]
+        arrays += [
+            pyarrow.array(self.columns[name], type=arrow_types[self.types[name]])
+            for name in self.names
+        ]
+
+        return pyarrow.Table.from_arrays(arrays, ['timestamp'] + self.names)
+
+    def _numpy_arrays(self):
+        arrays = {
+            'timestamp': np.array([np.nan if timestamp is None else timestamp
+                                   for timestamp in self.timestamps],
+                                  dtype=np.float64)
+        }
+
+        for name in self.names:
+            values = self.columns[name]
+            column_type = self.types[name]
+
+            if column_type == 'str':
+                arrays[name] = np.array(['' if value is None else value
+                                         for value in values],
+                                        dtype=str)
+            elif column_type == 'int' and not self.nullable[name]:
+                arrays[name] = np.array(values, dtype=np.int64)
+            else:
+                arrays[name] = np.array([np.nan if value is None else value
+                                         for value in values],
+                                        dtype=np.float64)
+
+        return arrays
+
+    def flush(self):
+        if not self.timestamps:
+            return
+
+        if self.format == 'npz':
+            if self._writer is None:
+                self._writer = zipfile.ZipFile(self.path,
+                                               'w',
+                                               zipfile.ZIP_DEFLATED,
+                                               allowZip64=True)
+
+            _write_npz_row_group(self._writer,
+                                 self._numpy_arrays(),
+                                 self.row_groups)
+        else:
+            table = self._arrow_table()
+
+            if self._writer is None:
+                if self.format == 'parquet':
+                    self._writer = pyarrow.parquet.ParquetWriter(self.path,
+                                                                 table.schema)
+                else:
+                    self._writer = pyarrow.ipc.new_file(self.path, table.schema)
+
+            self._writer.write_table(table)
+
+        self.rows += len(self.timestamps)
+        self.row_groups += 1
+        self.timestamps = []
+        self.columns = {name: [] for name in self.names}
+
+    def close(self):
+        self.flush()
+
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+class SignalExporter:
+    """Decode frames with given database and write the signals of each
+    message to a file in `output_directory`, named after the message.
+
+    `signals` optionally selects the exported signals, as signal names
+    or ``'<message>.<signal>'``. Messages without selected signals are
+    not exported. Frames of unknown frame ids and frames which fail to
+    decode are counted and skipped.
+
+    """
+
+    def __init__(self,
+                 database,
+                 output_directory,
+                 format: Optional[str] = None,
+                 row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+                 signals: Optional[Iterable[str]] = None,
+                 decode_choices: bool = False,
+                 scaling: bool = True):
+        if format is None:
+            format = default_format()
+
+        _check_format(format)
+
+        self.database = database
+        self.output_directory = output_directory
+        self.format = format
+        self.row_group_size = row_group_size
+        self.decode_choices = decode_choices
+        self.scaling = scaling
+        self.summary = ExportSummary()
+        self._signals = None if signals is None else set(signals)
+        self._writers = {}
+        os.makedirs(output_directory, exist_ok=True)
+
+    def _selected_signals(self, message):
+        if self._signals is None:
+            return None
+
+        return frozenset([
+            signal.name for signal in message.signals
+            if signal.name in self._signals
+            or message.name + '.' + signal.name in self._signals
+        ])
+
+    def _create_writer(self, message):
+        signals = self._selected_signals(message)
+
+        if message.is_container or signals is not None and not signals:
+            return None
+
+        path = os.path.join(self.output_directory,
+                            '{}.{}'.format(message.name, self.format))
+        self.summary.files[message.name] = path
+
+        return (message,
+                signals,
+                _MessageWriter(path,
+                               self.format,
+                               message,
+                               signals,
+                               self.decode_choices,
+                               self.scaling))
+
+    def add_frames(self, frames: Iterable[logformats.Frame]):
+        get_message_by_frame_id = self.database.get_message_by_frame_id
+        writers = self._writers
+        summary = self.summary
+        decode_choices = self.decode_choices
+        scaling = self.scaling
+
+        for frame in frames:
+            summary.frames += 1
+
+            try:
+                entry = writers[frame.frame_id]
+            except KeyError:
+                try:
+                    message = get_message_by_frame_id(frame.frame_id)
+                except KeyError:
+                    message = None
+
+                if message is None:
+                    entry = None
+                else:
+                    entry = self._create_writer(message)
+
+                writers[frame.frame_id] = entry
+
+            if entry is None:
+                summary.unknown += 1
+                continue
+
+            message, signals, writer = entry
+
+            try:
+                decoded = message.decode(frame.data,
+                                         decode_choices,
+                                         scaling,
+                                         signals=signals)
+            except Exception:
+                summary.errors += 1
+                continue
+
+            summary.decoded += 1
+            writer.append(frame.timestamp, decoded)
+
+            if len(writer) >= self.row_group_size:
+                writer.flush()
+
+    def close(self):
+        """Write all buffered rows and close the files. Returns the
+        summary."""
+        for entry in self._writers.values():
+            if entry is not None:
+                message, _, writer = entry
+                writer.close()
+                self.summary.rows[message.name] = writer.rows
+
+        self._writers = {}
+
+        return self.summary
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def export_log(filename,
+               database,
+               output_directory,
+               format=None,
+               row_group_size=DEFAULT_ROW_GROUP_SIZE,
+               signals=None,
+               decode_choices=False,
+               scaling=True,
+               log_format=None):
+    """Decode given log file with given database and export its signals
+    to `output_directory`, see :class:`SignalExporter`. Returns an
+    :class:`ExportSummary`.
+
+    """
+
+    reader = logformats.open_log(filename, log_format)
+
+    with SignalExporter(database,
+                        output_directory,
+                        format,
+                        row_group_size,
+                        signals,
+                        decode_choices,
+                        scaling) as exporter:
+        for batch in reader.batches():
+            exporter.add_frames(batch)
+
+    return exporter.summary
+
+
+def _write_columns(path, format, columns, row_group_size):
+    """Write given dictionary of column names to arrays to one file."""
+    if format == 'npz':
+        arrays = {}
+
+        for name, array in columns.items():
+            if array.dtype.kind == 'O':
+                array = np.array(['' if value is None else str(value)
+                                  for value in array],
+                                 dtype=str)
+
+            arrays[name] = array
+
+        with zipfile.ZipFile(path,
+                             'w',
+                             zipfile.ZIP_DEFLATED,
+                             allowZip64=True) as archive:
+            length = len(arrays['timestamp'])
+
+            for row_group, start in enumerate(range(0, max(length, 1),
+                                                    row_group_size)):
+                _write_npz_row_group(
+                    archive,
+                    {name: array[start:start + row_group_size]
+                     for name, array in arrays.items()},
+                    row_group)
+    else:
+        table = pyarrow.table({name: pyarrow.array(array)
+                               for name, array in columns.items()})
+
+        if format == 'parquet':
+            pyarrow.parquet.write_table(table,
+                                        path,
+                                        row_group_size=row_group_size)
+        else:
+            with pyarrow.ipc.new_file(path, table.schema) as writer:
+                writer.write_table(table, max_chunksize=row_group_size)
+
+
+def export_resampled(filename,
+                     database,
+                     path,
+                     period=None,
+                     method='hold',
+                     max_age=None,
+                     format=None,
+                     row_group_size=DEFAULT_ROW_GROUP_SIZE,
+                     signals=None,
+                     decode_choices=False,
+                     scaling=True,
+                     log_format=None):
+    """Decode given log file with given database and write its signals,
+    resampled onto a common time grid, to one file at `path`. The
+    columns are ``timestamp`` and ``<message>.<signal>``. See
+    :func:`cantools.resample.align()` for `period`, `method` and
+    `max_age`.
+
+    The log is first exported to temporary npz files, so only the
+    decoded signals, as arrays, are held in memory. Returns an
+    :class:`ExportSummary`.
+
+    """
+
+    if format is None:
+        format = default_format()
+
+    _check_format(format)
+
+    with tempfile.TemporaryDirectory() as directory:
+        summary = export_log(filename,
+                             database,
+                             directory,
+                             'npz',
+                             row_group_size,
+                             signals,
+                             decode_choices,
+                             scaling,
+                             log_format)
+        series = {}
+
+        for name, npz_path in sorted(summary.files.items()):
+            if summary.rows[name] == 0:
+                continue
+
+            columns = read_npz(npz_path)
+            timestamps = columns.pop('timestamp')
+
+            for signal_name, values in columns.items():
+                # Empty strings are missing choice values.
+                if values.dtype.kind == 'U':
+                    values = values.astype(object)
+                    values[values == ''] = None
+
+                series[name + '.' + signal_name] = (timestamps, values)
+
+    grid, resampled = resample.align(series, period, method=method, max_age=max_age)
+    columns = {'timestamp': grid}
+    columns.update(resampled)
+    _write_columns(path, format, columns, row_group_size)
+    summary.files = {'resampled': path}
+    summary.rows = {'resampled': len(grid)}
+
+    return summary
+
+
+def read_npz(path, columns=None):
+    """Returns a dictionary of the columns of an exported npz file, with
+    the row groups concatenated. Only given `columns` are read, if
+    given."""
+    if np is None:
+        raise Error('The numpy package is required for the npz format.')
+
+    groups = {}
+
+    with np.load(path, allow_pickle=False) as archive:
+        for entry in sorted(archive.files):
+            name = entry.rsplit('.', 1)[0]
+
+            if columns is not None and name not in columns:
+                continue
+
+            groups.setdefault(name, []).append(archive[entry])
+
+    return {name: np.concatenate(arrays) for name, arrays in groups.items()}
+
+
+def _format_of_path(path):
+    format = os.path.splitext(path)[1][1:]
+    _check_format(format)
+
+    if format != 'npz' and pyarrow is None:
+        raise Error('The pyarrow package is required for the {} format.'.format(
+            format))
+
+    return format
+
+
+def column_names(path):
+    """Returns the column names of an exported Parquet, Arrow IPC or npz
+    file."""
+    format = _format_of_path(path)
+
+    if format == 'npz':
+        with zipfile.ZipFile(path) as archive:
+            names = [entry[:-len('.npy')].rsplit('.', 1)[0]
+                     for entry in archive.namelist()]
+
+        return list(dict.fromkeys(names))
+    elif format == 'parquet':
+        return pyarrow.parquet.read_schema(path).names
+    else:
+        return pyarrow.ipc.open_file(path).schema.names
+
+
+def read_columns(path, columns=None):
+    """Returns a dictionary of numpy arrays of the columns of an exported
+    Parquet, Arrow IPC or npz file. Only given `columns` are read, if
+    given. Missing values are NaN in numeric columns, and None (or an
+    empty string in npz files) in string columns."""
+    format = _format_of_path(path)
+
+    if format == 'npz':
+        return read_npz(path, columns)
+
+    if np is None:
+        raise Error('The numpy package is required to read columns.')
+
+    if format == 'parquet':
+        table = pyarrow.parquet.read_table(path, columns=columns)
+    else:
+        table = pyarrow.ipc.open_file(path).read_all()
+
+        if columns is not None:
+            table = table.select([name for name in columns
+                                  if name in table.column_names])
+
+    return {
+        name: table.column(name).to_numpy()
+        for name in table.column_names
+    }
@@ -0,0 +1,905 @@
+"""CAN log file formats.
+
+A registry of log file readers, which all yield batches (lists) of
+:class:`Frame` tuples. The format of a file is detected by sniffing its
+first few kilobytes, see :func:`detect_format()`.
+
+>>> reader = cantools.logformats.open_log('trace.blf')
+>>> for batch in reader.batches():
+        for frame in batch:
+            print(frame.timestamp, frame.frame_id, frame.data.hex())
+
+Supported formats are the oleomux CSV log, candump (all variants
+understood by :mod:`cantools.logreader`), Vector ASC, PCAN TRC (1.x
+and 2.x) and Vector BLF. Remote and error frames are skipped by all
+readers.
+
+"""
+
+import datetime
+import os
+import struct
+import zlib
+from typing import Any, Iterator, List, NamedTuple, Optional, Tuple
+
+from .errors import Error
+from .logreader import Parser, TimestampFormat
+
+
+SNIFF_SIZE = 8192
+DEFAULT_BATCH_SIZE = 4096
+
+# The CAN FD data length codes.
+DLC_TO_LENGTH = [0, 1, 2, 3, 4, 5, 6, 7, 8, 12, 16, 20, 24, 32, 48, 64]
+
+# 1991-01-01 00:00:00, see logreader.CandumpTimestampedPattern.
+_ABSOLUTE_TIMESTAMP_LIMIT = 662688000
+
+
+class UnsupportedLogFormatError(Error):
+    """This exception is raised when the format of a log file could not
+    be detected, or no reader is registered for a format name.
+
+    """
+
+    pass
+
+
+class Frame(NamedTuple):
+    """A frame read from a log file. `timestamp` is in seconds, absolute
+    (since the epoch) or relative to the start of the log, see
+    :attr:`LogFormat.timestamp_format`, or None if the log has no
+    timestamps.
+
+    """
+
+    timestamp: Optional[float]
+    channel: str
+    frame_id: int
+    data: bytes
+    is_extended_frame: bool = False
+    is_fd: bool = False
+
+
+FrameBatch = List[Frame]
+
+
+def _timestamp_format(timestamp):
+    if timestamp is None:
+        return TimestampFormat.MISSING
+    elif timestamp < _ABSOLUTE_TIMESTAMP_LIMIT:
+        return TimestampFormat.RELATIVE
+    else:
+        return TimestampFormat.ABSOLUTE
+
+
+class LogFormat:
+    """Base class of log file readers.
+
+    Subclasses set `name` and `extensions`, implement :meth:`sniff()`
+    and either :meth:`parse_line()` (text formats) or
+    :meth:`batches_at()`. Readers which carry state from frame to frame
+    (for example relative timestamps) implement :meth:`get_state()` and
+    :meth:`set_state()`.
+
+    """
+
+    name = None
+    extensions = ()
+    encoding = 'utf-8'
+    timestamp_format = TimestampFormat.RELATIVE
+
+    def __init__(self, filename, batch_size=DEFAULT_BATCH_SIZE):
+        self.filename = filename
+        self.batch_size = batch_size
+        self.start_time = None
+
+    @classmethod
+    def sniff(cls, head: bytes) -> bool:
+        """Returns True if `head`, the first bytes of a file, look like
+        this format."""
+        raise NotImplementedError
+
+    @classmethod
+    def _head_lines(cls, head):
+        lines = head.decode(cls.encoding, errors='replace').splitlines()
+
+        # The last line may be cut.
+        if len(lines) > 1:
+            del lines[-1]
+
+        return [line.strip() for line in lines if line.strip()]
+
+    def parse_line(self, line: str) -> Optional[Frame]:
+        """Returns the frame in given line, or None if the line is not a
+        frame. Called for all lines, in order."""
+        raise NotImplementedError
+
+    def get_state(self) -> Any:
+        """Returns the state parsing must be resumed with after the lines
+        read so far, as a JSON serialisable value, or None if the frames
+        of the format do not depend on earlier frames."""
+        return None
+
+    def set_state(self, state: Any) -> None:
+        """Restore a state returned by :meth:`get_state()`."""
+        pass
+
+    def _read_lines(self, fin):
+        """Returns the next block of lines of the binary file `fin`,
+        decoded, or None at the end of the file."""
+        lines = fin.readlines(1 << 20)
+
+        if not lines:
+            return None
+
+        return b''.join(lines).decode(self.encoding, errors='replace').split('\n')
+
+    def batches_at(self,
+                   offset: int = 0,
+                   state: Any = None) -> Iterator[Tuple[int, Any, FrameBatch]]:
+        """Returns a generator that yields ``(offset, state, batch)``
+        tuples, where `batch` is a list of about `batch_size` frames and
+        `offset` and `state` the file offset and parser state reading
+        must start with to read the batch again, see
+        :mod:`cantools.logindex`. Reading starts at given `offset` and
+        `state`, which must be values yielded earlier.
+
+        """
+
+        parse_line = self.parse_line
+        batch = []
+
+        with open(self.filename, 'rb', buffering=1 << 20) as fin:
+            if offset > 0:
+                # Parse the header (base, columns, layout, ...) first. The
+                # frames of the first block change the state, which is
+                # restored afterwards.
+                for line in self._read_lines(fin) or []:
+                    parse_line(line)
+
+                fin.seek(offset)
+                self.set_state(state)
+
+            batch_offset = offset
+            batch_state = self.get_state()
+
+            while True:
+                lines = self._read_lines(fin)
+
+                if lines is None:
+                    break
+
+                for line in lines:
+                    frame = parse_line(line)
+
+                    if frame is not None:
+                        batch.append(frame)
+
+                if len(batch) >= self.batch_size:
+                    yield batch_offset, batch_state, batch
+                    batch = []
+                    batch_offset = fin.tell()
+                    batch_state = self.get_state()
+
+        if batch:
+            yield batch_offset, batch_state, batch
+
+    def batches(self, offset: int = 0, state: Any = None) -> Iterator[FrameBatch]:
+        """Returns a generator that yields lists of about `batch_size`
+        frames, starting at given file offset and parser state."""
+        for _, _, batch in self.batches_at(offset, state):
+            yield batch
+
+    def __iter__(self) -> Iterator[Frame]:
+        for batch in self.batches():
+            yield from batch
+
+
+class CsvLogFormat(LogFormat):
+    """The space separated log written by oleomux, with an optional
+    timestamp and bus column before the frame id and data bytes, all
+    decimal or all hexadecimal with a ``0x`` prefix. The layout is
+    detected from the first line, as oleomux does. Timestamps without a
+    decimal point are milliseconds.
+
+    """
+
+    name = 'csv'
+    extensions = ('.csv', '.log')
+
+    def __init__(self, filename, batch_size=DEFAULT_BATCH_SIZE):
+        super().__init__(filename, batch_size)
+        self._offset = None
+        self._is_timestamped = False
+        self._is_bussed = False
+        self._base = 10
+        self.timestamp_format = TimestampFormat.MISSING
+
+    @classmethod
+    def sniff(cls, head):
+        lines = cls._head_lines(head)
+
+        if not lines:
+            return False
+
+        for line in lines[:10]:
+            tokens = line.replace('|', '').split(' ')
+
+            if len(tokens) < 2:
+                return False
+
+            for index, token in enumerate(tokens):
+                if token == '':
+                    continue
+
+                try:
+                    if token.startswith('0x'):
+                        int(token, 16)
+                    else:
+                        float(token)
+                except ValueError:
+                    # Only the bus column may hold a name.
+                    if index != 1:
+                        return False
+
+        return True
+
+    def _detect_layout(self, tokens):
+        offset = 0
+
+        if len(tokens[0]) > 4:
+            self._is_timestamped = True
+            offset += 1
+
+            if len(tokens[1]) > 4:
+                self._is_bussed = True
+                offset += 1
+
+        if any(['0x' in token for token in tokens[offset:]]):
+            self._base = 16
+
+        self._offset = offset
+
+    def parse_line(self, line):
+        tokens = line.strip('\r\n').replace('|', '').split(' ')
+
+        if len(tokens) < 2:
+            return None
+
+        if self._offset is None:
+            self._detect_layout(tokens)
+
+        offset = self._offset
+        base = self._base
+
+        try:
+            frame_id = int(tokens[offset], base)
+            data = bytes([int(token, base)
+                          for token in tokens[offset + 1:]
+                          if token != ''])
+
+            if self._is_timestamped:
+                timestamp = float(tokens[0])
+
+                if '.' not in tokens[0]:
+                    timestamp /= 1000
+
+                if self.timestamp_format is TimestampFormat.MISSING:
+                    self.timestamp_format = _timestamp_format(timestamp)
+            else:
+                timestamp = None
+        except (ValueError, IndexError):
+            return None
+
+        if self._is_bussed:
+            channel = tokens[1]
+        else:
+            channel = ''
+
+        return Frame(timestamp, channel, frame_id, data, frame_id > 0x7ff)
+
+
+class CandumpLogFormat(LogFormat):
+    """Logs written by candump, both the log file format (``-l``) and
+    the console formats, with or without timestamps.
+
+    """
+
+    name = 'candump'
+    extensions = ('.log', '.txt', '.dmp')
+
+    def __init__(self, filename, batch_size=DEFAULT_BATCH_SIZE):
+        super().__init__(filename, batch_size)
+        self.timestamp_format = None
+
+    @classmethod
+    def sniff(cls, head):
+        return any([Parser.detect_pattern(line) is not None
+                    for line in cls._head_lines(head)[:10]])
+
+    def _set_timestamp_format(self, timestamp):
+        if self.timestamp_format is None:
+            self.timestamp_format = _timestamp_format(timestamp)
+
+    def parse_line(self, line):
+        tokens = line.split()
+
+        if len(tokens) < 3:
+            return None
+
+        timestamp = None
+
+        if tokens[0][0] == '(':
+            if tokens[0][-1] == ')':
+                try:
+                    timestamp = float(tokens[0][1:-1])
+                except ValueError:
+                    return None
+            else:
+                # (2020-12-19 12:04:45.485261)
+                try:
+                    timestamp = datetime.datetime.strptime(
+                        tokens[0][1:] + ' ' + tokens[1][:-1],
+                        '%Y-%m-%d %H:%M:%S.%f').timestamp()
+                except ValueError:
+                    return None
+
+                del tokens[1]
+
+            del tokens[0]
+
+        self._set_timestamp_format(timestamp)
+
+        if len(tokens) < 2:
+            return None
+
+        channel = tokens[0]
+
+        try:
+            if '#' in tokens[1]:
+                # can0 123#DEADBEEF, can0 123##1DEADBEEF, can0 123#R
+                ident, _, data = tokens[1].partition('#')
+                is_fd = data[:1] == '#'
+
+                if is_fd:
+                    data = data[2:]
+                elif data[:1] == 'R':
+                    return None
+
+                frame_id = int(ident, 16)
+                data = bytes.fromhex(data)
+            else:
+                # can0  123   [8]  DE AD BE EF 00 00 00 00   '....'
+                ident = tokens[1]
+                length = tokens[2]
+
+                if length[0] != '[' or length[-1] != ']':
+                    return None
+
+                length = int(length[1:-1])
+
+                if len(tokens) > 3 and tokens[3] == 'remote':
+                    return None
+
+                is_fd = length > 8
+                frame_id = int(ident, 16)
+                data = bytes.fromhex(''.join(tokens[3:3 + length]))
+        except ValueError:
+            return None
+
+        is_extended_frame = len(ident) > 3
+
+        if is_extended_frame and frame_id & 0x20000000:
+            # An error frame.
+            return None
+
+        return Frame(timestamp, channel, frame_id, data, is_extended_frame, is_fd)
+
+
+class AscLogFormat(LogFormat):
+    """Vector ASC logs, classic CAN and CAN FD frames, in hexadecimal or
+    decimal base and with absolute or relative (delta) timestamps.
+    Timestamps are seconds since the start of the measurement.
+
+    """
+
+    name = 'asc'
+    extensions = ('.asc',)
+
+    def __init__(self, filename, batch_size=DEFAULT_BATCH_SIZE):
+        super().__init__(filename, batch_size)
+        self._base = 16
+        self._delta_timestamps = False
+        self._timestamp = 0.0
+
+    @classmethod
+    def sniff(cls, head):
+        for line in cls._head_lines(head)[:20]:
+            if line.startswith(('date ', 'base ', 'Begin Triggerblock')):
+                return True
+
+        return False
+
+    def _parse_header(self, tokens):
+        if tokens[0] == 'base':
+            self._base = 10 if tokens[1] == 'dec' else 16
+
+            if len(tokens) >= 4 and tokens[2] == 'timestamps':
+                self._delta_timestamps = (tokens[3] == 'relative')
+
+    def get_state(self):
+        # The time of the last frame, to add the next delta to.
+        if self._delta_timestamps:
+            return self._timestamp
+
+        return None
+
+    def set_state(self, state):
+        if state is not None:
+            self._timestamp = state
+
+    def _parse_id(self, token):
+        if token[-1] in 'xX':
+            return int(token[:-1], self._base), True
+        else:
+            return int(token, self._base), False
+
+    def parse_line(self, line):
+        tokens = line.split()
+
+        if len(tokens) < 6:
+            if tokens and tokens[0] == 'base':
+                self._parse_header(tokens)
+
+            return None
+
+        try:
+            timestamp = float(tokens[0])
+        except ValueError:
+            self._parse_header(tokens)
+
+            return None
+
+        try:
+            if tokens[1] == 'CANFD':
+                # <time> CANFD <channel> <dir> <id> [<name>] <brs> <esi>
+                # <dlc> <length> <data>
+                if tokens[5] in ('0', '1'):
+                    index = 5
+                else:
+                    index = 6
+
+                frame_id, is_extended_frame = self._parse_id(tokens[4])
+                length = int(tokens[index + 3])
+                data = tokens[index + 4:index + 4 + length]
+                is_fd = True
+                channel = tokens[2]
+            elif tokens[1].isdigit():
+                # <time> <channel> <id> <dir> d <dlc> <data>
+                if tokens[4] != 'd':
+                    return None
+
+                frame_id, is_extended_frame = self._parse_id(tokens[2])
+                length = int(tokens[5], 16)
+                data = tokens[6:6 + length]
+                is_fd = False
+                channel = tokens[1]
+            else:
+                return None
+
+            data = bytes([int(value, self._base) for value in data])
+        except (ValueError, IndexError):
+            return None
+
+        if self._delta_timestamps:
+            self._timestamp += timestamp
+            timestamp = self._timestamp
+
+        return Frame(timestamp, channel, frame_id, data, is_extended_frame, is_fd)
+
+
+class TrcLogFormat(LogFormat):
+    """PCAN TRC logs, versions 1.0 to 2.1. Timestamps are seconds since
+    the start of the log, :attr:`start_time` is set from the
+    ``$STARTTIME`` header if present.
+
+    """
+
+    name = 'trc'
+    extensions = ('.trc',)
+
+    # Column letters per file version, as in the $COLUMNS header of
+    # version 2.1 files.
+    COLUMNS = {
+        '1.0': 'NOILD',
+        '1.1': 'NOdILD',
+        '1.2': 'NOBdILD',
+        '1.3': 'NOBdIRLD',
+        '2.0': 'NOTIdLD',
+        '2.1': 'NOTBIdRLD'
+    }
+
+    DATA_TYPES = ('DT', 'FD', 'FB', 'FE', 'BI')
+
+    def __init__(self, filename, batch_size=DEFAULT_BATCH_SIZE):
+        super().__init__(filename, batch_size)
+        self._version = '1.0'
+        self._columns = None
+
+    @classmethod
+    def sniff(cls, head):
+        lines = cls._head_lines(head)
+
+        if not lines:
+            return False
+
+        return lines[0].startswith((';$FILEVERSION', ';###'))
+
+    def _parse_header(self, line):
+        if line.startswith(';$FILEVERSION='):
+            self._version = line[14:].strip()
+        elif line.startswith(';$STARTTIME='):
+            # Days since 1899-12-30.
+            days = float(line[12:].strip())
+            self.start_time = (days - 25569) * 86400
+        elif line.startswith(';$COLUMNS='):
+            self._columns = {
+                column: index
+                for index, column in enumerate(line[10:].strip().split(','))
+            }
+
+    def _create_columns(self):
+        columns = self.COLUMNS.get(self._version, self.COLUMNS['2.1'])
+        self._columns = {column: index for index, column in enumerate(columns)}
+
+    def parse_line(self, line):
+        if line[:1] == ';':
+            self._parse_header(line)
+
+            return None
+
+        tokens = line.split()
+
+        if not tokens:
+            return None
+
+        if self._columns is None:
+            self._create_columns()
+
+        columns = self._columns
+
+        try:
+            if 'T' in columns and tokens[columns['T']] not in self.DATA_TYPES:
+                return None
+
+            if 'B' in columns:
+                channel = tokens[columns['B']]
+            else:
+                channel = ''
+
+            ident = tokens[columns['I']]
+            frame_id = int(ident, 16)
+            length = int(tokens[columns['L']])
+            is_fd = False
+
+            if 'T' in columns:
+                is_fd = tokens[columns['T']] != 'DT'
+
+                if is_fd:
+                    length = DLC_TO_LENGTH[length]
+
+            index = columns['D']
+
+            if tokens[index:index + 1] == ['RTR']:
+                return None
+
+            data = bytes.fromhex(''.join(tokens[index:index + length]))
+            timestamp = float(tokens[columns['O']]) / 1000
+        except (ValueError, IndexError, KeyError):
+            return None
+
+        if frame_id == 0xffffffff:
+            # An error frame.
+            return None
+
+        return Frame(timestamp, channel, frame_id, data, len(ident) > 4, is_fd)
+
+
+class BlfLogFormat(LogFormat):
+    """Vector BLF logs, read object by object with zlib compressed log
+    containers decompressed one at a time. Timestamps are absolute.
+
+    """
+
+    name = 'blf'
+    extensions = ('.blf',)
+    timestamp_format = TimestampFormat.ABSOLUTE
+
+    FILE_HEADER = struct.Struct('<4sLBBBBBBBBQQLL8H8H')
+    OBJECT_HEADER_BASE = struct.Struct('<4sHHLL')
+    OBJECT_HEADER_V1 = struct.Struct('<LHHQ')
+    OBJECT_HEADER_V2 = struct.Struct('<LBxHQ8x')
+    LOG_CONTAINER = struct.Struct('<H6xL4x')
+    CAN_MESSAGE = struct.Struct('<HBBL8s')
+    CAN_FD_MESSAGE = struct.Struct('<HBBLLBBB5x64s')
+    CAN_FD_MESSAGE_64 = struct.Struct('<BBBBLLLLLLLHBBL')
+
+    OBJECT_TYPE_CAN_MESSAGE = 1
+    OBJECT_TYPE_LOG_CONTAINER = 10
+    OBJECT_TYPE_CAN_MESSAGE2 = 86
+    OBJECT_TYPE_CAN_FD_MESSAGE = 100
+    OBJECT_TYPE_CAN_FD_MESSAGE_64 = 101
+
+    NO_COMPRESSION = 0
+    ZLIB_DEFLATE = 2
+
+    @classmethod
+    def sniff(cls, head):
+        return head[:4] == b'LOGG'
+
+    def _read_file_header(self, fin):
+        header = self.FILE_HEADER.unpack(fin.read(self.FILE_HEADER.size))
+
+        if header[0] != b'LOGG':
+            raise Error('Invalid BLF file signature {!r}.'.format(header[0]))
+
+        year, month, _, day, hour, minute, second, milliseconds = header[14:22]
+
+        try:
+            self.start_time = datetime.datetime(
+                year,
+                month,
+                day,
+                hour,
+                minute,
+                second,
+                milliseconds * 1000,
+                tzinfo=datetime.timezone.utc).timestamp()
+        except ValueError:
+            self.start_time = 0.0
+
+        fin.seek(header[1])
+
+    def _parse_objects(self, data, frames):
+        """Parse all complete objects in `data`, appending frames to
+        `frames`. Returns the offset of the first incomplete object."""
+        unpack_base = self.OBJECT_HEADER_BASE.unpack_from
+        unpack_v1 = self.OBJECT_HEADER_V1.unpack_from
+        unpack_v2 = self.OBJECT_HEADER_V2.unpack_from
+        unpack_can = self.CAN_MESSAGE.unpack_from
+        unpack_can_fd = self.CAN_FD_MESSAGE.unpack_from
+        unpack_can_fd_64 = self.CAN_FD_MESSAGE_64.unpack_from
+        can_fd_64_size = self.CAN_FD_MESSAGE_64.size
+        start_time = self.start_time
+        end = len(data)
+        pos = 0
+
+        while True:
+            # Objects are padded, find the next one.
+            found = data.find(b'LOBJ', pos, pos + 8)
+
+            if found == -1:
+                if pos + 8 > end:
+                    # Continued in the next container.
+                    return pos
+
+                raise Error('Could not find the next BLF object.')
+
+            pos = found
+
+            if pos + 16 > end:
+                return pos
+
+            _, header_size, header_version, size, object_type = \
+                unpack_base(data, pos)
+            next_pos = pos + size
+
+            if next_pos > end:
+                return pos
+
+            if header_version == 1:
+                flags, _, _, timestamp = unpack_v1(data, pos + 16)
+            elif header_version == 2:
+                flags, _, _, timestamp = unpack_v2(data, pos + 16)
+            else:
+                pos = next_pos
+                continue
+
+            if flags == 1:
+                timestamp = timestamp * 1e-5 + start_time
+            else:
+                timestamp = timestamp * 1e-9 + start_time
+
+            body = pos + header_size
+
+            if object_type in (self.OBJECT_TYPE_CAN_MESSAGE,
+                               self.OBJECT_TYPE_CAN_MESSAGE2):
+                channel, flags, dlc, can_id, can_data = unpack_can(data, body)
+
+                if not flags & 0x80:
+                    frames.append(Frame(timestamp,
+                                        str(channel),
+                                        can_id & 0x1fffffff,
+                                        can_data[:dlc],
+                                        bool(can_id & 0x80000000)))
+            elif object_type == self.OBJECT_TYPE_CAN_FD_MESSAGE:
+                (channel,
+                 flags,
+                 _,
+                 can_id,
+                 _,
+                 _,
+                 fd_flags,
+                 length,
+                 can_data) = unpack_can_fd(data, body)
+
+                if not flags & 0x80:
+                    frames.append(Frame(timestamp,
+                                        str(channel),
+                                        can_id & 0x1fffffff,
+                                        can_data[:length],
+                                        bool(can_id & 0x80000000),
+                                        bool(fd_flags & 0x1)))
+            elif object_type == self.OBJECT_TYPE_CAN_FD_MESSAGE_64:
+                members = unpack_can_fd_64(data, body)
+                channel = members[0]
+                length = members[2]
+                can_id = members[4]
+                fd_flags = members[6]
+                data_offset = members[13]
+
+                if not fd_flags & 0x0010:
+                    length = min(length,
+                                 (data_offset or size) - header_size - can_fd_64_size)
+                    start = body + can_fd_64_size
+                    frames.append(Frame(timestamp,
+                                        str(channel),
+                                        can_id & 0x1fffffff,
+                                        bytes(data[start:start + length]),
+                                        bool(can_id & 0x80000000),
+                                        bool(fd_flags & 0x1000)))
+
+            pos = next_pos
+
+    def batches_at(self, offset=0, state=None):
+        # A non-zero offset is that of the last container of an earlier
+        # batch. Its complete objects were in that batch, only the
+        # object continued in the next container is read again.
+        unpack_base = self.OBJECT_HEADER_BASE.unpack
+        unpack_container = self.LOG_CONTAINER.unpack_from
+        tail = b''
+        batch = []
+        skipped = []
+
+        with open(self.filename, 'rb', buffering=1 << 20) as fin:
+            self._read_file_header(fin)
+
+            if offset > 0:
+                fin.seek(offset)
+
+            batch_offset = offset
+
+            while True:
+                object_offset = fin.tell()
+                header = fin.read(16)
+
+                if len(header) < 16:
+                    break
+
+                signature, _, _, size, object_type = unpack_base(header)
+
+                if signature != b'LOBJ':
+                    raise Error('Invalid BLF object signature {!r}.'.format(
+                        signature))
+
+                body = fin.read(size - 16)
+                fin.seek(size % 4, os.SEEK_CUR)
+
+                if object_type == self.OBJECT_TYPE_LOG_CONTAINER:
+                    method, _ = unpack_container(body)
+                    payload = body[self.LOG_CONTAINER.size:]
+
+                    if method == self.ZLIB_DEFLATE:
+                        payload = zlib.decompress(payload)
+                    elif method != self.NO_COMPRESSION:
+                        continue
+                else:
+                    payload = header + body + (size % 4) * b'\x00'
+
+                if object_offset == offset and offset > 0:
+                    # The container may start with the end of an object
+                    # from the container before it.
+                    payload = payload[max(payload.find(b'LOBJ'), 0):]
+                    pos = self._parse_objects(payload, skipped)
+                    tail = payload[pos:]
+                    continue
+
+                data = tail + payload
+                pos = self._parse_objects(data, batch)
+                tail = data[pos:]
+
+                if len(batch) >= self.batch_size:
+                    yield batch_offset, None, batch
+                    batch = []
+                    batch_offset = object_offset
+
+        if batch:
+            yield batch_offset, None, batch
+
+
+_FORMATS = []
+
+
+def register_format(format_class):
+    """Register given :class:`LogFormat` subclass. Formats are sniffed
+    in registration order, so more specific formats must be registered
+    first. Returns the class, so it may be used as a decorator.
+
+    """
+
+    if format_class not in _FORMATS:
+        _FORMATS.append(format_class)
+
+    return format_class
+
+
+def get_formats():
+    """Returns the registered formats, in sniffing order."""
+    return list(_FORMATS)
+
+
+def get_format(name):
+    """Returns the registered format with given name."""
+    for format_class in _FORMATS:
+        if format_class.name == name:
+            return format_class
+
+    raise UnsupportedLogFormatError(
+        "Unsupported log format '{}', expected one of {}.".format(
+            name,
+            ', '.join([format_class.name for format_class in _FORMATS])))
+
+
+def detect_format(filename):
+    """Returns the format of given log file, detected from its first
+    :data:`SNIFF_SIZE` bytes. Formats matching the file extension are
+    tried first.
+
+    """
+
+    with open(filename, 'rb') as fin:
+        head = fin.read(SNIFF_SIZE)
+
+    extension = os.path.splitext(filename)[1].lower()
+    candidates = sorted(_FORMATS,
+                        key=lambda format_class:
+                        extension not in format_class.extensions)
+
+    for format_class in candidates:
+        if format_class.sniff(head):
+            return format_class
+
+    raise UnsupportedLogFormatError(
+        "Unable to detect the format of log file '{}'.".format(filename))
+
+
+def open_log(filename, format=None, batch_size=DEFAULT_BATCH_SIZE):
+    """Returns a reader of given log file. The format is detected if
+    `format` is None, otherwise it is the name of a registered format.
+
+    """
+
+    if format is None:
+        format_class = detect_format(filename)
+    else:
+        format_class = get_format(format)
+
+    return format_class(filename, batch_size)
+
+
+register_format(BlfLogFormat)
+register_format(AscLogFormat)
+register_format(TrcLogFormat)
+register_format(CandumpLogFormat)
+register_format(CsvLogFormat)
@@ -0,0 +1,310 @@
+"""Sidecar indexes of CAN log files.
+
+An index holds a summary of a log file, collected in one pass: the
+number of frames per frame id, their first and last timestamp, data
+lengths and minimum and maximum inter-arrival time, and checkpoints
+(file offsets and parser states) reading can be resumed at.
+
+The index is saved next to the log file (``<log file>.index.json``)
+and reused as long as the size and modification time of the log file
+are unchanged.
+
+>>> index = cantools.logindex.load_index('overnight.blf')
+>>> for frame_id, statistics in sorted(index.ids.items()):
+        print(f'{frame_id:x}: {statistics.count}')
+>>> offset, state = index.position_at_time(3600.0)
+>>> for batch in cantools.logformats.open_log('overnight.blf').batches(offset, state):
+        ...
+
+"""
+
+import bisect
+import json
+import os
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from . import logformats
+
+
+SIDECAR_SUFFIX = '.index.json'
+VERSION = 2
+
+
+class Checkpoint(NamedTuple):
+    """A file offset and parser state reading can be resumed with, see
+    :meth:`cantools.logformats.LogFormat.batches()`, with the number of
+    the first frame read from it and its timestamp."""
+    frame_number: int
+    offset: int
+    timestamp: Optional[float]
+    state: Any = None
+
+
+class IdStatistics:
+    """Statistics of one frame id in a log file. Timestamps and
+    intervals are None if the log has no timestamps."""
+
+    def __init__(self, frame_id):
+        self.frame_id = frame_id
+        self.count = 0
+        self.first_timestamp = None
+        self.last_timestamp = None
+        self.lengths = set()
+        self.min_interval = None
+        self.max_interval = None
+
+    @property
+    def mean_interval(self):
+        if self.count < 2 or self.first_timestamp is None:
+            return None
+
+        return (self.last_timestamp - self.first_timestamp) / (self.count - 1)
+
+    def to_json(self):
+        return {
+            'count': self.count,
+            'first_timestamp': self.first_timestamp,
+            'last_timestamp': self.last_timestamp,
+            'lengths': sorted(self.lengths),
+            'min_interval': self.min_interval,
+            'max_interval': self.max_interval
+        }
+
+    @classmethod
+    def from_json(cls, frame_id, data):
+        statistics = cls(frame_id)
+        statistics.count = data['count']
+        statistics.first_timestamp = data['first_timestamp']
+        statistics.last_timestamp = data['last_timestamp']
+        statistics.lengths = set(data['lengths'])
+        statistics.min_interval = data['min_interval']
+        statistics.max_interval = data['max_interval']
+
+        return statistics
+
+    def __repr__(self):
+        return 'IdStatistics(frame_id=0x{:x}, count={}, lengths={})'.format(
+            self.frame_id,
+            self.count,
+            sorted(self.lengths))
+
+
+class LogIndex:
+    """The index of a log file, see :func:`build_index()` and
+    :func:`load_index()`."""
+
+    def __init__(self, filename, format_name, size, mtime):
+        self.filename = filename
+        self.format_name = format_name
+        self.size = size
+        self.mtime = mtime
+        self.frames = 0
+        self.first_timestamp = None
+        self.last_timestamp = None
+        self.ids: Dict[int, IdStatistics] = {}
+        self.checkpoints: List[Checkpoint] = []
+
+    def is_valid(self):
+        """Returns True if the log file has the size and modification time
+        it had when it was indexed."""
+        try:
+            stat = os.stat(self.filename)
+        except OSError:
+            return False
+
+        return stat.st_size == self.size and stat.st_mtime == self.mtime
+
+    def _add_batch(self, offset, state, batch):
+        timestamp = batch[0].timestamp if batch else None
+        self.checkpoints.append(Checkpoint(self.frames, offset, timestamp, state))
+        ids = self.ids
+
+        for frame in batch:
+            try:
+                statistics = ids[frame.frame_id]
+            except KeyError:
+                statistics = IdStatistics(frame.frame_id)
+                ids[frame.frame_id] = statistics
+
+            statistics.count += 1
+            statistics.lengths.add(len(frame.data))
+            timestamp = frame.timestamp
+
+            if timestamp is None:
+                continue
+
+            last_timestamp = statistics.last_timestamp
+
+            if last_timestamp is None:
+                statistics.first_timestamp = timestamp
+            else:
+                interval = timestamp - last_timestamp
+
+                if statistics.min_interval is None:
+                    statistics.min_interval = interval
+                    statistics.max_interval = interval
+                elif interval < statistics.min_interval:
+                    statistics.min_interval = interval
+                elif interval > statistics.max_interval:
+                    statistics.max_interval = interval
+
+            statistics.last_timestamp = timestamp
+
+        self.frames += len(batch)
+
+        if batch and batch[0].timestamp is not None:
+            if self.first_timestamp is None:
+                self.first_timestamp = batch[0].timestamp
+
+            self.last_timestamp = batch[-1].timestamp
+
+    def checkpoint_at_time(self, timestamp):
+        """Returns the last checkpoint at or before given timestamp, or
+        the first checkpoint."""
+        timestamps = [checkpoint.timestamp
+                      if checkpoint.timestamp is not None
+                      else float('-inf')
+                      for checkpoint in self.checkpoints]
+        index = bisect.bisect_right(timestamps, timestamp) - 1
+
+        return self.checkpoints[max(index, 0)]
+
+    def checkpoint_at_frame(self, frame_number):
+        """Returns the last checkpoint at or before given frame number."""
+        frame_numbers = [checkpoint.frame_number
+                         for checkpoint in self.checkpoints]
+        index = bisect.bisect_right(frame_numbers, frame_number) - 1
+
+        return self.checkpoints[max(index, 0)]
+
+    def offset_at_time(self, timestamp):
+        if not self.checkpoints:
+            return 0
+
+        return self.checkpoint_at_time(timestamp).offset
+
+    def position_at_time(self, timestamp):
+        """Returns the file offset and parser state reading must start
+        with to read the frames from given timestamp."""
+        if not self.checkpoints:
+            return 0, None
+
+        checkpoint = self.checkpoint_at_time(timestamp)
+
+        return checkpoint.offset, checkpoint.state
+
+    def to_json(self):
+        return {
+            'version': VERSION,
+            'format': self.format_name,
+            'size': self.size,
+            'mtime': self.mtime,
+            'frames': self.frames,
+            'first_timestamp': self.first_timestamp,
+            'last_timestamp': self.last_timestamp,
+            'ids': {
+                str(frame_id): statistics.to_json()
+                for frame_id, statistics in self.ids.items()
+            },
+            'checkpoints': [list(checkpoint) for checkpoint in self.checkpoints]
+        }
+
+    @classmethod
+    def from_json(cls, filename, data):
+        index = cls(filename, data['format'], data['size'], data['mtime'])
+        index.frames = data['frames']
+        index.first_timestamp = data['first_timestamp']
+        index.last_timestamp = data['last_timestamp']
+        index.ids = {
+            int(frame_id): IdStatistics.from_json(int(frame_id), statistics)
+            for frame_id, statistics in data['ids'].items()
+        }
+        index.checkpoints = [
+            Checkpoint(*checkpoint) for checkpoint in data['checkpoints']
+        ]
+
+        return index
+
+    def save(self, path=None):
+        """Save the index to given path, by default the sidecar file of the
+        log file."""
+        if path is None:
+            path = sidecar_path(self.filename)
+
+        with open(path, 'w') as fout:
+            json.dump(self.to_json(), fout)
+
+    def __repr__(self):
+        return "LogIndex('{}', format='{}', frames={}, ids={})".format(
+            self.filename,
+            self.format_name,
+            self.frames,
+            len(self.ids))
+
+
+def sidecar_path(filename):
+    return filename + SIDECAR_SUFFIX
+
+
+def build_index(filename, format=None, checkpoint_interval=None):
+    """Read given log file once and return its index. A checkpoint is
+    added about every `checkpoint_interval` frames (at most once per
+    MiB of text logs, and per container of BLF logs).
+
+    """
+
+    if checkpoint_interval is None:
+        checkpoint_interval = logformats.DEFAULT_BATCH_SIZE
+
+    reader = logformats.open_log(filename, format, checkpoint_interval)
+    stat = os.stat(filename)
+    index = LogIndex(filename, reader.name, stat.st_size, stat.st_mtime)
+
+    for offset, state, batch in reader.batches_at():
+        index._add_batch(offset, state, batch)
+
+    return index
+
+
+def read_index(filename):
+    """Returns the saved index of given log file, or None if there is
+    none or it is outdated."""
+    try:
+        with open(sidecar_path(filename)) as fin:
+            data = json.load(fin)
+    except (OSError, ValueError):
+        return None
+
+    if data.get('version') != VERSION:
+        return None
+
+    index = LogIndex.from_json(filename, data)
+
+    if not index.is_valid():
+        return None
+
+    return index
+
+
+def load_index(filename, format=None, rebuild=False, save=True):
+    """Returns the index of given log file. The saved index is used if it
+    is up to date, otherwise the log file is indexed and, if `save` is
+    True, the index saved next to it (if the directory is writable).
+
+    """
+
+    if not rebuild:
+        index = read_index(filename)
+
+        if index is not None:
+            return index
+
+    index = build_index(filename, format)
+
+    if save:
+        try:
+            index.save()
+        except OSError:
+            pass
+
+    return index
@@ -0,0 +1,856 @@
+"""Condition queries over decoded signals.
+
+A query is compiled once into vectorized operations on the time
+intervals where conditions hold, and evaluated on the signals of a log
+file, of columnar files written by :mod:`cantools.logexport` or of a
+:mod:`cantools.signalstore`. The result is the list of time intervals
+where the query holds.
+
+Syntax:
+
+- ``SIGNAL OPERATOR VALUE``, with ``OPERATOR`` one of ``==``, ``!=``,
+  ``<``, ``<=``, ``>`` and ``>=``. ``SIGNAL`` is ``SIGNAL`` or
+  ``MESSAGE.SIGNAL``, in backquotes if it contains other characters
+  than letters, digits and underscores. ``VALUE`` is a number or a
+  choice name, optionally quoted. A signal alone is ``SIGNAL != 0``.
+
+- ``and``, ``or``, ``not`` (or ``&&``, ``||``, ``!``) and parentheses.
+
+- ``rising(QUERY)`` and ``falling(QUERY)``: the instants where given
+  query starts or stops to hold.
+
+- ``within(QUERY, DURATION)``: where given query held at some time in
+  the last ``DURATION``, for example ``200ms``, ``1.5s`` or ``2min``.
+
+- ``lasting(QUERY, DURATION)``: the intervals of given query that last
+  at least ``DURATION``.
+
+A signal keeps its value until its next sample, and conditions on a
+signal are false before its first sample. Instants (of rising and
+falling edges) may be combined with ``and`` only.
+
+>>> query = cantools.logquery.Query(
+        'rising(BSI.DOOR_OPEN == OPEN) and VEHICLE_SPEED > 0')
+>>> query.search_log('drive.blf', db, limit=1)
+[(1123.52, 1123.52)]
+
+"""
+
+import os
+import re
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from .errors import Error
+from . import logexport
+from . import logformats
+from . import logindex
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+DURATION_UNITS = {
+    'us': 1e-6,
+    'ms': 1e-3,
+    's': 1.0,
+    'min': 60.0
+}
+
+RE_TOKEN = re.compile(r'''
+    \s*(?:
+      (?P<number>0[xX][0-9a-fA-F]+
+                 |(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][-+]?\d+)?)
+      (?P<unit>us|ms|min|s)?(?![\w.])
+    | (?P<string>"[^"]*"|'[^']*')
+    | (?P<name>`[^`]+`|[A-Za-z_][\w.]*)
+    | (?P<operator>==|!=|<=|>=|&&|\|\||[=<>!(),-])
+    )''', re.VERBOSE)
+
+COMPARISONS = {
+    '==': np.equal if np else None,
+    '=': np.equal if np else None,
+    '!=': np.not_equal if np else None,
+    '<': np.less if np else None,
+    '<=': np.less_equal if np else None,
+    '>': np.greater if np else None,
+    '>=': np.greater_equal if np else None
+}
+
+FUNCTIONS = ('rising', 'falling', 'within', 'lasting')
+
+
+class QueryError(Error):
+    pass
+
+
+class Series(NamedTuple):
+    """The samples of a signal, sorted by timestamp. `choices` maps
+    numeric values to choice names, if the signal has choices and its
+    values are numeric."""
+    timestamps: 'np.ndarray'
+    values: 'np.ndarray'
+    choices: Optional[Dict]
+
+
+class Intervals:
+    """Sorted, disjoint time intervals ``[start, end)``, or instants if
+    `instants` is True."""
+
+    def __init__(self, starts, ends, instants=False):
+        self.starts = starts
+        self.ends = ends
+        self.instants = instants
+
+    def __len__(self):
+        return len(self.starts)
+
+    def to_list(self, limit=None):
+        return list(zip(self.starts[:limit].tolist(),
+                        self.ends[:limit].tolist()))
+
+
+def _check_numpy():
+    if np is None:
+        raise QueryError('The numpy package is required for queries.')
+
+
+def _empty():
+    return np.array([], dtype=np.float64)
+
+
+def _merge(starts, ends):
+    """Returns given intervals, sorted by start, with overlapping and
+    adjacent intervals merged."""
+    if len(starts) == 0:
+        return starts, ends
+
+    running_ends = np.maximum.accumulate(ends)
+    new = np.ones(len(starts), dtype=bool)
+    new[1:] = starts[1:] > running_ends[:-1]
+    last = np.append(new[1:], True)
+
+    return starts[new], running_ends[last]
+
+
+def _runs(mask):
+    """Returns the first and one past the last indices of the runs of
+    True in given mask."""
+    steps = np.diff(mask.astype(np.int8), prepend=0, append=0)
+
+    return np.flatnonzero(steps == 1), np.flatnonzero(steps == -1)
+
+
+def _combine(a, b, needed):
+    """Returns the intervals where at least `needed` of the intervals
+    of `a` and `b` hold (2 for intersection, 1 for union)."""
+    times = np.concatenate([a.starts, a.ends, b.starts, b.ends])
+    steps = np.concatenate([np.ones(len(a)),
+                            -np.ones(len(a)),
+                            np.ones(len(b)),
+                            -np.ones(len(b))])
+
+    # Ends before starts at equal times, as intervals are half-open.
+    order = np.lexsort((steps, times))
+    times = times[order]
+    count = np.cumsum(steps[order])
+    segments = (count[:-1] >= needed) & (times[1:] > times[:-1])
+
+    return Intervals(*_merge(times[:-1][segments], times[1:][segments]))
+
+
+class _Context:
+
+    def __init__(self, series, start, end):
+        self.series = series
+        self.start = start
+        self.end = end
+
+
+class _Comparison:
+
+    def __init__(self, signal, operator, value):
+        self.signal = signal
+        self.operator = operator
+        self.value = value
+
+    def signals(self):
+        return {self.signal}
+
+    def _mask(self, series):
+        values = series.values
+        value = self.value
+        compare = COMPARISONS[self.operator]
+
+        if isinstance(value, str):
+            if values.dtype.kind in 'UO':
+                if self.operator not in ['==', '=', '!=']:
+                    raise QueryError(
+                        "Choice '{}' of signal '{}' can only be compared with "
+                        "== and !=.".format(value, self.signal))
+
+                return compare(values.astype(str), value)
+
+            numbers = [number
+                       for number, name in (series.choices or {}).items()
+                       if str(name) == value]
+
+            if not numbers:
+                raise QueryError(
+                    "'{}' is not a choice of signal '{}'.".format(
+                        value,
+                        self.signal))
+
+            if self.operator in ['==', '=']:
+                return np.isin(values, numbers)
+            elif self.operator == '!=':
+                return ~np.isin(values, numbers)
+
+            value = numbers[0]
+        elif values.dtype.kind in 'UO':
+            try:
+                values = values.astype(np.float64)
+            except (TypeError, ValueError):
+                raise QueryError(
+                    "Signal '{}' has choice names, not numbers.".format(
+                        self.signal))
+
+        return compare(values, value)
+
+    def evaluate(self, context):
+        series = context.series[self.signal]
+        timestamps = series.timestamps
+
+        if len(timestamps) == 0:
+            return Intervals(_empty(), _empty())
+
+        first, last = _runs(self._mask(series))
+        starts = timestamps[first]
+        ends = np.append(timestamps, context.end)[last]
+        starts = np.maximum(starts, context.start)
+        ends = np.minimum(ends, context.end)
+        keep = ends > starts
+
+        # Runs are split by samples with equal timestamps.
+        return Intervals(*_merge(starts[keep], ends[keep]))
+
+
+class _Not:
+
+    def __init__(self, operand):
+        self.operand = operand
+
+    def signals(self):
+        return self.operand.signals()
+
+    def evaluate(self, context):
+        operand = self.operand.evaluate(context)
+
+        if operand.instants:
+            raise QueryError('Instants cannot be negated.')
+
+        starts = np.append(context.start, operand.ends)
+        ends = np.append(operand.starts, context.end)
+        keep = ends > starts
+
+        return Intervals(starts[keep], ends[keep])
+
+
+class _And:
+
+    def __init__(self, left, right):
+        self.left = left
+        self.right = right
+
+    def signals(self):
+        return self.left.signals() | self.right.signals()
+
+    def evaluate(self, context):
+        left = self.left.evaluate(context)
+        right = self.right.evaluate(context)
+
+        if left.instants and right.instants:
+            times = np.intersect1d(left.starts, right.starts)
+
+            return Intervals(times, times, True)
+
+        if right.instants:
+            left, right = right, left
+
+        if left.instants:
+            times = left.starts
+            index = np.searchsorted(right.starts, times, side='right') - 1
+            inside = index >= 0
+            inside[inside] = times[inside] < right.ends[index[inside]]
+            times = times[inside]
+
+            return Intervals(times, times, True)
+
+        return _combine(left, right, 2)
+
+
+class _Or:
+
+    def __init__(self, left, right):
+        self.left = left
+        self.right = right
+
+    def signals(self):
+        return self.left.signals() | self.right.signals()
+
+    def evaluate(self, context):
+        left = self.left.evaluate(context)
+        right = self.right.evaluate(context)
+
+        if left.instants and right.instants:
+            times = np.union1d(left.starts, right.starts)
+
+            return Intervals(times, times, True)
+
+        if left.instants or right.instants:
+            raise QueryError('Instants and intervals cannot be combined with or.')
+
+        return _combine(left, right, 1)
+
+
+class _Function:
+
+    def __init__(self, name, operand, duration):
+        self.name = name
+        self.operand = operand
+        self.duration = duration
+
+    def signals(self):
+        return self.operand.signals()
+
+    def evaluate(self, context):
+        operand = self.operand.evaluate(context)
+
+        if self.name == 'within':
+            ends = np.minimum(operand.ends + self.duration, context.end)
+            keep = ends > operand.starts
+
+            return Intervals(*_merge(operand.starts[keep], ends[keep]))
+
+        if operand.instants:
+            raise QueryError('{}() expects intervals, not instants.'.format(
+                self.name))
+
+        if self.name == 'rising':
+            times = operand.starts[operand.starts > context.start]
+        elif self.name == 'falling':
+            times = operand.ends[operand.ends < context.end]
+        else:
+            keep = operand.ends - operand.starts >= self.duration
+
+            return Intervals(operand.starts[keep], operand.ends[keep])
+
+        return Intervals(times, times, True)
+
+
+def _tokenize(string):
+    tokens = []
+    position = 0
+    string = string.rstrip()
+
+    while position < len(string):
+        mo = RE_TOKEN.match(string, position)
+
+        if mo is None or mo.end() == position:
+            raise QueryError(
+                "Invalid query '{}': unexpected '{}' at position {}.".format(
+                    string,
+                    string[position:].strip()[:10],
+                    position))
+
+        kind = mo.lastgroup
+
+        if kind == 'unit':
+            kind = 'number'
+
+        tokens.append((kind, mo.group(kind), mo.group('unit')))
+        position = mo.end()
+
+    return tokens
+
+
+class _Parser:
+
+    def __init__(self, string):
+        self.string = string
+        self.tokens = _tokenize(string)
+        self.position = 0
+
+    def _error(self, message):
+        return QueryError("Invalid query '{}': {}.".format(self.string, message))
+
+    def _peek(self, offset=0):
+        try:
+            return self.tokens[self.position + offset]
+        except IndexError:
+            return (None, None, None)
+
+    def _next(self):
+        token = self._peek()
+        self.position += 1
+
+        return token
+
+    def _is_word(self, *words):
+        kind, text, _ = self._peek()
+
+        return kind == 'name' and text.lower() in words
+
+    def _expect(self, text):
+        token = self._next()
+
+        if token[1] != text:
+            raise self._error("expected '{}', but got '{}'".format(
+                text,
+                token[1] or 'end of query'))
+
+    def parse(self):
+        node = self._or()
+
+        if self._peek()[0] is not None:
+            raise self._error("unexpected '{}'".format(self._peek()[1]))
+
+        return node
+
+    def _or(self):
+        node = self._and()
+
+        while self._is_word('or') or self._peek()[1] == '||':
+            self._next()
+            node = _Or(node, self._and())
+
+        return node
+
+    def _and(self):
+        node = self._not()
+
+        while self._is_word('and') or self._peek()[1] == '&&':
+            self._next()
+            node = _And(node, self._not())
+
+        return node
+
+    def _not(self):
+        if self._is_word('not') or self._peek()[1] == '!':
+            self._next()
+
+            return _Not(self._not())
+
+        return self._primary()
+
+    def _duration(self):
+        kind, text, unit = self._next()
+
+        if kind != 'number':
+            raise self._error('expected a duration, for example 100ms')
+
+        return float(text) * DURATION_UNITS[unit or 's']
+
+    def _primary(self):
+        kind, text, _ = self._peek()
+
+        if text == '(':
+            self._next()
+            node = self._or()
+            self._expect(')')
+
+            return node
+
+        if kind != 'name':
+            raise self._error("expected a signal, but got '{}'".format(
+                text or 'end of query'))
+
+        if text.lower() in FUNCTIONS and self._peek(1)[1] == '(':
+            self._next()
+            self._next()
+            operand = self._or()
+            duration = None
+
+            if text.lower() in ['within', 'lasting']:
+                self._expect(',')
+                duration = self._duration()
+
+            self._expect(')')
+
+            return _Function(text.lower(), operand, duration)
+
+        self._next()
+        signal = text.strip('`')
+        operator = self._peek()[1]
+
+        if self._peek()[0] != 'operator' or operator not in COMPARISONS:
+            return _Comparison(signal, '!=', 0)
+
+        self._next()
+
+        return _Comparison(signal, operator, self._value())
+
+    def _value(self):
+        kind, text, unit = self._next()
+        sign = 1
+
+        if text == '-':
+            sign = -1
+            kind, text, unit = self._next()
+
+            if kind != 'number':
+                raise self._error("expected a number after '-'")
+
+        if kind == 'number':
+            if unit is not None:
+                raise self._error("unexpected unit of value '{}{}'".format(
+                    text,
+                    unit))
+
+            return sign * (int(text, 16) if text[:2] in ['0x', '0X']
+                           else float(text))
+        elif kind == 'string':
+            return text[1:-1]
+        elif kind == 'name':
+            return text.strip('`')
+
+        raise self._error("expected a value, but got '{}'".format(
+            text or 'end of query'))
+
+
+def _find_signal(database, name):
+    """Returns the message and signal of given name, SIGNAL or
+    MESSAGE.SIGNAL, in given database."""
+    message_name, _, signal_name = name.rpartition('.')
+
+    if message_name:
+        try:
+            message = database.get_message_by_name(message_name)
+
+            return message, message.get_signal_by_name(signal_name)
+        except KeyError:
+            pass
+
+    found = [(message, signal)
+             for message in database.messages
+             for signal in message.signals
+             if signal.name == name]
+
+    if not found:
+        raise QueryError("Signal '{}' not found in the database.".format(name))
+
+    if len(found) > 1:
+        raise QueryError(
+            "Signal '{}' is in more than one message ({}), use "
+            "MESSAGE.SIGNAL.".format(
+                name,
+                ', '.join([message.name for message, _ in found])))
+
+    return found[0]
+
+
+def _to_series(timestamps, values, choices):
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    values = np.asarray(values)
+
+    if values.dtype.kind == 'f':
+        valid = ~np.isnan(values) & ~np.isnan(timestamps)
+    elif values.dtype.kind in 'UO':
+        valid = (values != '') & (values != None) & ~np.isnan(timestamps)
+    else:
+        valid = ~np.isnan(timestamps)
+
+    timestamps = timestamps[valid]
+    values = values[valid]
+
+    if len(timestamps) > 1 and (timestamps[1:] < timestamps[:-1]).any():
+        order = np.argsort(timestamps, kind='stable')
+        timestamps = timestamps[order]
+        values = values[order]
+
+    return Series(timestamps, values, choices)
+
+
+def _restrict(series, start, stop):
+    """Returns the samples of given series from the last sample at or
+    before `start` to `stop`."""
+    timestamps = series.timestamps
+    first = 0
+    last = len(timestamps)
+
+    if start is not None:
+        first = max(np.searchsorted(timestamps, start, side='right') - 1, 0)
+
+    if stop is not None:
+        last = np.searchsorted(timestamps, stop, side='right')
+
+    return Series(timestamps[first:last], series.values[first:last], series.choices)
+
+
+def series_from_log(filename,
+                    database,
+                    signals,
+                    start: Optional[float] = None,
+                    stop: Optional[float] = None,
+                    format: Optional[str] = None) -> Dict[str, Series]:
+    """Decode given signals from given log file. Only frames of messages
+    with given signals are decoded. If the log file has an index (see
+    :mod:`cantools.logindex`) reading starts at the checkpoint before
+    `start`, and stops after `stop`. Frames without timestamp have
+    their frame number as timestamp.
+
+    """
+
+    _check_numpy()
+    found = {name: _find_signal(database, name) for name in signals}
+    columns = {name: ([], []) for name in signals}
+    frames = {}
+    offset = 0
+    state = None
+    index = logindex.read_index(filename)
+
+    if index is not None:
+        if start is not None:
+            offset, state = index.position_at_time(start)
+            frame_number = index.checkpoint_at_time(start).frame_number
+        else:
+            frame_number = 0
+    else:
+        frame_number = 0
+
+    reader = logformats.open_log(filename, format)
+
+    for batch in reader.batches(offset, state):
+        if stop is not None and batch and batch[0].timestamp is not None \
+           and batch[0].timestamp > stop:
+            break
+
+        for frame in batch:
+            frame_number += 1
+
+            try:
+                entry = frames[frame.frame_id]
+            except KeyError:
+                try:
+                    message = database.get_message_by_frame_id(frame.frame_id)
+                except KeyError:
+                    message = None
+
+                entry = [(name, signal.name)
+                         for name, (signal_message, signal) in found.items()
+                         if signal_message is message]
+                entry = (message, entry) if entry else None
+                frames[frame.frame_id] = entry
+
+            if entry is None:
+                continue
+
+            message, entry = entry
+
+            try:
+                decoded = message.decode(frame.data, decode_choices=False)
+            except Exception:
+                continue
+
+            timestamp = frame.timestamp
+
+            if timestamp is None:
+                timestamp = frame_number
+
+            for name, signal_name in entry:
+                value = decoded.get(signal_name)
+
+                if value is not None:
+                    timestamps, values = columns[name]
+                    timestamps.append(timestamp)
+                    values.append(value)
+
+    return {
+        name: _restrict(_to_series(timestamps, values, found[name][1].choices),
+                        start,
+                        stop)
+        for name, (timestamps, values) in columns.items()
+    }
+
+
+def series_from_columns(directory,
+                        signals,
+                        database=None,
+                        start: Optional[float] = None,
+                        stop: Optional[float] = None) -> Dict[str, Series]:
+    """Read given signals from the files of a directory written by
+    :func:`cantools.logexport.export_log()`. Choice names of numeric
+    columns are taken from `database`, if given.
+
+    """
+
+    _check_numpy()
+    paths = {}
+
+    for entry in sorted(os.listdir(directory)):
+        message_name, extension = os.path.splitext(entry)
+
+        if extension[1:] in logexport.FORMATS:
+            paths[message_name] = os.path.join(directory, entry)
+
+    result = {}
+
+    for name in signals:
+        message_name, _, signal_name = name.rpartition('.')
+
+        if message_name in paths:
+            candidates = [(message_name, signal_name)]
+        else:
+            signal_name = name
+            candidates = [
+                (message_name, name)
+                for message_name, path in paths.items()
+                if name in logexport.column_names(path)
+            ]
+
+        if not candidates:
+            raise QueryError("Signal '{}' not found in '{}'.".format(
+                name,
+                directory))
+
+        if len(candidates) > 1:
+            raise QueryError(
+                "Signal '{}' is in more than one message ({}), use "
+                "MESSAGE.SIGNAL.".format(
+                    name,
+                    ', '.join([message_name for message_name, _ in candidates])))
+
+        message_name, signal_name = candidates[0]
+        columns = logexport.read_columns(paths[message_name],
+                                         ['timestamp', signal_name])
+
+        if signal_name not in columns:
+            raise QueryError("Signal '{}' not found in '{}'.".format(
+                name,
+                paths[message_name]))
+
+        choices = None
+
+        if database is not None:
+            try:
+                message = database.get_message_by_name(message_name)
+                choices = message.get_signal_by_name(signal_name).choices
+            except KeyError:
+                pass
+
+        series = _to_series(columns['timestamp'], columns[signal_name], choices)
+        result[name] = _restrict(series, start, stop)
+
+    return result
+
+
+def series_from_store(store,
+                      signals,
+                      start: Optional[float] = None,
+                      stop: Optional[float] = None) -> Dict[str, Series]:
+    """Read given signals from given :class:`cantools.signalstore.SignalStore`,
+    from the sample held at `start` to `stop`. Only that range is read,
+    through the index of the store. Choice names are the texts stored
+    with the samples."""
+    _check_numpy()
+    result = {}
+
+    for name in signals:
+        rows, choices = store.numeric_samples(name, start, stop)
+        samples = np.array(rows, dtype=np.float64).reshape(-1, 2)
+        result[name] = _to_series(samples[:, 0], samples[:, 1], choices)
+
+    return result
+
+
+class Query:
+    """A compiled query, see the module documentation for its syntax."""
+
+    def __init__(self, string: str):
+        _check_numpy()
+        self.string = string
+        self._root = _Parser(string).parse()
+
+    @property
+    def signals(self) -> List[str]:
+        """The signals of the query, sorted by name."""
+        return sorted(self._root.signals())
+
+    def evaluate(self,
+                 series: Dict[str, Series],
+                 start: Optional[float] = None,
+                 stop: Optional[float] = None) -> Intervals:
+        """Evaluate the query on given signals, a dictionary of signal
+        names to :class:`Series`, from `start` to `stop`, by default the
+        first and last sample of all signals.
+
+        """
+
+        missing = [name for name in self.signals if name not in series]
+
+        if missing:
+            raise QueryError('Missing signals {}.'.format(', '.join(missing)))
+
+        non_empty = [series[name].timestamps
+                     for name in self.signals
+                     if len(series[name].timestamps) > 0]
+
+        if not non_empty:
+            return Intervals(_empty(), _empty())
+
+        if start is None:
+            start = min([timestamps[0] for timestamps in non_empty])
+
+        if stop is None:
+            stop = max([timestamps[-1] for timestamps in non_empty])
+
+        return self._root.evaluate(_Context(series, start, stop))
+
+    def search_log(self,
+                   filename,
+                   database,
+                   start: Optional[float] = None,
+                   stop: Optional[float] = None,
+                   limit: Optional[int] = None,
+                   format: Optional[str] = None) -> List[Tuple[float, float]]:
+        """Returns the intervals of given log file, decoded with given
+        database, where the query holds. At most `limit` intervals are
+        returned, if given. Instants are intervals with equal start and
+        end."""
+        series = series_from_log(filename,
+                                 database,
+                                 self.signals,
+                                 start,
+                                 stop,
+                                 format)
+
+        return self.evaluate(series, start, stop).to_list(limit)
+
+    def search_columns(self,
+                       directory,
+                       database=None,
+                       start: Optional[float] = None,
+                       stop: Optional[float] = None,
+                       limit: Optional[int] = None) -> List[Tuple[float, float]]:
+        """As :meth:`search_log()`, but for the exported files in given
+        directory."""
+        series = series_from_columns(directory,
+                                     self.signals,
+                                     database,
+                                     start,
+                                     stop)
+
+        return self.evaluate(series, start, stop).to_list(limit)
+
+    def search_store(self,
+                     store,
+                     start: Optional[float] = None,
+                     stop: Optional[float] = None,
+                     limit: Optional[int] = None) -> List[Tuple[float, float]]:
+        """As :meth:`search_log()`, but for given signal store. The
+        signals of a store with only changes end at their last change,
+        so give `stop` to search up to the end of the recording."""
+        series = series_from_store(store, self.signals, start, stop)
+
+        return self.evaluate(series, start, stop).to_list(limit)
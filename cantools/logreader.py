@@ -1,7 +1,9 @@
+import os
 import re
 import enum
 import binascii
 import datetime
+import concurrent.futures
 
 
 class TimestampFormat(enum.Enum):
@@ -191,3 +193,178 @@ class Parser:
         discarded."""
         for _, frame in self.iterlines():
             yield frame
+
+
+def _parse_chunk(filename, start, end, pattern, encoding):
+    """Parse the lines in given byte range of given file with given
+    pattern. Runs in the worker processes of ParallelParser."""
+    with open(filename, 'rb') as fin:
+        fin.seek(start)
+        text = fin.read(end - start).decode(encoding, errors='replace')
+
+    frames = []
+
+    for line in text.split('\n'):
+        frame = pattern.match(line.strip('\r\n'))
+
+        if frame:
+            frames.append(frame)
+
+    return frames
+
+
+def _parse_chunk_packed(filename, start, end, pattern, encoding):
+    """As _parse_chunk(), but returns tuples, which are much cheaper to
+    send back to the parent process than DataFrame objects."""
+    return [
+        (frame.channel,
+         frame.frame_id,
+         frame.data,
+         frame.timestamp,
+         frame.timestamp_format.value)
+        for frame in _parse_chunk(filename, start, end, pattern, encoding)
+    ]
+
+
+def _unpack_frames(packed):
+    timestamp_formats = {
+        timestamp_format.value: timestamp_format
+        for timestamp_format in TimestampFormat
+    }
+
+    return [
+        DataFrame(channel,
+                  frame_id,
+                  data,
+                  timestamp,
+                  timestamp_formats[timestamp_format])
+        for channel, frame_id, data, timestamp, timestamp_format in packed
+    ]
+
+
+class ParallelParser:
+    """A CAN log file parser using several processes.
+
+    The file is split into line aligned byte ranges of about
+    `chunk_size` bytes, which are parsed in a pool of `processes`
+    processes (one per CPU by default, no pool if 1). The log format is
+    detected once, from the first line matching any pattern, as
+    :class:`Parser` does. Non-parseable log entries are discarded.
+
+    Batches are returned in file order if `ordered` is True, otherwise
+    as soon as they have been parsed. At most two batches per process
+    are parsed ahead of the consumer.
+
+    >>> parser = cantools.logreader.ParallelParser('candump.log')
+    >>> for batch in parser.batches():
+            for frame in batch:
+                print(f'{frame.timestamp}: {frame.frame_id}')
+    """
+
+    def __init__(self,
+                 filename,
+                 processes=None,
+                 chunk_size=16 * 1024 * 1024,
+                 ordered=True,
+                 encoding='utf-8'):
+        self.filename = filename
+        self.processes = processes or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.ordered = ordered
+        self.encoding = encoding
+        self.pattern = None
+
+    def detect_pattern(self):
+        """Detect and return the pattern of the log file, or None if no
+        line matches any pattern."""
+        if self.pattern is None:
+            with open(self.filename, 'rb') as fin:
+                for line in fin:
+                    line = line.decode(self.encoding, errors='replace')
+                    self.pattern = Parser.detect_pattern(line.strip('\r\n'))
+
+                    if self.pattern is not None:
+                        break
+
+        return self.pattern
+
+    def chunks(self):
+        """Returns a list of (start, end) byte ranges, each holding
+        complete lines."""
+        size = os.path.getsize(self.filename)
+        boundaries = [0]
+
+        with open(self.filename, 'rb') as fin:
+            while boundaries[-1] < size:
+                fin.seek(boundaries[-1] + self.chunk_size)
+                fin.readline()
+                boundaries.append(min(fin.tell(), size))
+
+        return list(zip(boundaries[:-1], boundaries[1:]))
+
+    def batches(self):
+        """Returns a generator that yields lists of DataFrame, one list per
+        chunk."""
+        pattern = self.detect_pattern()
+
+        if pattern is None:
+            return
+
+        chunks = self.chunks()
+
+        if self.processes == 1:
+            for start, end in chunks:
+                yield _parse_chunk(self.filename,
+                                   start,
+                                   end,
+                                   pattern,
+                                   self.encoding)
+
+            return
+
+        window = 2 * self.processes
+        chunks = iter(chunks)
+
+        with concurrent.futures.ProcessPoolExecutor(self.processes) as executor:
+            def submit():
+                for start, end in chunks:
+                    return executor.submit(_parse_chunk_packed,
+                                           self.filename,
+                                           start,
+                                           end,
+                                           pattern,
+                                           self.encoding)
+
+            pending = []
+
+            for _ in range(window):
+                future = submit()
+
+                if future is None:
+                    break
+
+                pending.append(future)
+
+            while pending:
+                if self.ordered:
+                    future = pending.pop(0)
+                else:
+                    done, _ = concurrent.futures.wait(
+                        pending,
+                        return_when=concurrent.futures.FIRST_COMPLETED)
+                    future = done.pop()
+                    pending.remove(future)
+
+                batch = _unpack_frames(future.result())
+                future = submit()
+
+                if future is not None:
+                    pending.append(future)
+
+                yield batch
+
+    def __iter__(self):
+        """Returns DataFrame log entries. Non-parseable log entries is
+        discarded."""
+        for batch in self.batches():
+            yield from batch
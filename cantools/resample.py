@@ -0,0 +1,258 @@
+"""Resampling of decoded signals onto a common time grid.
+
+Signals of different messages are received at different rates. To
+compare them, each signal, given as a series of timestamps and values,
+is resampled onto the same grid of timestamps with one of these
+methods:
+
+- ``'hold'``: zero-order hold, the value of the last sample at or
+  before each grid timestamp.
+
+- ``'linear'``: linear interpolation between the samples around each
+  grid timestamp. Numeric signals only.
+
+- ``'last'``: as ``'hold'``, but only if the last sample is at most
+  `max_age` seconds old, so stale signals show as gaps.
+
+Grid timestamps before the first sample (and, for ``'linear'``, after
+the last sample) are gaps. Gaps are NaN for numeric signals and None
+for other signals (choice strings). All methods are vectorized with
+numpy, which is required.
+
+>>> grid, values = cantools.resample.align({'speed': (t0, v0),
+                                            'gear': (t1, v1)},
+                                           period=0.01,
+                                           method='last')
+
+"""
+
+from typing import Dict, Optional, Tuple
+
+from .errors import Error
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+METHODS = ('hold', 'linear', 'last')
+
+# The default maximum age of 'last' in median sample intervals.
+DEFAULT_MAX_AGE_INTERVALS = 3
+
+
+class NumpyNotInstalledError(Error):
+
+    def __init__(self):
+        super().__init__("The numpy package is required for resampling.")
+
+
+def _check_numpy():
+    if np is None:
+        raise NumpyNotInstalledError()
+
+
+def _as_values(values):
+    """Returns given values as an array, of floats if possible (None
+    becomes NaN)."""
+    values = np.asarray(values)
+
+    if values.dtype.kind in 'biu':
+        return values.astype(np.float64)
+
+    if values.dtype.kind == 'O' \
+       and not any([isinstance(value, str) for value in values]):
+        try:
+            return values.astype(np.float64)
+        except (TypeError, ValueError):
+            pass
+
+    return values
+
+
+def _is_numeric(values):
+    return values.dtype.kind == 'f'
+
+
+def _gaps(grid, numeric):
+    if numeric:
+        return np.full(len(grid), np.nan)
+
+    return np.full(len(grid), None, dtype=object)
+
+
+def median_interval(timestamps):
+    """Returns the median interval between given sorted timestamps, or
+    None if there are less than two."""
+    _check_numpy()
+
+    if len(timestamps) < 2:
+        return None
+
+    return float(np.median(np.diff(timestamps)))
+
+
+def make_grid(start, stop, period):
+    """Returns an array of timestamps from `start` to `stop`, both
+    inclusive, `period` seconds apart."""
+    _check_numpy()
+
+    if period <= 0:
+        raise Error('The resampling period must be positive, not {}.'.format(
+            period))
+
+    number = int(np.floor((stop - start) / period + 1e-9)) + 1
+
+    return start + period * np.arange(max(number, 0))
+
+
+def resample(timestamps,
+             values,
+             grid,
+             method: str = 'hold',
+             max_age: Optional[float] = None):
+    """Returns the values of given series at the timestamps of `grid`.
+
+    `timestamps` need not be sorted. Samples with NaN (or None) values,
+    as multiplexed signals have in frames of other multiplexer values,
+    are not samples. `max_age` applies to ``'last'``, where it defaults
+    to three median sample intervals, and to ``'linear'``, where it is
+    the largest interval to interpolate across.
+
+    """
+
+    _check_numpy()
+
+    if method not in METHODS:
+        raise Error(
+            "expected method in {}, but got '{}'".format(METHODS, method))
+
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    values = _as_values(values)
+    grid = np.asarray(grid, dtype=np.float64)
+
+    if timestamps.shape != values.shape:
+        raise Error(
+            'expected as many timestamps as values, but got {} and {}'.format(
+                len(timestamps),
+                len(values)))
+
+    numeric = _is_numeric(values)
+
+    if numeric:
+        valid = ~np.isnan(values)
+    else:
+        valid = values != None
+
+    if not valid.all():
+        timestamps = timestamps[valid]
+        values = values[valid]
+
+    if len(timestamps) > 1 and (timestamps[1:] < timestamps[:-1]).any():
+        order = np.argsort(timestamps, kind='stable')
+        timestamps = timestamps[order]
+        values = values[order]
+
+    if len(timestamps) == 0:
+        return _gaps(grid, numeric)
+
+    if method == 'linear':
+        if not numeric:
+            raise Error('Only numeric signals can be interpolated linearly.')
+
+        result = np.interp(grid, timestamps, values, left=np.nan, right=np.nan)
+
+        if max_age is not None:
+            after = np.clip(np.searchsorted(timestamps, grid, side='left'),
+                            1,
+                            len(timestamps) - 1)
+            interval = timestamps[after] - timestamps[after - 1]
+            exact = timestamps[np.searchsorted(timestamps, grid, side='right') - 1] == grid
+            result[(interval > max_age) & ~exact] = np.nan
+
+        return result
+
+    index = np.searchsorted(timestamps, grid, side='right') - 1
+    found = index >= 0
+    index[~found] = 0
+
+    if method == 'last':
+        if max_age is None:
+            interval = median_interval(timestamps)
+
+            if interval is not None:
+                max_age = DEFAULT_MAX_AGE_INTERVALS * interval
+
+        if max_age is not None:
+            found &= grid - timestamps[index] <= max_age
+
+    if numeric:
+        result = values[index]
+        result[~found] = np.nan
+    else:
+        result = values[index].astype(object)
+        result[~found] = None
+
+    return result
+
+
+def align(series: Dict[str, Tuple],
+          period: Optional[float] = None,
+          grid=None,
+          method: str = 'hold',
+          max_age: Optional[float] = None,
+          start: Optional[float] = None,
+          stop: Optional[float] = None):
+    """Resample given series, a dictionary of signal names to
+    ``(timestamps, values)`` tuples, onto a common grid. Returns a
+    tuple of the grid and a dictionary of signal names to resampled
+    values.
+
+    The grid is `grid` if given, otherwise from `start` to `stop`
+    (by default the first and last timestamp of all series), `period`
+    seconds apart. `period` defaults to the shortest median sample
+    interval of all series.
+
+    """
+
+    _check_numpy()
+    arrays = {
+        name: np.asarray(timestamps, dtype=np.float64)
+        for name, (timestamps, _) in series.items()
+    }
+
+    if grid is None:
+        non_empty = [timestamps for timestamps in arrays.values()
+                     if len(timestamps) > 0]
+
+        if not non_empty:
+            grid = np.array([], dtype=np.float64)
+        else:
+            if start is None:
+                start = min([timestamps.min() for timestamps in non_empty])
+
+            if stop is None:
+                stop = max([timestamps.max() for timestamps in non_empty])
+
+            if period is None:
+                intervals = [median_interval(np.sort(timestamps))
+                             for timestamps in non_empty]
+                intervals = [interval for interval in intervals
+                             if interval is not None and interval > 0]
+
+                if not intervals:
+                    raise Error('Unable to determine a resampling period.')
+
+                period = min(intervals)
+
+            grid = make_grid(start, stop, period)
+    else:
+        grid = np.asarray(grid, dtype=np.float64)
+
+    resampled = {
+        name: resample(arrays[name], values, grid, method, max_age)
+        for name, (_, values) in series.items()
+    }
+
+    return grid, resampled
@@ -0,0 +1,410 @@
+"""A store of decoded signal samples in an SQLite database.
+
+Decoded samples are written to a ``samples`` table indexed on
+(signal, time), in batched transactions of a database in WAL mode,
+so stores can be queried while they are written. Optionally only
+changed values are stored. Questions like "when was the gear R while
+the speed was above 5" are then answered from the store instead of
+replaying the log:
+
+>>> store = cantools.signalstore.SignalStore('drive.sqlite', db)
+>>> with store:
+        for batch in cantools.logformats.open_log('drive.blf').batches():
+            store.add_frames(batch)
+>>> store.intervals('Gear == R and Speed > 5')
+[(1012.25, 1019.5), (2201.0, 2203.75)]
+
+Signals are named ``<message>.<signal>``, or just ``<signal>`` if
+the name is unique in the store. Values of signals with choices are
+stored as their number and their choice name. Queries are those of
+:mod:`cantools.logquery`, comparing with a choice name compares with
+the stored choice names.
+
+"""
+
+import math
+import sqlite3
+import threading
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+from .errors import Error
+from . import logquery
+
+
+DEFAULT_BATCH_SIZE = 20000
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS signals (
+    id INTEGER PRIMARY KEY,
+    message TEXT NOT NULL,
+    name TEXT NOT NULL,
+    unit TEXT,
+    UNIQUE (message, name)
+);
+CREATE TABLE IF NOT EXISTS samples (
+    signal_id INTEGER NOT NULL,
+    time REAL NOT NULL,
+    value REAL,
+    text TEXT
+);
+CREATE INDEX IF NOT EXISTS samples_signal_time ON samples (signal_id, time);
+'''
+
+
+class SignalStoreError(Error):
+    pass
+
+
+class Sample(NamedTuple):
+    """A sample of a signal. `text` is the choice name, if any."""
+    time: float
+    value: Optional[float]
+    text: Optional[str]
+
+
+class SignalStore:
+    """A store of decoded signal samples in the SQLite database at
+    `path`, created if missing.
+
+    `database` is used to decode frames added with
+    :meth:`add_frame()` and :meth:`add_frames()`. If `changes_only` is
+    True a sample is only stored if the value of its signal changed.
+    Samples are inserted in transactions of `batch_size` samples. All
+    methods may be called from any thread.
+
+    """
+
+    def __init__(self,
+                 path,
+                 database=None,
+                 changes_only: bool = False,
+                 batch_size: int = DEFAULT_BATCH_SIZE):
+        self.path = path
+        self.database = database
+        self.changes_only = changes_only
+        self.batch_size = batch_size
+        self._lock = threading.RLock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        self._connection.executescript(SCHEMA)
+        self._signal_ids = {}
+        self._signal_names = {}
+        self._message_signals = {}
+        self._last_values = {}
+        self._pending = []
+        self._frame_number = 0
+        self._closed = False
+        self.samples_added = 0
+
+        for signal_id, message, name in self._connection.execute(
+                'SELECT id, message, name FROM signals'):
+            self._signal_ids[(message, name)] = signal_id
+
+    # ------- writing -------
+
+    def _signal_id(self, message_name, signal_name, unit=None):
+        key = (message_name, signal_name)
+
+        try:
+            return self._signal_ids[key]
+        except KeyError:
+            pass
+
+        cursor = self._connection.execute(
+            'INSERT INTO signals (message, name, unit) VALUES (?, ?, ?)',
+            (message_name, signal_name, unit))
+        self._signal_ids[key] = cursor.lastrowid
+        self._signal_names = {}
+
+        return cursor.lastrowid
+
+    def _message_signal_ids(self, message):
+        """Returns a dictionary of signal names to ids of given message."""
+        try:
+            return self._message_signals[message.name]
+        except KeyError:
+            signal_ids = {
+                signal.name: self._signal_id(message.name,
+                                             signal.name,
+                                             signal.unit)
+                for signal in message.signals
+            }
+            self._message_signals[message.name] = signal_ids
+
+            return signal_ids
+
+    def _add(self, timestamp, signal_ids, decoded):
+        pending = self._pending
+        last_values = self._last_values
+        changes_only = self.changes_only
+
+        for name, value in decoded.items():
+            signal_id = signal_ids[name]
+
+            if isinstance(value, (int, float)):
+                text = None
+            elif hasattr(value, 'name') and hasattr(value, 'value'):
+                # A choice (NamedSignalValue).
+                text = value.name
+                value = value.value
+            else:
+                text = str(value)
+                value = None
+
+            if changes_only:
+                sample = (value, text)
+
+                if last_values.get(signal_id) == sample:
+                    continue
+
+                last_values[signal_id] = sample
+
+            pending.append((signal_id, timestamp, value, text))
+
+        if len(pending) >= self.batch_size:
+            self.flush()
+
+    def add_samples(self, timestamp, message, decoded):
+        """Add given decoded signals of given message (a
+        :class:`~cantools.database.can.Message`) received at given
+        time. Ignored once the store is closed."""
+        with self._lock:
+            if self._closed:
+                return
+
+            self._add(timestamp, self._message_signal_ids(message), decoded)
+
+    def add_frame(self, timestamp, frame_id, data):
+        """Decode given frame with the database of the store and add its
+        signals. Frames of unknown frame ids and frames which fail to
+        decode are ignored, as are all frames once the store is closed
+        (by another thread). Returns True if the frame was added.
+
+        """
+
+        try:
+            message = self.database.get_message_by_frame_id(frame_id)
+            decoded = message.decode(data, decode_choices=True)
+        except Exception:
+            return False
+
+        with self._lock:
+            if self._closed:
+                return False
+
+            self._add(timestamp, self._message_signal_ids(message), decoded)
+
+        return True
+
+    def add_frames(self, frames: Iterable):
+        """Decode and add given frames, for example a batch of
+        :class:`cantools.logformats.Frame`. Frames without timestamp are
+        stored at their number in the order frames were added. Ignored
+        once the store is closed."""
+        get_message_by_frame_id = self.database.get_message_by_frame_id
+        message_signal_ids = self._message_signal_ids
+
+        with self._lock:
+            if self._closed:
+                return
+
+            for frame in frames:
+                self._frame_number += 1
+                timestamp = frame.timestamp
+
+                if timestamp is None:
+                    timestamp = self._frame_number
+
+                try:
+                    message = get_message_by_frame_id(frame.frame_id)
+                    decoded = message.decode(frame.data, decode_choices=True)
+                except Exception:
+                    continue
+
+                self._add(timestamp, message_signal_ids(message), decoded)
+
+    def flush(self):
+        """Insert all pending samples in one transaction."""
+        with self._lock:
+            if self._closed or not self._pending:
+                return
+
+            with self._connection:
+                self._connection.executemany(
+                    'INSERT INTO samples VALUES (?, ?, ?, ?)',
+                    self._pending)
+
+            self.samples_added += len(self._pending)
+            self._pending = []
+
+    def close(self):
+        """Insert the pending samples and close the store. Samples added
+        afterwards are ignored."""
+        with self._lock:
+            if self._closed:
+                return
+
+            self.flush()
+            self._closed = True
+            self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    # ------- reading -------
+
+    def signals(self) -> List[str]:
+        """Returns the names (``<message>.<signal>``) of all signals in
+        the store."""
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT message, name FROM signals ORDER BY message, name')
+
+            return ['{}.{}'.format(message, name) for message, name in rows]
+
+    def signal_id(self, name):
+        """Returns the id of given signal, ``<message>.<signal>`` or a
+        unique ``<signal>``."""
+        with self._lock:
+            if not self._signal_names:
+                for (message, signal), signal_id in self._signal_ids.items():
+                    self._signal_names.setdefault(signal, []).append(signal_id)
+                    self._signal_names[message + '.' + signal] = [signal_id]
+
+            signal_ids = self._signal_names.get(name, [])
+
+        if len(signal_ids) == 1:
+            return signal_ids[0]
+        elif not signal_ids:
+            raise SignalStoreError("Signal '{}' not found.".format(name))
+        else:
+            raise SignalStoreError(
+                "Signal name '{}' is ambiguous, use "
+                "<message>.<signal>.".format(name))
+
+    def samples(self,
+                signal,
+                start: Optional[float] = None,
+                stop: Optional[float] = None) -> List[Sample]:
+        """Returns the samples of given signal from `start` to `stop`,
+        both inclusive, in time order."""
+        signal_id = self.signal_id(signal)
+
+        if start is None:
+            start = -math.inf
+
+        if stop is None:
+            stop = math.inf
+
+        with self._lock:
+            self.flush()
+            rows = self._connection.execute(
+                'SELECT time, value, text FROM samples '
+                'WHERE signal_id = ? AND time BETWEEN ? AND ? '
+                'ORDER BY time',
+                (signal_id, start, stop))
+
+            return [Sample(*row) for row in rows]
+
+    def numeric_samples(self,
+                        signal,
+                        start: Optional[float] = None,
+                        stop: Optional[float] = None):
+        """Returns the ``(time, value)`` rows of the samples of given
+        signal with a numeric value, from the last one at or before
+        `start` (the value held at `start`) to `stop`, in time order, and
+        a dictionary of the choice names of those values. Both are read
+        through the (signal, time) index, without creating a
+        :class:`Sample` per row."""
+        signal_id = self.signal_id(signal)
+
+        if stop is None:
+            stop = math.inf
+
+        with self._lock:
+            self.flush()
+
+            if start is None:
+                start = -math.inf
+            else:
+                row = self._connection.execute(
+                    'SELECT time FROM samples '
+                    'WHERE signal_id = ? AND time <= ? AND value IS NOT NULL '
+                    'ORDER BY time DESC LIMIT 1',
+                    (signal_id, start)).fetchone()
+
+                if row is not None:
+                    start = row[0]
+
+            rows = self._connection.execute(
+                'SELECT time, value FROM samples '
+                'WHERE signal_id = ? AND time BETWEEN ? AND ? '
+                'AND value IS NOT NULL ORDER BY time',
+                (signal_id, start, stop)).fetchall()
+            choices = dict(self._connection.execute(
+                'SELECT DISTINCT value, text FROM samples '
+                'WHERE signal_id = ? AND time BETWEEN ? AND ? '
+                'AND value IS NOT NULL AND text IS NOT NULL',
+                (signal_id, start, stop)))
+
+        return rows, choices
+
+    def value_at(self, signal, time) -> Optional[Sample]:
+        """Returns the last sample of given signal at or before given
+        time, or None."""
+        signal_id = self.signal_id(signal)
+
+        with self._lock:
+            self.flush()
+            row = self._connection.execute(
+                'SELECT time, value, text FROM samples '
+                'WHERE signal_id = ? AND time <= ? '
+                'ORDER BY time DESC LIMIT 1',
+                (signal_id, time)).fetchone()
+
+        if row is None:
+            return None
+
+        return Sample(*row)
+
+    def time_range(self) -> Tuple[Optional[float], Optional[float]]:
+        """Returns the time of the first and last sample in the store."""
+        with self._lock:
+            self.flush()
+
+            return self._connection.execute(
+                'SELECT MIN(time), MAX(time) FROM samples').fetchone()
+
+    def intervals(self,
+                  query,
+                  start: Optional[float] = None,
+                  stop: Optional[float] = None) -> List[Tuple[float, float]]:
+        """Returns the sorted ``(start, end)`` intervals from `start` to
+        `stop` (by default the time range of the store) where given
+        query holds. `query` is a :class:`cantools.logquery.Query`, a
+        query string or a list of query strings which must all hold.
+
+        """
+
+        if not isinstance(query, logquery.Query):
+            if not isinstance(query, str):
+                query = ' and '.join(['({})'.format(part) for part in query])
+
+            query = logquery.Query(query)
+
+        first, last = self.time_range()
+
+        if first is None:
+            return []
+
+        if start is None:
+            start = first
+
+        if stop is None:
+            stop = last
+
+        return query.search_store(self, start, stop)
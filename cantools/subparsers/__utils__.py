@@ -84,12 +84,24 @@ def _format_container_multi_line(message, decoded_data):
         ',\n'.join(contained_list) + \
         '\n)'
 
+def _decode(message, data, decode_choices, decode_containers, decode_cache):
+    if decode_cache is None:
+        return message.decode(data,
+                              decode_choices,
+                              decode_containers=decode_containers)
+
+    return decode_cache.decode(message,
+                               data,
+                               decode_choices,
+                               decode_containers=decode_containers)
+
 def format_message_by_frame_id(dbase,
                                frame_id,
                                data,
                                decode_choices,
                                single_line,
-                               decode_containers):
+                               decode_containers,
+                               decode_cache=None):
     try:
         message = dbase.get_message_by_frame_id(frame_id)
     except KeyError:
@@ -100,17 +112,28 @@ def format_message_by_frame_id(dbase,
             return format_container_message(message,
                                             data,
                                             decode_choices,
-                                            single_line)
+                                            single_line,
+                                            decode_cache)
         else:
             return f' Frame 0x{frame_id:x} is a container message'
 
-    return format_message(message, data, decode_choices, single_line)
-
-def format_container_message(message, data, decode_choices, single_line):
+    return format_message(message,
+                          data,
+                          decode_choices,
+                          single_line,
+                          decode_cache)
+
+def format_container_message(message,
+                             data,
+                             decode_choices,
+                             single_line,
+                             decode_cache=None):
     try:
-        decoded_message = message.decode(data,
-                                         decode_choices,
-                                         decode_containers=True)
+        decoded_message = _decode(message,
+                                  data,
+                                  decode_choices,
+                                  True,
+                                  decode_cache)
     except Exception as e:
         return ' ' + str(e)
 
@@ -120,9 +143,17 @@ def format_container_message(message, data, decode_choices, single_line):
         return _format_container_multi_line(message, decoded_message)
 
 
-def format_message(message, data, decode_choices, single_line):
+def format_message(message,
+                   data,
+                   decode_choices,
+                   single_line,
+                   decode_cache=None):
     try:
-        decoded_signals = message.decode(data, decode_choices)
+        decoded_signals = _decode(message,
+                                  data,
+                                  decode_choices,
+                                  False,
+                                  decode_cache)
     except Exception as e:
         return ' ' + str(e)
 
@@ -133,8 +164,20 @@ def format_message(message, data, decode_choices, single_line):
     else:
         return _format_message_multi_line(message, formatted_signals)
 
-def format_multiplexed_name(message, data, decode_choices):
-    decoded_signals = message.decode(data, decode_choices)
+def format_decoded_signals(message, decoded_signals, single_line):
+    formatted_signals = _format_signals(message, decoded_signals)
+
+    if single_line:
+        return _format_message_single_line(message, formatted_signals)
+    else:
+        return _format_message_multi_line(message, formatted_signals)
+
+def format_multiplexed_name(message, data, decode_choices, decode_cache=None):
+    decoded_signals = _decode(message,
+                              data,
+                              decode_choices,
+                              False,
+                              decode_cache)
 
     # The idea here is that we rely on the sorted order of the Signals, and
     # then simply go through each possible Multiplexer and build a composite
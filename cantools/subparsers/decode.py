@@ -5,7 +5,9 @@ from argparse_addons import Integer
 
 from .. import database
 from .. import logreader
-from .__utils__ import format_message_by_frame_id
+from .. import logdecode
+from ..database.can import DecodeCache
+from .__utils__ import format_message_by_frame_id, format_decoded_signals
 
 logging.basicConfig(level=logging.WARNING)
 
@@ -15,8 +17,16 @@ def _do_decode(args):
                                frame_id_mask=args.frame_id_mask,
                                prune_choices=args.prune,
                                strict=not args.no_strict)
+    if args.generate_decoders:
+        dbase.generate_decoders()
     decode_choices = not args.no_decode_choices
+    if args.log_file is not None:
+        _do_decode_log_file(args, dbase, decode_choices)
+        return
     decode_containers = not args.no_decode_containers
+    decode_cache = None
+    if args.decode_cache > 0:
+        decode_cache = DecodeCache(args.decode_cache)
     parser = logreader.Parser(sys.stdin)
     for line, frame in parser.iterlines(keep_unknowns=True):
         if frame is not None:
@@ -26,11 +36,33 @@ def _do_decode(args):
                                                frame.data,
                                                decode_choices,
                                                args.single_line,
-                                               decode_containers)
+                                               decode_containers,
+                                               decode_cache)
 
         print(line)
 
 
+def _do_decode_log_file(args, dbase, decode_choices):
+    decoder = logdecode.ParallelDecoder(args.log_file,
+                                        dbase,
+                                        processes=args.jobs,
+                                        decode_choices=decode_choices)
+    for frame in decoder:
+        timestamp = '' if frame.timestamp is None else f'({frame.timestamp:.6f}) '
+        channel = '' if frame.channel is None else f'{frame.channel} '
+        line = f'{timestamp}{channel}{frame.frame_id:03X} ::'
+        line += format_decoded_signals(dbase.get_message_by_name(frame.name),
+                                       frame.signals,
+                                       args.single_line)
+        print(line)
+    for statistics in decoder.statistics.values():
+        print(f'Worker {statistics.pid}: {statistics.shards} shards, '
+              f'{statistics.frames} frames, '
+              f'{statistics.frames_per_second:.0f} frames/s',
+              file=sys.stderr)
+    print(f'Total: {decoder.frames_per_second:.0f} frames/s', file=sys.stderr)
+
+
 def add_subparser(subparsers):
     decode_parser = subparsers.add_parser(
         'decode',
@@ -60,12 +92,32 @@ def add_subparser(subparsers):
         '--no-strict',
         action='store_true',
         help='Skip database consistency checks.')
+    decode_parser.add_argument(
+        '--generate-decoders',
+        action='store_true',
+        help='Decode with generated, message specific Python functions (faster).')
+    decode_parser.add_argument(
+        '--decode-cache',
+        type=int,
+        default=0,
+        metavar='SIZE',
+        help=('Remember the decoded signals of the last SIZE payloads of each '
+              'message, 0 to disable.'))
     decode_parser.add_argument(
         '-m', '--frame-id-mask',
         type=Integer(0),
         help=('Only compare selected frame id bits to find the message in the '
               'database. By default the candump and database frame ids must '
               'be equal for a match.'))
+    decode_parser.add_argument(
+        '-l', '--log-file',
+        help=('Decode given log file (any supported format) in parallel, '
+              'in timestamp order, instead of standard input.'))
+    decode_parser.add_argument(
+        '-j', '--jobs',
+        type=Integer(1),
+        help=('Number of processes decoding --log-file. One per CPU by '
+              'default.'))
     decode_parser.add_argument(
         'database',
         help='Database file.')
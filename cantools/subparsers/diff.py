@@ -0,0 +1,75 @@
+from argparse_addons import Integer
+
+from .. import logdiff
+from .. import logformats
+
+
+def _do_diff(args):
+    diff = logdiff.diff_logs(args.capture,
+                             processes=args.jobs,
+                             format=args.log_format,
+                             min_score=args.min_score,
+                             min_extend_score=args.min_extend_score,
+                             max_length=args.max_length,
+                             frame_ids=args.frame_ids)
+
+    for frame_id, names in sorted(diff.only_in.items()):
+        print('0x{:x} only in {}'.format(frame_id, ', '.join(names)))
+
+    for candidate in diff.candidates[:args.top]:
+        print(candidate)
+
+    print('{} candidates in {} frame ids.'.format(len(diff.candidates),
+                                                  len(diff.ids)))
+
+
+def add_subparser(subparsers):
+    diff_parser = subparsers.add_parser(
+        'diff',
+        description=('Compare two or more captures, for example with a '
+                     'button released and pressed, and print the bit ranges '
+                     'whose values differ between them, best first. A '
+                     'capture is a log file, or a time window of one as '
+                     'FILE@START:STOP in seconds from the start of the log '
+                     '(START and STOP are optional).'))
+    diff_parser.add_argument(
+        '-l', '--log-format',
+        choices=[log_format.name for log_format in logformats.get_formats()],
+        help='Log file format. Detected from the file by default.')
+    diff_parser.add_argument(
+        '-s', '--min-score',
+        type=float,
+        default=logdiff.DEFAULT_MIN_SCORE,
+        help=('Minimum difference of the set or toggle fraction of a bit '
+              'between two captures (default: %(default)s).'))
+    diff_parser.add_argument(
+        '--min-extend-score',
+        type=float,
+        default=logdiff.DEFAULT_MIN_EXTEND_SCORE,
+        help=('Minimum difference of the set or toggle fraction of a bit '
+              'next to a candidate to extend the candidate over it '
+              '(default: %(default)s).'))
+    diff_parser.add_argument(
+        '--max-length',
+        type=Integer(1, 64),
+        default=logdiff.DEFAULT_MAX_LENGTH,
+        help='Maximum length of a candidate in bits (default: %(default)s).')
+    diff_parser.add_argument(
+        '-n', '--top',
+        type=Integer(1),
+        default=20,
+        help='Print given number of candidates (default: %(default)s).')
+    diff_parser.add_argument(
+        '-f', '--frame-ids',
+        type=Integer(0),
+        nargs='+',
+        help='Only compare given frame ids.')
+    diff_parser.add_argument(
+        '-j', '--jobs',
+        type=Integer(1),
+        help='Number of processes reading captures (default: one per CPU).')
+    diff_parser.add_argument(
+        'capture',
+        nargs='+',
+        help='Captures, at least two.')
+    diff_parser.set_defaults(func=_do_diff)
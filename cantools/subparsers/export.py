@@ -0,0 +1,147 @@
+import argparse
+import os
+from argparse_addons import Integer
+
+from .. import database
+from .. import logformats
+from .. import logexport
+from .. import resample
+
+
+def _do_export(args):
+    dbase = database.load_file(args.database,
+                               encoding=args.encoding,
+                               frame_id_mask=args.frame_id_mask,
+                               prune_choices=args.prune,
+                               strict=not args.no_strict)
+
+    if args.generate_decoders:
+        dbase.generate_decoders()
+
+    for log_filename in args.logfile:
+        output_directory = args.output
+
+        if len(args.logfile) > 1:
+            output_directory = os.path.join(output_directory,
+                                            os.path.basename(log_filename))
+
+        if args.resample is not None:
+            os.makedirs(output_directory, exist_ok=True)
+            summary = logexport.export_resampled(
+                log_filename,
+                dbase,
+                os.path.join(output_directory, 'resampled.' + args.format),
+                period=args.resample,
+                method=args.resample_method,
+                max_age=args.max_age,
+                format=args.format,
+                row_group_size=args.row_group_size,
+                signals=args.signals,
+                decode_choices=args.decode_choices,
+                scaling=not args.no_scaling,
+                log_format=args.log_format)
+        else:
+            summary = logexport.export_log(log_filename,
+                                           dbase,
+                                           output_directory,
+                                           format=args.format,
+                                           row_group_size=args.row_group_size,
+                                           signals=args.signals,
+                                           decode_choices=args.decode_choices,
+                                           scaling=not args.no_scaling,
+                                           log_format=args.log_format)
+        print('{}: {} frames, {} decoded, {} unknown, {} errors.'.format(
+            log_filename,
+            summary.frames,
+            summary.decoded,
+            summary.unknown,
+            summary.errors))
+
+        for name, rows in sorted(summary.rows.items()):
+            print('  {}: {} rows'.format(summary.files[name], rows))
+
+
+def add_subparser(subparsers):
+    export_parser = subparsers.add_parser(
+        'export',
+        description=('Decode CAN log files and write the signals of each '
+                     'message to a Parquet, Arrow IPC or NumPy npz file.'),
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    export_parser.add_argument(
+        '-f', '--format',
+        choices=logexport.FORMATS,
+        default=logexport.default_format(),
+        help='Output format. Parquet and Arrow require pyarrow.')
+    export_parser.add_argument(
+        '-l', '--log-format',
+        choices=[log_format.name for log_format in logformats.get_formats()],
+        help='Log file format. Detected from the file by default.')
+    export_parser.add_argument(
+        '-r', '--row-group-size',
+        type=Integer(1),
+        default=logexport.DEFAULT_ROW_GROUP_SIZE,
+        help='Rows buffered per message before they are written.')
+    export_parser.add_argument(
+        '-s', '--signals',
+        nargs='+',
+        help=('Only export given signals, as SIGNAL or MESSAGE.SIGNAL. All '
+              'signals by default.'))
+    export_parser.add_argument(
+        '--resample',
+        type=float,
+        metavar='PERIOD',
+        help=('Write all signals to one file, resampled onto a common time '
+              'grid with given period in seconds.'))
+    export_parser.add_argument(
+        '--resample-method',
+        choices=resample.METHODS,
+        default='hold',
+        help=('Resampling method: zero-order hold, linear interpolation or '
+              'last value with a maximum age.'))
+    export_parser.add_argument(
+        '--max-age',
+        type=float,
+        help=('Maximum age in seconds of the last value (last), or the '
+              'longest interval to interpolate across (linear). Older '
+              'values are gaps.'))
+    export_parser.add_argument(
+        '-c', '--decode-choices',
+        action='store_true',
+        help='Convert scaled values to choice strings.')
+    export_parser.add_argument(
+        '--no-scaling',
+        action='store_true',
+        help='Export raw signal values.')
+    export_parser.add_argument(
+        '-e', '--encoding',
+        help='Database file encoding.')
+    export_parser.add_argument(
+        '--prune',
+        action='store_true',
+        help='Try to shorten the names of named signal choices.')
+    export_parser.add_argument(
+        '--no-strict',
+        action='store_true',
+        help='Skip database consistency checks.')
+    export_parser.add_argument(
+        '--generate-decoders',
+        action='store_true',
+        help='Decode with generated, message specific Python functions (faster).')
+    export_parser.add_argument(
+        '-m', '--frame-id-mask',
+        type=Integer(0),
+        help=('Only compare selected frame id bits to find the message in the '
+              'database. By default the log and database frame ids must '
+              'be equal for a match.'))
+    export_parser.add_argument(
+        'database',
+        help='Database file.')
+    export_parser.add_argument(
+        'output',
+        help=('Output directory. A subdirectory per log file is created if '
+              'more than one log file is given.'))
+    export_parser.add_argument(
+        'logfile',
+        nargs='+',
+        help='Log file(s).')
+    export_parser.set_defaults(func=_do_export)
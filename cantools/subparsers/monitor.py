@@ -8,6 +8,7 @@ import queue
 import can
 from argparse_addons import Integer
 from .. import database
+from ..database.can import DecodeCache
 from .__utils__ import format_message
 from .__utils__ import format_multiplexed_name
 
@@ -26,6 +27,11 @@ class Monitor(can.Listener):
                                          frame_id_mask=args.frame_id_mask,
                                          prune_choices=args.prune,
                                          strict=not args.no_strict)
+        if args.generate_decoders:
+            self._dbase.generate_decoders()
+        self._decode_cache = None
+        if args.decode_cache > 0:
+            self._decode_cache = DecodeCache(args.decode_cache)
         self._single_line = args.single_line
         self._filtered_sorted_message_names = []
         self._filter = ''
@@ -383,7 +389,10 @@ class Monitor(can.Listener):
             # case, we just discard the message, like we do when the CAN
             # message ID or length doesn't match what's specified in the DBC.
             try:
-                name = format_multiplexed_name(message, data, True)
+                name = format_multiplexed_name(message,
+                                               data,
+                                               True,
+                                               self._decode_cache)
             except database.DecodeError:
                 formatted = [
                     f'{timestamp:12.3f} {message.name} '
@@ -396,10 +405,18 @@ class Monitor(can.Listener):
         if self._single_line:
             formatted = [
                 '{:12.3f} {}'.format(timestamp,
-                                     format_message(message, data, True, True))
+                                     format_message(message,
+                                                    data,
+                                                    True,
+                                                    True,
+                                                    self._decode_cache))
             ]
         else:
-            formatted = format_message(message, data, True, False)
+            formatted = format_message(message,
+                                       data,
+                                       True,
+                                       False,
+                                       self._decode_cache)
             lines = formatted.splitlines()
             formatted = ['{:12.3f}  {}'.format(timestamp, lines[1])]
             formatted += [14 * ' ' + line for line in lines[2:]]
@@ -408,7 +425,12 @@ class Monitor(can.Listener):
 
     def _try_update_container(self, dbmsg, timestamp, data):
         try:
-            decoded = dbmsg.decode(data, decode_containers=True)
+            if self._decode_cache is None:
+                decoded = dbmsg.decode(data, decode_containers=True)
+            else:
+                decoded = self._decode_cache.decode(dbmsg,
+                                                    data,
+                                                    decode_containers=True)
         except:
             formatted = None
             if self._single_line:
@@ -597,6 +619,17 @@ def add_subparser(subparsers):
         '--no-strict',
         action='store_true',
         help='Skip database consistency checks.')
+    monitor_parser.add_argument(
+        '--generate-decoders',
+        action='store_true',
+        help='Decode with generated, message specific Python functions (faster).')
+    monitor_parser.add_argument(
+        '--decode-cache',
+        type=int,
+        default=0,
+        metavar='SIZE',
+        help=('Remember the decoded signals of the last SIZE payloads of each '
+              'message, 0 to disable.'))
     monitor_parser.add_argument(
         'database',
         help='Database file.')
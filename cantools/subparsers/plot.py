@@ -47,6 +47,10 @@ Signals can be separated by a ',' to make them refer to different vertical axes
 I recommend using this with the option --auto-color-ylabels.
 
 All signals (independent of the subplot and vertical axis) share the same horizontal axis.
+
+Numeric signals with many samples are drawn as a min/max envelope at the
+level of detail matching the width of the plot, which is recomputed when
+zooming or panning.
 '''
 
 import sys
@@ -57,12 +61,15 @@ import datetime
 import argparse
 from argparse_addons import Integer
 try:
+    import numpy as np
     from matplotlib import pyplot as plt
+    from matplotlib import dates as mdates
 except ImportError:
     plt = None
 
 from .. import database
 from .. import errors
+from .. import resample
 
 
 PYPLOT_BASE_COLORS = "bgrcmykwC"
@@ -333,6 +340,8 @@ def _do_decode(args):
                                frame_id_mask=args.frame_id_mask,
                                prune_choices=args.prune,
                                strict=not args.no_strict)
+    if args.generate_decoders:
+        dbase.generate_decoders()
     re_format = None
     timestamp_parser = TimestampParser(args)
     if args.show_invalid_syntax:
@@ -411,12 +420,18 @@ class Plotter:
         self.ignore_unknown_frames = args.ignore_unknown_frames
         self.ignore_invalid_data = args.ignore_invalid_data
         self.output_filename = args.output_file
+        self.resample_period = args.resample
+        self.resample_method = args.resample_method
+        self.max_age = args.max_age
         self.signals = Signals(args.signals, args.case_sensitive, args.break_time, args, args.auto_color_ylabels)
 
         self.x_invalid_syntax = []
         self.x_unknown_frames = []
         self.x_invalid_data = []
 
+        # frame id -> frozenset of the names of the displayed signals
+        self.displayed_signals = {}
+
     # ------- while reading data -------
 
     def add_msg(self, timestamp, frame_id, data):
@@ -430,7 +445,14 @@ class Plotter:
             return
 
         try:
-            decoded_signals = message.decode(data, self.decode_choices)
+            signals = self.displayed_signals[frame_id]
+        except KeyError:
+            signals = frozenset(signal.name for signal in message.signals
+                                if self.signals.is_displayed_signal(message.name + '.' + signal.name))
+            self.displayed_signals[frame_id] = signals
+
+        try:
+            decoded_signals = message.decode(data, self.decode_choices, signals=signals)
         except Exception as e:
             if self.show_invalid_data:
                 self.x_invalid_data.append(timestamp)
@@ -453,6 +475,9 @@ class Plotter:
     # ------- at end -------
 
     def plot(self, xlabel):
+        self.signals.finish()
+        if self.resample_period is not None:
+            self.signals.resample(self.resample_period, self.resample_method, self.max_age)
         self.signals.plot(xlabel, self.x_invalid_syntax, self.x_unknown_frames, self.x_invalid_data)
         if self.output_filename:
             plt.savefig(self.output_filename)
@@ -503,6 +528,9 @@ class Signals:
         self.re_flags = 0 if case_sensitive else re.I
         self.break_time = break_time
         self.break_time_uninit = True
+        # break_time in seconds (or line numbers), for LodPyramid.view()
+        self.break_seconds = break_time if break_time > 0 else None
+        self.lod_lines = []
         self.subplot = self.FIRST_SUBPLOT
         self.subplot_axis = self.FIRST_AXIS
         self.subplot_args = dict()
@@ -601,21 +629,78 @@ class Signals:
             self.values[signal] = graph
         else:
             graph = self.values[signal]
-            last_x = graph.x[-1]
+            last_x = graph.last_x
             if self.break_time_uninit:
                 self.init_break_time(type(x))
             if self.break_time and last_x + self.break_time < x:
                 x_break = last_x + self.half_break_time
-                graph.x.append(x_break)
-                graph.y.append(None)
-        graph.x.append(x)
-        graph.y.append(y)
+                graph.append(x_break, None)
+        graph.append(x, y)
+        graph.last_x = x
 
     def is_displayed_signal(self, signal):
         return self.reo.match(signal)
 
     # ------- at end -------
 
+    def finish(self):
+        for graph in self.values.values():
+            graph.finish()
+
+    def resample(self, period, method, max_age):
+        '''
+        Replaces the values of all graphs by their values on a common
+        time grid with the given period in seconds, see cantools.resample.
+        Non-numeric signals are held instead of interpolated linearly.
+        '''
+        series = {}
+        for signal_name, graph in self.values.items():
+            series[signal_name] = graph.samples()
+
+        origins = [origin for x, y, origin in series.values() if origin is not None]
+        origin = min(origins) if origins else None
+        for signal_name, (x, y, graph_origin) in series.items():
+            x = np.asarray(x, dtype=np.float64)
+            if graph_origin is not None:
+                x = x + (graph_origin - origin).total_seconds()
+            series[signal_name] = (x, y)
+
+        non_empty = [x for x, y in series.values() if len(x)]
+        if not non_empty:
+            return
+        grid = resample.make_grid(min(x.min() for x in non_empty),
+                                  max(x.max() for x in non_empty),
+                                  period)
+
+        for signal_name, (x, y) in series.items():
+            try:
+                values = resample.resample(x, y, grid, method, max_age)
+            except errors.Error:
+                values = resample.resample(x, y, grid, 'hold')
+            self.values[signal_name].set_samples(grid, values, origin)
+
+        # Gaps (NaN) are not stored in pyramids, break where a grid point is missing.
+        self.break_seconds = 1.5 * period
+
+    def axes_pixels(self, splot):
+        return splot.get_window_extent().width
+
+    def update_lod(self, splot):
+        '''
+        Is called when the x limits of splot change (zoom, pan)
+        and replaces the data of its lines which are drawn
+        from a LodPyramid by the matching level of detail.
+        The canvas is redrawn by whoever changed the limits.
+        '''
+        x0, x1 = splot.get_xlim()
+        pixels = self.axes_pixels(splot)
+        for lod_splot, line, pyramid in self.lod_lines:
+            if lod_splot is splot:
+                line.set_data(*pyramid.view(pyramid.from_x(x0),
+                                            pyramid.from_x(x1),
+                                            pixels,
+                                            self.break_seconds))
+
     SUBPLOT_DIRECT_NAMES = ('title', 'ylabel')
     def plot(self, xlabel, x_invalid_syntax, x_unknown_frames, x_invalid_data):
         self.default_xlabel = xlabel
@@ -654,13 +739,25 @@ class Signals:
                 else:
                     graph.plotted_signal = sgo
 
-                x = graph.x
-                y = graph.y
-                if axis_format_uninitialized and x:
-                    if isinstance(x[0], float):
+                if graph.has_lod():
+                    pyramid = graph.pyramid
+                    if sgo.plt_func == 'plot':
+                        x, y = pyramid.view(None, None, self.axes_pixels(splot), self.break_seconds)
+                    else:
+                        x, y = pyramid.samples()
+                        x = pyramid.to_x(x)
+                    is_float = pyramid.x_kind == 'float'
+                else:
+                    x = graph.x
+                    y = graph.y
+                    is_float = bool(x) and isinstance(x[0], float)
+                if axis_format_uninitialized and len(x):
+                    if is_float:
                         splot.axes.xaxis.set_major_formatter(lambda x,pos: str(datetime.timedelta(seconds=x)))
                     axis_format_uninitialized = False
                 l = getattr(splot, sgo.plt_func)(x, y, sgo.fmt, label=signal_name)
+                if graph.has_lod() and sgo.plt_func == 'plot':
+                    self.lod_lines.append((splot, l[0], graph.pyramid))
                 color = self.subplot_args[(sgo.subplot, sgo.axis)].color
                 if color is not None and self.contains_no_color(sgo.fmt):
                     for p in l:
@@ -670,6 +767,10 @@ class Signals:
             if not plotted:
                 print("WARNING: signal %r with format %r was not plotted." % (sgo.reo.pattern, sgo.fmt))
 
+        lod_splots = {id(lod_splot): lod_splot for lod_splot, line, pyramid in self.lod_lines}
+        for lod_splot in lod_splots.values():
+            lod_splot.callbacks.connect('xlim_changed', self.update_lod)
+
         self.plot_error(splot, x_invalid_syntax, 'invalid syntax', self.COLOR_INVALID_SYNTAX)
         self.plot_error(splot, x_unknown_frames, 'unknown frames', self.COLOR_UNKNOWN_FRAMES)
         self.plot_error(splot, x_invalid_data, 'invalid data', self.COLOR_INVALID_DATA)
@@ -779,14 +880,276 @@ class Graph:
     to avoid undesired replotting of the same data in case the user gives two regex
     matching the same signal, one more specific to match a certain signal with a special format
     and one more generic matching the rest with another format.
+
+    Once BLOCK_SIZE values have been added, the values of numeric signals
+    are moved to a LodPyramid in blocks of BLOCK_SIZE values.
+    x and y then only hold the values not moved yet.
     '''
 
-    __slots__ = ('x', 'y', 'plotted_signal')
+    __slots__ = ('x', 'y', 'plotted_signal', 'last_x', 'pyramid')
+
+    BLOCK_SIZE = 65536
 
     def __init__(self):
         self.x = []
         self.y = []
         self.plotted_signal = None
+        self.last_x = None
+        # None until the first block is full, False if the signal is not numeric
+        self.pyramid = None
+
+    def append(self, x, y):
+        self.x.append(x)
+        self.y.append(y)
+        if len(self.x) >= self.BLOCK_SIZE and self.pyramid is not False:
+            self.compact()
+
+    def has_lod(self):
+        return isinstance(self.pyramid, LodPyramid)
+
+    def compact(self):
+        if self.pyramid is None:
+            self.pyramid = LodPyramid()
+        try:
+            self.pyramid.add(self.x, self.y)
+        except (TypeError, ValueError):
+            # Not numeric, move the values back to x and y.
+            x, y = self.values_of_pyramid()
+            self.x = x + self.x
+            self.y = y + self.y
+            self.pyramid = False
+            return
+        self.x = []
+        self.y = []
+
+    def values_of_pyramid(self):
+        if not self.has_lod():
+            return [], []
+        x, y = self.pyramid.samples()
+        origin = self.pyramid.origin
+        if origin is not None:
+            x = [origin + datetime.timedelta(seconds=x) for x in x.tolist()]
+        elif self.pyramid.x_kind == 'int':
+            x = [int(x) for x in x.tolist()]
+        else:
+            x = x.tolist()
+        return x, y.tolist()
+
+    def finish(self):
+        if self.has_lod() and self.x:
+            self.compact()
+
+    def samples(self):
+        '''
+        Returns the x values (in seconds after origin if they are
+        datetimes), the y values without breaks and the origin.
+        '''
+        if self.has_lod():
+            self.finish()
+        if self.has_lod():
+            x, y = self.pyramid.samples()
+            return x, y, self.pyramid.origin
+        x = [x for x, y in zip(self.x, self.y) if y is not None]
+        y = [y for y in self.y if y is not None]
+        origin = None
+        if x and isinstance(x[0], datetime.datetime):
+            origin = x[0]
+            x = [(x - origin).total_seconds() for x in x]
+        return x, y, origin
+
+    def set_samples(self, x, y, origin):
+        '''
+        Replaces all values by the given arrays, x in seconds after
+        origin if origin is not None.
+        '''
+        if origin is not None:
+            self.x = [origin + datetime.timedelta(seconds=x) for x in x.tolist()]
+        else:
+            self.x = x.tolist()
+        self.y = y.tolist()
+        self.pyramid = None
+        if len(self.x) >= self.BLOCK_SIZE:
+            self.compact()
+
+
+class LodPyramid:
+
+    '''
+    A multi-resolution min/max representation of the samples of one
+    numeric signal, for plotting long recordings.
+
+    Samples are compacted into numpy arrays in blocks while reading.
+    finish() builds the levels: level 0 holds all samples, each bin of
+    level n+1 summarizes up to FACTOR bins of level n by its first,
+    minimum, maximum and last sample. Bins do not span breaks, i.e.
+    more than break_time between two samples. view() returns the finest
+    level with at most BINS_PER_PIXEL bins per pixel of the visible range.
+    '''
+
+    FACTOR = 8
+
+    # Bins in the visible range, per pixel.
+    BINS_PER_PIXEL = 2
+
+    # Samples in the visible range drawn as they are, per pixel.
+    RAW_SAMPLES_PER_PIXEL = 4
+
+    def __init__(self):
+        self.x_kind = None
+        self.origin = None
+        self.x_blocks = []
+        self.y_blocks = []
+        self.levels = None
+        self.gaps = None
+        self.break_time = None
+
+    def __len__(self):
+        return sum(len(x) for x in self.x_blocks)
+
+    # ------- while reading data -------
+
+    def add(self, xs, ys):
+        '''
+        Adds lists of samples. None values (breaks) are skipped.
+        Raises TypeError or ValueError if a value is not numeric.
+        '''
+        y = np.array(ys, dtype=np.float64)
+        if self.x_kind is None:
+            x0 = xs[0]
+            if isinstance(x0, datetime.datetime):
+                self.x_kind = 'datetime'
+                self.origin = x0
+            elif isinstance(x0, float):
+                self.x_kind = 'float'
+            else:
+                self.x_kind = 'int'
+        if self.origin is not None:
+            origin = self.origin
+            x = np.array([(x - origin).total_seconds() for x in xs])
+        else:
+            x = np.array(xs, dtype=np.float64)
+        valid = ~np.isnan(y)
+        self.x_blocks.append(x[valid])
+        self.y_blocks.append(y[valid])
+        self.levels = None
+
+    def samples(self):
+        '''
+        Returns the x values (in seconds after origin for datetimes)
+        and y values of all samples as arrays.
+        '''
+        if not self.x_blocks:
+            return np.array([]), np.array([])
+        if len(self.x_blocks) > 1:
+            self.x_blocks = [np.concatenate(self.x_blocks)]
+            self.y_blocks = [np.concatenate(self.y_blocks)]
+        return self.x_blocks[0], self.y_blocks[0]
+
+    def to_x(self, x):
+        '''
+        Converts x values as stored to values matplotlib can plot.
+        '''
+        if self.origin is None:
+            return x
+        return (np.datetime64(self.origin, 'us')
+                + np.round(x * 1e6).astype('timedelta64[us]'))
+
+    def from_x(self, x):
+        '''
+        Converts an x axis limit to an x value as stored.
+        '''
+        if self.origin is None:
+            return x
+        return (x - mdates.date2num(self.origin)) * 86400
+
+    # ------- at end -------
+
+    @staticmethod
+    def _first_in_group(mask, group):
+        index = np.flatnonzero(mask)
+        first = np.flatnonzero(np.diff(group[index], prepend=-1))
+        return index[first]
+
+    @classmethod
+    def _reduce(cls, level, gaps):
+        x_first, x_last, y_first, y_last, y_min, y_max, x_min, x_max = level
+        number = len(x_first)
+        starts = np.union1d(np.arange(0, number, cls.FACTOR), np.flatnonzero(gaps))
+        ends = np.append(starts[1:], number)
+        group = np.repeat(np.arange(len(starts)), ends - starts)
+        minimum = np.minimum.reduceat(y_min, starts)
+        maximum = np.maximum.reduceat(y_max, starts)
+        level = (x_first[starts],
+                 x_last[ends - 1],
+                 y_first[starts],
+                 y_last[ends - 1],
+                 minimum,
+                 maximum,
+                 x_min[cls._first_in_group(y_min == minimum[group], group)],
+                 x_max[cls._first_in_group(y_max == maximum[group], group)])
+        return level, gaps[starts]
+
+    def finish(self, break_time=None):
+        x, y = self.samples()
+        level = (x, x, y, y, y, y, x, x)
+        # True for the samples (bins) after a break
+        gaps = np.zeros(len(x), dtype=bool)
+        if break_time and len(x):
+            gaps[1:] = np.diff(x) > break_time
+        self.levels = [level]
+        self.gaps = [gaps]
+        self.break_time = break_time
+        while len(level[0]) > self.FACTOR:
+            level, gaps = self._reduce(level, gaps)
+            if len(level[0]) == len(self.levels[-1][0]):
+                break
+            self.levels.append(level)
+            self.gaps.append(gaps)
+
+    def view(self, x0, x1, pixels, break_time=None):
+        '''
+        Returns the x and y values to plot for the range from x0 to x1
+        (all samples if None) at the given width in pixels. A NaN is
+        inserted at breaks.
+        '''
+        if self.levels is None or break_time != self.break_time:
+            self.finish(break_time)
+        pixels = max(int(pixels), 1)
+        x = self.levels[0][0]
+        if x0 is None:
+            x0 = x[0] if len(x) else 0.0
+            x1 = x[-1] if len(x) else 0.0
+        for level, gaps in zip(self.levels, self.gaps):
+            x_first, x_last = level[0], level[1]
+            i0 = max(np.searchsorted(x_last, x0, 'left') - 1, 0)
+            i1 = np.searchsorted(x_first, x1, 'right') + 1
+            if level is self.levels[0]:
+                if i1 - i0 <= self.RAW_SAMPLES_PER_PIXEL * pixels:
+                    break
+            elif i1 - i0 <= self.BINS_PER_PIXEL * pixels:
+                break
+        x_first, x_last, y_first, y_last, y_min, y_max, x_min, x_max = \
+            [array[i0:i1] for array in level]
+        gaps = np.flatnonzero(gaps[i0:i1])
+        if level is self.levels[0]:
+            xs = x_first
+            ys = y_first
+        else:
+            gaps *= 4
+            min_first = x_min <= x_max
+            xs = np.column_stack((x_first,
+                                  np.where(min_first, x_min, x_max),
+                                  np.where(min_first, x_max, x_min),
+                                  x_last)).ravel()
+            ys = np.column_stack((y_first,
+                                  np.where(min_first, y_min, y_max),
+                                  np.where(min_first, y_max, y_min),
+                                  y_last)).ravel()
+        gaps = gaps[gaps > 0]
+        if len(gaps):
+            xs = np.insert(xs, gaps, (xs[gaps - 1] + xs[gaps]) / 2)
+            ys = np.insert(ys, gaps, np.nan)
+        return self.to_x(xs), ys
 
 
 class RawDescriptionArgumentDefaultsHelpFormatter(
@@ -881,6 +1244,21 @@ def add_subparser(subparsers):
         help='An end time or line number. Everything after is ignored. '
              'This filters the lines/messages to be processed. It does *not* set the maximum value of the x-axis.')
 
+    plot_parser.add_argument(
+        '--resample',
+        type=float,
+        metavar='PERIOD',
+        help='Resample all signals onto a common time grid with the given period in seconds.')
+    plot_parser.add_argument(
+        '--resample-method',
+        choices=resample.METHODS,
+        default='hold',
+        help='Resampling method: zero-order hold, linear interpolation or last value with a maximum age.')
+    plot_parser.add_argument(
+        '--max-age',
+        type=float,
+        help='Maximum age in seconds of the last value (last), or the longest interval to interpolate across (linear).')
+
     plot_parser.add_argument(
         '--style',
         help='The matplotlib style to be used.')
@@ -900,6 +1278,10 @@ def add_subparser(subparsers):
         '--no-strict',
         action='store_true',
         help='Skip database consistency checks.')
+    plot_parser.add_argument(
+        '--generate-decoders',
+        action='store_true',
+        help='Decode with generated, message specific Python functions (faster).')
 
     plot_parser.add_argument(
         'database',
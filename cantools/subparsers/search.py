@@ -0,0 +1,119 @@
+import os
+from argparse_addons import Integer
+
+from .. import database
+from .. import logformats
+from .. import logquery
+from .. import signalstore
+
+
+SQLITE_HEADER = b'SQLite format 3\x00'
+
+
+def _is_signal_store(filename):
+    with open(filename, 'rb') as fin:
+        return fin.read(len(SQLITE_HEADER)) == SQLITE_HEADER
+
+
+def _load_database(args):
+    if args.database is None:
+        return None
+
+    return database.load_file(args.database,
+                              encoding=args.encoding,
+                              frame_id_mask=args.frame_id_mask,
+                              prune_choices=args.prune,
+                              strict=not args.no_strict)
+
+
+def _do_search(args):
+    query = logquery.Query(args.query)
+    dbase = _load_database(args)
+    limit = 1 if args.first else args.limit
+
+    if os.path.isdir(args.source):
+        intervals = query.search_columns(args.source,
+                                         dbase,
+                                         args.start,
+                                         args.stop,
+                                         limit)
+    elif _is_signal_store(args.source):
+        with signalstore.SignalStore(args.source) as store:
+            intervals = query.search_store(store, args.start, args.stop, limit)
+    else:
+        if dbase is None:
+            raise logquery.QueryError(
+                'A database is required to search a log file.')
+
+        intervals = query.search_log(args.source,
+                                     dbase,
+                                     args.start,
+                                     args.stop,
+                                     limit,
+                                     args.log_format)
+
+    for start, end in intervals:
+        if start == end:
+            print('{:.6f}'.format(start))
+        else:
+            print('{:.6f} - {:.6f} ({:.3f} s)'.format(start, end, end - start))
+
+    print('{} matches.'.format(len(intervals)))
+
+
+def add_subparser(subparsers):
+    search_parser = subparsers.add_parser(
+        'search',
+        description=('Search a log file, a directory of exported signals or '
+                     'a signal store for the time intervals where a query '
+                     'holds, for example "rising(DOOR == OPEN) and '
+                     'SPEED > 0" or "lasting(GEAR == R, 2s)". See '
+                     'cantools.logquery for the query syntax.'))
+    search_parser.add_argument(
+        '-d', '--database',
+        help='Database file, required to search log files.')
+    search_parser.add_argument(
+        '-l', '--log-format',
+        choices=[log_format.name for log_format in logformats.get_formats()],
+        help='Log file format. Detected from the file by default.')
+    search_parser.add_argument(
+        '--start',
+        type=float,
+        help='Start time in seconds.')
+    search_parser.add_argument(
+        '--stop',
+        type=float,
+        help='Stop time in seconds.')
+    search_parser.add_argument(
+        '-n', '--limit',
+        type=Integer(1),
+        help='Print at most given number of matches.')
+    search_parser.add_argument(
+        '-f', '--first',
+        action='store_true',
+        help='Print the first match only.')
+    search_parser.add_argument(
+        '-e', '--encoding',
+        help='Database file encoding.')
+    search_parser.add_argument(
+        '--prune',
+        action='store_true',
+        help='Try to shorten the names of named signal choices.')
+    search_parser.add_argument(
+        '--no-strict',
+        action='store_true',
+        help='Skip database consistency checks.')
+    search_parser.add_argument(
+        '-m', '--frame-id-mask',
+        type=Integer(0),
+        help=('Only compare selected frame id bits to find the message in the '
+              'database. By default the log and database frame ids must '
+              'be equal for a match.'))
+    search_parser.add_argument(
+        'source',
+        help=('Log file, directory of files written by the export '
+              'subcommand, or signal store file.'))
+    search_parser.add_argument(
+        'query',
+        help='Query.')
+    search_parser.set_defaults(func=_do_search)
@@ -0,0 +1,180 @@
+import argparse
+import time
+from argparse_addons import Integer
+
+from .. import database
+from .. import logformats
+from .. import signalstore
+
+
+def _do_import(args):
+    dbase = database.load_file(args.database,
+                               encoding=args.encoding,
+                               frame_id_mask=args.frame_id_mask,
+                               prune_choices=args.prune,
+                               strict=not args.no_strict)
+
+    if not args.no_generate_decoders:
+        dbase.generate_decoders()
+
+    with signalstore.SignalStore(args.store,
+                                 dbase,
+                                 changes_only=args.changes_only,
+                                 batch_size=args.batch_size) as store:
+        for log_filename in args.logfile:
+            start = time.perf_counter()
+            samples_added = store.samples_added
+            reader = logformats.open_log(log_filename, args.log_format)
+
+            for batch in reader.batches():
+                store.add_frames(batch)
+
+            store.flush()
+            samples = store.samples_added - samples_added
+            seconds = time.perf_counter() - start
+            print('{}: {} samples in {:.1f} s ({:.0f} samples/s).'.format(
+                log_filename,
+                samples,
+                seconds,
+                samples / seconds if seconds > 0 else 0))
+
+
+def _format_sample(sample):
+    if sample.text is None:
+        return '{:.6f} {}'.format(sample.time, sample.value)
+    elif sample.value is None:
+        return '{:.6f} {}'.format(sample.time, sample.text)
+    else:
+        return '{:.6f} {} ({})'.format(sample.time, sample.text, sample.value)
+
+
+def _do_list(args):
+    with signalstore.SignalStore(args.store) as store:
+        for name in store.signals():
+            print(name)
+
+
+def _do_samples(args):
+    with signalstore.SignalStore(args.store) as store:
+        for sample in store.samples(args.signal, args.start, args.stop):
+            print(_format_sample(sample))
+
+
+def _do_when(args):
+    with signalstore.SignalStore(args.store) as store:
+        intervals = store.intervals(args.queries, args.start, args.stop)
+
+    total = 0
+
+    for start, end in intervals:
+        print('{:.6f} - {:.6f} ({:.3f} s)'.format(start, end, end - start))
+        total += end - start
+
+    print('{} intervals, {:.3f} s in total.'.format(len(intervals), total))
+
+
+def _add_range_arguments(parser):
+    parser.add_argument(
+        '--start',
+        type=float,
+        help='Start time in seconds.')
+    parser.add_argument(
+        '--stop',
+        type=float,
+        help='Stop time in seconds.')
+
+
+def add_subparser(subparsers):
+    store_parser = subparsers.add_parser(
+        'store',
+        description=('Import decoded signals of CAN log files into an SQLite '
+                     'signal store and query it.'))
+    store_subparsers = store_parser.add_subparsers(title='actions',
+                                                   dest='action')
+    store_subparsers.required = True
+
+    import_parser = store_subparsers.add_parser(
+        'import',
+        description='Decode log files and add their signals to a store.',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    import_parser.add_argument(
+        '-c', '--changes-only',
+        action='store_true',
+        help='Only store a sample if the value of its signal changed.')
+    import_parser.add_argument(
+        '-l', '--log-format',
+        choices=[log_format.name for log_format in logformats.get_formats()],
+        help='Log file format. Detected from the file by default.')
+    import_parser.add_argument(
+        '-b', '--batch-size',
+        type=Integer(1),
+        default=signalstore.DEFAULT_BATCH_SIZE,
+        help='Samples inserted per transaction.')
+    import_parser.add_argument(
+        '-e', '--encoding',
+        help='Database file encoding.')
+    import_parser.add_argument(
+        '--prune',
+        action='store_true',
+        help='Try to shorten the names of named signal choices.')
+    import_parser.add_argument(
+        '--no-strict',
+        action='store_true',
+        help='Skip database consistency checks.')
+    import_parser.add_argument(
+        '--no-generate-decoders',
+        action='store_true',
+        help='Decode with the generic decoder instead of generated functions.')
+    import_parser.add_argument(
+        '-m', '--frame-id-mask',
+        type=Integer(0),
+        help=('Only compare selected frame id bits to find the message in the '
+              'database. By default the log and database frame ids must '
+              'be equal for a match.'))
+    import_parser.add_argument(
+        'database',
+        help='Database file.')
+    import_parser.add_argument(
+        'store',
+        help='Signal store (SQLite) file, created if missing.')
+    import_parser.add_argument(
+        'logfile',
+        nargs='+',
+        help='Log file(s).')
+    import_parser.set_defaults(func=_do_import)
+
+    list_parser = store_subparsers.add_parser(
+        'list',
+        description='List the signals in a store.')
+    list_parser.add_argument(
+        'store',
+        help='Signal store (SQLite) file.')
+    list_parser.set_defaults(func=_do_list)
+
+    samples_parser = store_subparsers.add_parser(
+        'samples',
+        description='Print the samples of a signal.')
+    _add_range_arguments(samples_parser)
+    samples_parser.add_argument(
+        'store',
+        help='Signal store (SQLite) file.')
+    samples_parser.add_argument(
+        'signal',
+        help='Signal name, SIGNAL or MESSAGE.SIGNAL.')
+    samples_parser.set_defaults(func=_do_samples)
+
+    when_parser = store_subparsers.add_parser(
+        'when',
+        description=('Print the time intervals where all given queries '
+                     'hold, for example "Gear == R" "Speed > 5". The value of '
+                     'a signal is held until its next sample.'))
+    _add_range_arguments(when_parser)
+    when_parser.add_argument(
+        'store',
+        help='Signal store (SQLite) file.')
+    when_parser.add_argument(
+        'queries',
+        nargs='+',
+        help=('Queries, for example "rising(DOOR == OPEN) and SPEED > 0", '
+              'see the search subcommand for the syntax.'))
+    when_parser.set_defaults(func=_do_when)
@@ -1,8 +1,12 @@
 # The tester module.
 
+import asyncio
+import heapq
+import itertools
+import threading
 import time
 from collections import UserDict
-import queue
+from collections import deque
 
 import can
 
@@ -19,18 +23,219 @@ class DecodedMessage(object):
         self.signals = signals
 
 
+def _signals_matcher(signals):
+    if signals is None:
+        signals = {}
+
+    def match(message):
+        return all([message.signals[name] == signals[name]
+                    for name in signals])
+
+    return match
+
+
 class Messages(dict):
 
     def __missing__(self, key):
         raise Error("invalid message name '{}'".format(key))
 
 
+class InputBuffer(object):
+    """Received messages, with one queue per message name.
+
+    Every message is numbered in the order it was received. Discarding
+    all messages received before a given message moves a watermark and
+    drops the older messages from the front of every queue.
+
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._queues = {}
+        self._next_sequence = 0
+        self._watermark = 0
+
+    def put(self, message):
+        with self._condition:
+            try:
+                message_queue = self._queues[message.name]
+            except KeyError:
+                message_queue = deque()
+                self._queues[message.name] = message_queue
+
+            message_queue.append((self._next_sequence, message))
+            self._next_sequence += 1
+            self._condition.notify_all()
+
+    def get(self, name, match, timeout, discard_other_messages):
+        """Returns the oldest message with given name for which `match`
+        returns ``True``, waiting at most `timeout` seconds for it, or
+        ``None`` on timeout.
+
+        If `discard_other_messages` is ``True`` all messages received
+        before the returned one (or before the timeout) are discarded,
+        otherwise only the returned message is removed.
+
+        """
+
+        if timeout is not None:
+            end_time = time.monotonic() + timeout
+
+        with self._condition:
+            message_queue = self._queue(name)
+            after = 0
+
+            while True:
+                message, after = self._find(message_queue,
+                                            after,
+                                            match,
+                                            discard_other_messages)
+
+                if message is not None:
+                    return message
+
+                if timeout is None:
+                    self._condition.wait()
+                else:
+                    remaining_time = end_time - time.monotonic()
+
+                    if remaining_time <= 0:
+                        break
+
+                    self._condition.wait(remaining_time)
+
+            if discard_other_messages:
+                self._move_watermark(self._next_sequence)
+
+    def clear(self):
+        with self._condition:
+            self._move_watermark(self._next_sequence)
+
+    def _queue(self, name):
+        try:
+            return self._queues[name]
+        except KeyError:
+            message_queue = deque()
+            self._queues[name] = message_queue
+
+            return message_queue
+
+    def _move_watermark(self, sequence):
+        """Discard all messages received before given sequence number, in
+        all queues, so that queues of messages never expected do not grow
+        without bound.
+
+        """
+
+        if sequence <= self._watermark:
+            return
+
+        self._watermark = sequence
+
+        for message_queue in self._queues.values():
+            while message_queue and message_queue[0][0] < sequence:
+                message_queue.popleft()
+
+    def _find(self, message_queue, after, match, discard_other_messages):
+        """Search given queue for a matching message with a sequence
+        number of at least `after`. Returns the message, or ``None``, and
+        the sequence number to continue the search from once more
+        messages have been received.
+
+        """
+
+        # Messages may have been removed meanwhile, so the position to
+        # continue from is found from the end of the queue.
+        index = len(message_queue)
+
+        while index > 0 and message_queue[index - 1][0] >= after:
+            index -= 1
+
+        while index < len(message_queue):
+            sequence, message = message_queue[index]
+
+            if match(message):
+                del message_queue[index]
+
+                if discard_other_messages:
+                    self._move_watermark(sequence + 1)
+
+                return message, sequence + 1
+
+            if discard_other_messages:
+                del message_queue[index]
+            else:
+                index += 1
+
+        return None, self._next_sequence
+
+
+class AsyncInputBuffer(InputBuffer):
+    """An :class:`~cantools.tester.InputBuffer` read by coroutines. It
+    must only be used from the thread running its event loop.
+
+    """
+
+    def __init__(self):
+        super(AsyncInputBuffer, self).__init__()
+        self._waiters = {}
+
+    def put(self, message):
+        super(AsyncInputBuffer, self).put(message)
+
+        for waiter in self._waiters.pop(message.name, []):
+            if not waiter.done():
+                waiter.set_result(None)
+
+    async def get(self, name, match, timeout, discard_other_messages):
+        loop = asyncio.get_running_loop()
+
+        if timeout is not None:
+            end_time = loop.time() + timeout
+
+        message_queue = self._queue(name)
+        after = 0
+
+        while True:
+            message, after = self._find(message_queue,
+                                        after,
+                                        match,
+                                        discard_other_messages)
+
+            if message is not None:
+                return message
+
+            waiter = loop.create_future()
+            self._waiters.setdefault(name, []).append(waiter)
+
+            try:
+                if timeout is None:
+                    await waiter
+                else:
+                    remaining_time = end_time - loop.time()
+
+                    if remaining_time <= 0:
+                        break
+
+                    await asyncio.wait_for(waiter, remaining_time)
+            except asyncio.TimeoutError:
+                break
+            finally:
+                waiters = self._waiters.get(name, [])
+
+                if waiter in waiters:
+                    waiters.remove(waiter)
+
+        if discard_other_messages:
+            self._move_watermark(self._next_sequence)
+
+
 class Listener(can.Listener):
 
-    def __init__(self, database, messages, input_queue, on_message):
+    def __init__(self, database, messages, input_buffer, on_message):
         self._database = database
         self._messages = messages
-        self._input_queue = input_queue
+        self._input_buffer = input_buffer
         self._on_message = on_message
 
     def on_message_received(self, msg):
@@ -56,10 +261,297 @@ class Listener(can.Listener):
                                                          message.decode_choices,
                                                          message.scaling))
 
+        self._dispatch(decoded)
+
+    def _dispatch(self, decoded):
         if self._on_message:
             self._on_message(decoded)
 
-        self._input_queue.put(decoded)
+        self._input_buffer.put(decoded)
+
+
+class AsyncListener(Listener):
+    """A listener called in an event loop by a python-can notifier. The
+    `on_message` callback may be a coroutine function, its coroutines
+    are run as tasks of the loop.
+
+    """
+
+    def _dispatch(self, decoded):
+        if self._on_message:
+            result = self._on_message(decoded)
+
+            if asyncio.iscoroutine(result):
+                asyncio.ensure_future(result)
+
+        self._input_buffer.put(decoded)
+
+
+class PeriodicStatistics(object):
+    """Send statistics of a periodic message sent by a
+    :class:`~cantools.tester.Scheduler`.
+
+    `jitter` is the delay between the time a frame was due and the time
+    it was sent, in seconds. `overruns` is the number of periods which
+    were skipped because the frame was more than one period late.
+
+    """
+
+    def __init__(self):
+        self.sent = 0
+        self.overruns = 0
+        self.max_jitter = 0.0
+        self.total_jitter = 0.0
+
+    @property
+    def mean_jitter(self):
+        if self.sent == 0:
+            return 0.0
+
+        return self.total_jitter / self.sent
+
+    def __repr__(self):
+        return ('PeriodicStatistics(sent={}, overruns={}, '
+                'mean_jitter={:.6f}, max_jitter={:.6f})'.format(
+                    self.sent,
+                    self.overruns,
+                    self.mean_jitter,
+                    self.max_jitter))
+
+
+class _ScheduledMessage(object):
+
+    def __init__(self, message, period):
+        self.message = message
+        self.period = period
+        self.active = True
+
+
+class Scheduler(object):
+    """Sends all periodic messages of a residual bus simulation from a
+    single thread, instead of one python-can periodic task per
+    message.
+
+    Messages are kept in a heap ordered by the time they are due
+    next. Each time the thread wakes up all messages due within
+    `resolution` seconds are sent as one batch, with the frame
+    encoded the last time the signal values of the message were
+    changed. A message which is more than a period late skips the
+    missed periods, keeping its phase, and the skipped periods are
+    counted as overruns in its :class:`PeriodicStatistics`.
+
+    """
+
+    def __init__(self, can_bus, resolution=0.001):
+        self._can_bus = can_bus
+        self._resolution = resolution
+        self._heap = []
+        self._scheduled = {}
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._thread = None
+        self._is_running = False
+        self.statistics = {}
+        self.batches = 0
+
+    def add(self, message):
+        """Start sending given :class:`~cantools.tester.Message` every
+        cycle time of its database message, beginning now.
+
+        """
+
+        period = message.database.cycle_time / 1000.0
+
+        with self._condition:
+            self._remove(message)
+            scheduled = _ScheduledMessage(message, period)
+            self._scheduled[message.database.name] = scheduled
+            self.statistics.setdefault(message.database.name,
+                                       PeriodicStatistics())
+            self._push(time.monotonic(), scheduled)
+            self._wake()
+
+    def remove(self, message):
+        """Stop sending given message.
+
+        """
+
+        with self._condition:
+            self._remove(message)
+
+    def _remove(self, message):
+        scheduled = self._scheduled.pop(message.database.name, None)
+
+        if scheduled is not None:
+            scheduled.active = False
+
+    def _push(self, due, scheduled):
+        heapq.heappush(self._heap, (due, next(self._sequence), scheduled))
+
+    def _wake(self):
+        self._condition.notify()
+
+    def start(self):
+        if self._thread is not None:
+            return
+
+        self._is_running = True
+        self._thread = threading.Thread(target=self._run,
+                                        name='cantools-scheduler',
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+
+        with self._condition:
+            self._is_running = False
+            self._condition.notify()
+
+        self._thread.join()
+        self._thread = None
+
+    def reset_statistics(self):
+        with self._condition:
+            self.statistics = {
+                name: PeriodicStatistics() for name in self._scheduled
+            }
+            self.batches = 0
+
+    def _next_batch(self):
+        """Wait for the next batch of due messages. Returns ``None`` when
+        the scheduler is stopped.
+
+        """
+
+        while self._is_running:
+            if not self._heap:
+                self._condition.wait()
+                continue
+
+            now = time.monotonic()
+            timeout = self._heap[0][0] - now
+
+            if timeout > 0:
+                self._condition.wait(timeout)
+                continue
+
+            batch = self._pop_batch(now)
+
+            if batch:
+                return batch
+
+    def _pop_batch(self, now):
+        batch = []
+        horizon = now + self._resolution
+
+        while self._heap and self._heap[0][0] <= horizon:
+            due, _, scheduled = heapq.heappop(self._heap)
+
+            if scheduled.active:
+                batch.append((due, scheduled))
+
+        return batch
+
+    def _send_batch(self, batch):
+        sent = []
+
+        for due, scheduled in batch:
+            try:
+                self._can_bus.send(scheduled.message._can_message)
+            except can.CanError:
+                pass
+
+            sent.append((due, time.monotonic(), scheduled))
+
+        return sent
+
+    def _reschedule(self, sent):
+        self.batches += 1
+
+        for due, send_time, scheduled in sent:
+            if not scheduled.active:
+                continue
+
+            statistics = self.statistics[scheduled.message.database.name]
+            jitter = max(send_time - due, 0.0)
+            statistics.sent += 1
+            statistics.total_jitter += jitter
+            statistics.max_jitter = max(statistics.max_jitter, jitter)
+            missed = int(jitter // scheduled.period)
+
+            if missed > 0:
+                statistics.overruns += missed
+
+            self._push(due + (missed + 1) * scheduled.period, scheduled)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                batch = self._next_batch()
+
+                if batch is None:
+                    return
+
+            sent = self._send_batch(batch)
+
+            with self._condition:
+                self._reschedule(sent)
+
+
+class AsyncScheduler(Scheduler):
+    """A :class:`~cantools.tester.Scheduler` running as a task in an
+    event loop instead of in a thread. It must only be used from the
+    thread running the loop.
+
+    """
+
+    def __init__(self, can_bus, resolution=0.001):
+        super(AsyncScheduler, self).__init__(can_bus, resolution)
+        self._task = None
+        self._wakeup = None
+
+    def _wake(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def start(self):
+        if self._task is not None:
+            return
+
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.ensure_future(self._run_async())
+
+    def stop(self):
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        self._task = None
+        self._wakeup = None
+
+    async def _run_async(self):
+        while True:
+            now = time.monotonic()
+            batch = self._pop_batch(now)
+
+            if batch:
+                self._reschedule(self._send_batch(batch))
+                await asyncio.sleep(0)
+                continue
+
+            if self._heap:
+                timeout = self._heap[0][0] - now
+            else:
+                timeout = None
+
+            self._wakeup.clear()
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
 
 
 class Message(UserDict, object):
@@ -67,19 +559,19 @@ class Message(UserDict, object):
     def __init__(self,
                  database,
                  can_bus,
-                 input_list,
-                 input_queue,
+                 input_buffer,
                  decode_choices,
                  scaling,
-                 padding):
+                 padding,
+                 scheduler=None):
         super(Message, self).__init__()
         self.database = database
         self._can_bus = can_bus
-        self._input_queue = input_queue
+        self._scheduler = scheduler
+        self._input_buffer = input_buffer
         self.decode_choices = decode_choices
         self.scaling = scaling
         self.padding = padding
-        self._input_list = input_list
         self.enabled = True
         self._can_message = None
         self._periodic_task = None
@@ -93,10 +585,18 @@ class Message(UserDict, object):
         return self.data[signal_name]
 
     def __setitem__(self, signal_name, value):
+        if signal_name in self.data and self.data[signal_name] == value:
+            return
+
         self.data[signal_name] = value
         self._update_can_message()
 
     def update(self, signals):
+        if self._can_message is not None \
+           and all([name in self.data and self.data[name] == value
+                    for name, value in signals.items()]):
+            return
+
         self.data.update(signals)
         self._update_can_message()
 
@@ -107,80 +607,36 @@ class Message(UserDict, object):
         self._can_bus.send(self._can_message)
 
     def expect(self, signals=None, timeout=None, discard_other_messages=True):
-        if signals is None:
-            signals = {}
-
-        decoded = self._expect_input_list(signals, discard_other_messages)
-
-        if decoded is None:
-            decoded = self._expect_input_queue(signals,
-                                               timeout,
-                                               discard_other_messages)
-
-        return decoded
-
-    def _expect_input_list(self, signals, discard_other_messages):
-        other_messages = []
-
-        while len(self._input_list) > 0:
-            message = self._input_list.pop(0)
-            decoded = self._filter_expected_message(message, signals)
-
-            if decoded is not None:
-                break
-
-            other_messages.append(message)
-        else:
-            decoded = None
-
-        if not discard_other_messages:
-            other_messages += self._input_list
-            del self._input_list[:]
-            self._input_list.extend(other_messages)
-
-        return decoded
-
-    def _expect_input_queue(self, signals, timeout, discard_other_messages):
-        if timeout is not None:
-            end_time = time.time() + timeout
-            remaining_time = timeout
-        else:
-            remaining_time = None
-
-        while True:
-            try:
-                message = self._input_queue.get(timeout=remaining_time)
-            except queue.Empty:
-                return
-
-            decoded = self._filter_expected_message(message, signals)
-
-            if decoded is not None:
-                return decoded
-
-            if not discard_other_messages:
-                self._input_list.append(message)
-
-            if timeout is not None:
-                remaining_time = end_time - time.time()
+        if isinstance(self._input_buffer, AsyncInputBuffer):
+            raise Error(
+                "messages of an AsyncTester must be expected with "
+                "await tester.expect('{}', ...)".format(self.database.name))
 
-                if remaining_time <= 0:
-                    return
+        decoded = self._input_buffer.get(self.database.name,
+                                         _signals_matcher(signals),
+                                         timeout,
+                                         discard_other_messages)
 
-    def _filter_expected_message(self, message, signals):
-        if message.name == self.database.name:
-            if all([message.signals[name] == signals[name] for name in signals]):
-                return message.signals
+        if decoded is not None:
+            return decoded.signals
 
     def send_periodic_start(self):
         if not self.enabled:
             return
 
+        if self._scheduler is not None:
+            self._scheduler.add(self)
+
+            return
+
         self._periodic_task = self._can_bus.send_periodic(
             self._can_message,
             self.database.cycle_time / 1000.0)
 
     def send_periodic_stop(self):
+        if self._scheduler is not None:
+            self._scheduler.remove(self)
+
         if self._periodic_task is not None:
             self._periodic_task.stop()
             self._periodic_task = None
@@ -227,6 +683,11 @@ class Tester(object):
     received message. It is called with one argument, an
     :class:`~cantools.tester.DecodedMessage` instance.
 
+    If `scheduler` is ``True`` all periodic messages are sent by a
+    single :class:`~cantools.tester.Scheduler` thread instead of one
+    python-can periodic task per message, see
+    :attr:`~cantools.tester.Tester.scheduler`.
+
     Here is an example of how to create a tester:
 
     >>> import can
@@ -239,6 +700,10 @@ class Tester(object):
 
     """
 
+    _input_buffer_class = InputBuffer
+    _listener_class = Listener
+    _scheduler_class = Scheduler
+
     def __init__(self,
                  dut_name,
                  database,
@@ -247,16 +712,21 @@ class Tester(object):
                  on_message=None,
                  decode_choices=True,
                  scaling=True,
-                 padding=False):
+                 padding=False,
+                 scheduler=False):
         self._dut_name = dut_name
         self._bus_name = bus_name
         self._database = database
         self._can_bus = can_bus
-        self._input_list = []
-        self._input_queue = queue.Queue()
+        self._input_buffer = self._input_buffer_class()
         self._messages = Messages()
         self._is_running = False
 
+        if scheduler:
+            self._scheduler = self._scheduler_class(can_bus)
+        else:
+            self._scheduler = None
+
         # DUT name validation.
         node_names = [node.name for node in database.nodes]
 
@@ -282,17 +752,20 @@ class Tester(object):
             if message.bus_name == bus_name:
                 self._messages[message.name] = Message(message,
                                                        can_bus,
-                                                       self._input_list,
-                                                       self._input_queue,
+                                                       self._input_buffer,
                                                        decode_choices,
                                                        scaling,
-                                                       padding)
+                                                       padding,
+                                                       self._scheduler)
+
+        listener = self._listener_class(self._database,
+                                        self._messages,
+                                        self._input_buffer,
+                                        on_message)
+        self._notifier = self._create_notifier(listener)
 
-        listener = Listener(self._database,
-                            self._messages,
-                            self._input_queue,
-                            on_message)
-        self._notifier = can.Notifier(can_bus, [listener])
+    def _create_notifier(self, listener):
+        return can.Notifier(self._can_bus, [listener])
 
     def start(self):
         """Start the tester. Starts sending enabled periodic messages.
@@ -301,6 +774,9 @@ class Tester(object):
 
         """
 
+        if self._scheduler is not None:
+            self._scheduler.start()
+
         for message in self._messages.values():
             if self._dut_name in message.database.senders:
                 continue
@@ -324,8 +800,25 @@ class Tester(object):
         for message in self._messages.values():
             message.send_periodic_stop()
 
+        if self._scheduler is not None:
+            self._scheduler.stop()
+
         self._is_running = False
 
+    @property
+    def scheduler(self):
+        """The :class:`~cantools.tester.Scheduler` sending the periodic
+        messages, or ``None`` if they are sent by python-can periodic
+        tasks. Its `statistics` attribute maps message names to
+        :class:`~cantools.tester.PeriodicStatistics`.
+
+        >>> tester.scheduler.statistics['PeriodicMessage1']
+        PeriodicStatistics(sent=100, overruns=0, mean_jitter=0.000089, max_jitter=0.000412)
+
+        """
+
+        return self._scheduler
+
     @property
     def messages(self):
         """Set and get signals in messages. Set signals takes effect
@@ -417,7 +910,83 @@ class Tester(object):
 
         """
 
-        del self._input_list[:]
+        self._input_buffer.clear()
+
+
+class AsyncTester(Tester):
+    """An asyncio version of :class:`~cantools.tester.Tester`. Received
+    messages are dispatched in the event loop, periodic messages are
+    sent by an :class:`~cantools.tester.AsyncScheduler` task, and
+    :meth:`~cantools.tester.AsyncTester.send()` and
+    :meth:`~cantools.tester.AsyncTester.expect()` are coroutines, so
+    one event loop can drive many testers.
+
+    The tester must be created in a coroutine, it uses the running
+    event loop. The `on_message` callback may be a coroutine function.
+
+    >>> async def scenario():
+    ...     tester = cantools.tester.AsyncTester('PeriodicConsumer', database, can_bus, 'PeriodicBus')
+    ...     tester.start()
+    ...     await tester.send('Message1', {'Signal2': 10})
+    ...     return await tester.expect('Message2', {'Signal1': 13}, timeout=1.0)
+
+    """
+
+    _input_buffer_class = AsyncInputBuffer
+    _listener_class = AsyncListener
+    _scheduler_class = AsyncScheduler
+
+    def __init__(self,
+                 dut_name,
+                 database,
+                 can_bus,
+                 bus_name=None,
+                 on_message=None,
+                 decode_choices=True,
+                 scaling=True,
+                 padding=False):
+        self._loop = asyncio.get_running_loop()
+        super(AsyncTester, self).__init__(dut_name,
+                                          database,
+                                          can_bus,
+                                          bus_name,
+                                          on_message,
+                                          decode_choices,
+                                          scaling,
+                                          padding,
+                                          scheduler=True)
+
+    def _create_notifier(self, listener):
+        return can.Notifier(self._can_bus, [listener], loop=self._loop)
+
+    async def send(self, message_name, signals=None):
+        """Send given message `message_name` and optional signals `signals`.
+
+        >>> await tester.send('Message1', {'Signal2': 10})
+
+        """
+
+        super(AsyncTester, self).send(message_name, signals)
+
+    async def expect(self,
+                     message_name,
+                     signals=None,
+                     timeout=None,
+                     discard_other_messages=True):
+        """Expect given message `message_name` and signal values `signals`
+        within `timeout` seconds, see
+        :meth:`Tester.expect()<cantools.tester.Tester.expect()>`.
+
+        >>> await tester.expect('Message2', {'Signal1': 13})
+        {'Signal1': 13, 'Signal2': 9}
+
+        """
+
+        message = self._messages[message_name]
+        decoded = await self._input_buffer.get(message.database.name,
+                                               _signals_matcher(signals),
+                                               timeout,
+                                               discard_other_messages)
 
-        while not self._input_queue.empty():
-            self._input_queue.get()
+        if decoded is not None:
+            return decoded.signals
@@ -1,7 +1,6 @@
 import typing
 
 import typing_extensions
-from bitstruct import CompiledFormatDict
 
 if typing.TYPE_CHECKING:
     import os
@@ -9,13 +8,24 @@ if typing.TYPE_CHECKING:
     from cantools.database import Signal
 
 
+class NamedFormat(typing_extensions.Protocol):
+    def pack(self, data: typing.Mapping[str, typing.Any]) -> bytes:
+        ...
+
+    def unpack(self, data: "Buffer") -> typing.Dict[str, typing.Any]:
+        ...
+
+
 class Formats(typing.NamedTuple):
-    big_endian: CompiledFormatDict
-    little_endian: CompiledFormatDict
+    big_endian: NamedFormat
+    little_endian: NamedFormat
     padding_mask: int
+    has_big_endian: bool = True
+    has_little_endian: bool = True
 
 
 StringPathLike = typing.Union[str, "os.PathLike[str]"]
+Buffer = typing.Union[bytes, bytearray, memoryview]
 Comments = typing.Dict[typing.Optional[str], str]
 Codec = typing_extensions.TypedDict(
     "Codec",
@@ -23,5 +33,6 @@ Codec = typing_extensions.TypedDict(
         "signals": typing.List["Signal"],
         "formats": Formats,
         "multiplexers": typing.Dict[str, typing.Dict[int, typing.Any]],
+        "decoder": typing.Optional[typing.Callable[..., typing.Dict[str, typing.Any]]],
     },
 )
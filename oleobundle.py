@@ -0,0 +1,408 @@
+from collections import OrderedDict
+import struct, json, cantools
+from cantools.database.can.signal import NamedSignalValue
+
+'''
+OpenLEO compiled database bundle
+Copyright (c) 2022 - OpenLEO.org / lorddevereux
+
+A single binary file holding a whole message database, so it can be
+loaded without parsing YAML/DBC or re-running check_message_structure
+
+Layout (all little endian):
+- header
+- string table: (count + 1) uint32 offsets, followed by the utf-8 blob
+- message records
+- signal layout records
+- choice table records
+
+Free-form fields (comments, senders, receivers, units...) are stored
+as JSON in the string table. Identical strings are only stored once.
+'''
+
+MAGIC = b"OLEOBNDL"
+VERSION = 1
+
+# magic, version, flags, strings, string blob size, messages, signals, choices
+HEADER = struct.Struct("<8sHHIIIII")
+
+# frame_id, name, length, flags, cycle_time, mtype, comment, senders, first signal, signal count
+MESSAGE = struct.Struct("<IIHHiIIIII")
+
+# name, start, length, flags, scale, offset, minimum, maximum (number = type + 8 bytes),
+# unit, dtype, comment, receivers, multiplexer ids, multiplexer signal, first choice, choice count
+SIGNAL = struct.Struct("<IHHB" + "B8s" * 4 + "IIIIIIII")
+
+# value, name, comments
+CHOICE = struct.Struct("<qII")
+CHOICE_MIN = -(1 << 63)
+CHOICE_MAX = (1 << 63) - 1
+
+MSG_EXTENDED = 0x01
+MSG_FD = 0x02
+MSG_CYCLE_TIME = 0x04
+
+SIG_BIG_ENDIAN = 0x01
+SIG_SIGNED = 0x02
+SIG_FLOAT = 0x04
+SIG_INVERTED = 0x08
+SIG_MULTIPLEXER = 0x10
+
+NUM_NONE = 0
+NUM_INT = 1
+NUM_FLOAT = 2
+
+
+class BundleError(Exception):
+    pass
+
+
+def num_encode(value):
+    '''
+    Numbers keep their python type, since int/float
+    scale and offset give different decode results
+    '''
+    if value is None:
+        return NUM_NONE, bytes(8)
+    if isinstance(value, int):
+        return NUM_INT, struct.pack("<q", value)
+    return NUM_FLOAT, struct.pack("<d", float(value))
+
+
+def comments_encode(comments):
+    '''
+    Comment dicts may be keyed by None (no language), so they
+    are stored as a list of pairs rather than a JSON object
+    '''
+    if comments is None:
+        return None
+    return [[lang, comments[lang]] for lang in comments]
+
+
+def comments_decode(pairs):
+    if pairs is None:
+        return None
+    return dict([(lang, text) for lang, text in pairs])
+
+
+def num_decode(kind, raw):
+    if kind == NUM_INT:
+        return struct.unpack("<q", raw)[0]
+    if kind == NUM_FLOAT:
+        return struct.unpack("<d", raw)[0]
+    return None
+
+
+class string_table:
+    '''
+    Deduplicating string table used when writing a bundle
+    '''
+    def __init__(self):
+        self.index = {}
+        self.strings = []
+
+    def add(self, value):
+        if value not in self.index:
+            self.index[value] = len(self.strings)
+            self.strings.append(value)
+        return self.index[value]
+
+    def add_json(self, value):
+        return self.add(json.dumps(value))
+
+    def pack(self):
+        blobs = [s.encode("utf-8") for s in self.strings]
+        offsets = [0]
+        for blob in blobs:
+            offsets.append(offsets[-1] + len(blob))
+
+        return struct.pack("<" + str(len(offsets)) + "I", *offsets), b"".join(blobs)
+
+
+def write_bundle(fname, messages):
+    '''
+    Write an iterable of cantools messages to a bundle file
+    '''
+    strings = string_table()
+    msg_records = []
+    sig_records = []
+    choice_records = []
+
+    for message in messages:
+        flags = 0
+        if message.is_extended_frame:
+            flags |= MSG_EXTENDED
+        if message.is_fd:
+            flags |= MSG_FD
+
+        cycle_time = 0
+        if type(message.cycle_time) is int:
+            flags |= MSG_CYCLE_TIME
+            cycle_time = message.cycle_time
+
+        first_signal = len(sig_records)
+
+        for signal in message.signals:
+            sflags = 0
+            if signal.byte_order == "big_endian":
+                sflags |= SIG_BIG_ENDIAN
+            if signal.is_signed:
+                sflags |= SIG_SIGNED
+            if signal.is_float:
+                sflags |= SIG_FLOAT
+            if signal.inverted:
+                sflags |= SIG_INVERTED
+            if signal.is_multiplexer:
+                sflags |= SIG_MULTIPLEXER
+
+            first_choice = len(choice_records)
+            if signal.choices is not None:
+                for value in signal.choices:
+                    # choice keys are stored as int64
+                    if isinstance(value, bool) or not isinstance(value, int) or not CHOICE_MIN <= value <= CHOICE_MAX:
+                        raise BundleError("Choice key " + repr(value) + " of " + message.name + "." + signal.name + " is not a 64 bit integer")
+                    choice = signal.choices[value]
+                    comments = choice.comments if isinstance(choice, NamedSignalValue) else {}
+                    choice_records.append(CHOICE.pack(value, strings.add(str(choice)), strings.add_json(comments)))
+
+            numbers = []
+            for value in (signal.scale, signal.offset, signal.minimum, signal.maximum):
+                numbers.extend(num_encode(value))
+
+            sig_records.append(SIGNAL.pack(
+                strings.add(signal.name),
+                signal.start,
+                signal.length,
+                sflags,
+                *numbers,
+                strings.add_json(signal.unit),
+                strings.add_json(signal.dtype),
+                strings.add_json(comments_encode(signal.comments)),
+                strings.add_json(signal.receivers),
+                strings.add_json(signal.multiplexer_ids),
+                strings.add_json(signal.multiplexer_signal),
+                first_choice,
+                len(choice_records) - first_choice if signal.choices is not None else 0xFFFFFFFF
+            ))
+
+        msg_records.append(MESSAGE.pack(
+            message.frame_id,
+            strings.add(message.name),
+            message.length,
+            flags,
+            cycle_time,
+            strings.add_json(message.mtype),
+            strings.add_json(comments_encode(message.comments)),
+            strings.add_json(message.senders),
+            first_signal,
+            len(sig_records) - first_signal
+        ))
+
+    offsets, blob = strings.pack()
+
+    f = open(fname, "wb")
+    f.write(HEADER.pack(MAGIC, VERSION, 0, len(strings.strings), len(blob), len(msg_records), len(sig_records), len(choice_records)))
+    f.write(offsets)
+    f.write(blob)
+    f.write(b"".join(msg_records))
+    f.write(b"".join(sig_records))
+    f.write(b"".join(choice_records))
+    f.close()
+
+    return len(msg_records)
+
+
+class bundle:
+    '''
+    A loaded bundle file, which builds cantools messages on request
+    '''
+    def __init__(self, fname):
+        f = open(fname, "rb")
+        self.data = f.read()
+        f.close()
+
+        if len(self.data) < HEADER.size:
+            raise BundleError("File too short to be a bundle")
+
+        magic, version, flags, n_strings, blob_size, n_messages, n_signals, n_choices = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC:
+            raise BundleError("Not an oleomux bundle")
+        if version != VERSION:
+            raise BundleError("Unsupported bundle version " + str(version))
+
+        pos = HEADER.size
+        self.offsets = struct.unpack_from("<" + str(n_strings + 1) + "I", self.data, pos)
+        pos += 4 * (n_strings + 1)
+        self.blob_start = pos
+        pos += blob_size
+        self.msg_start = pos
+        pos += MESSAGE.size * n_messages
+        self.sig_start = pos
+        pos += SIGNAL.size * n_signals
+        self.choice_start = pos
+        pos += CHOICE.size * n_choices
+
+        if pos != len(self.data):
+            raise BundleError("Bundle is truncated or corrupt")
+
+        self.n_messages = n_messages
+        self.strings = {}
+
+    def string(self, index):
+        try:
+            return self.strings[index]
+        except KeyError:
+            value = self.data[self.blob_start + self.offsets[index]:self.blob_start + self.offsets[index + 1]].decode("utf-8")
+            self.strings[index] = value
+            return value
+
+    def json(self, index):
+        # always decode again, lists/dicts must not be shared between messages
+        return json.loads(self.string(index))
+
+    def frame_ids(self):
+        '''
+        Frame ID of each message record, in file order
+        '''
+        return [MESSAGE.unpack_from(self.data, self.msg_start + i * MESSAGE.size)[0] for i in range(self.n_messages)]
+
+    def names(self):
+        '''
+        Frame ID and name of each message record, in file order,
+        read from the records without building any message
+        '''
+        out = []
+        for i in range(self.n_messages):
+            frame_id, name = MESSAGE.unpack_from(self.data, self.msg_start + i * MESSAGE.size)[0:2]
+            out.append((frame_id, self.string(name)))
+        return out
+
+    def build_message(self, index):
+        frame_id, name, length, flags, cycle_time, mtype, comment, senders, first_signal, signal_count = \
+            MESSAGE.unpack_from(self.data, self.msg_start + index * MESSAGE.size)
+
+        signals = []
+        for sig_index in range(first_signal, first_signal + signal_count):
+            signals.append(self.build_signal(sig_index))
+
+        return cantools.database.can.Message(
+            strict = False,
+            frame_id = frame_id,
+            is_extended_frame = bool(flags & MSG_EXTENDED),
+            is_fd = bool(flags & MSG_FD),
+            name = self.string(name),
+            length = length,
+            signals = signals,
+            mtype = self.json(mtype),
+            comment = comments_decode(self.json(comment)),
+            senders = self.json(senders),
+            cycle_time = cycle_time if flags & MSG_CYCLE_TIME else None,
+            # signals were written in their final order
+            sort_signals = None
+        )
+
+    def build_signal(self, index):
+        fields = SIGNAL.unpack_from(self.data, self.sig_start + index * SIGNAL.size)
+        name, start, length, flags = fields[0:4]
+        scale, offset, minimum, maximum = [num_decode(fields[i], fields[i + 1]) for i in range(4, 12, 2)]
+        unit, dtype, comment, receivers, mux_ids, mux_signal, first_choice, choice_count = fields[12:20]
+
+        choices = None
+        if choice_count != 0xFFFFFFFF:
+            choices = {}
+            for choice_index in range(first_choice, first_choice + choice_count):
+                value, choice_name, comments = CHOICE.unpack_from(self.data, self.choice_start + choice_index * CHOICE.size)
+                choices[value] = NamedSignalValue(value, self.string(choice_name), self.json(comments))
+
+        return cantools.database.can.Signal(
+            name = self.string(name),
+            byte_order = "big_endian" if flags & SIG_BIG_ENDIAN else "little_endian",
+            start = start,
+            length = length,
+            scale = scale,
+            offset = offset,
+            is_signed = bool(flags & SIG_SIGNED),
+            is_float = bool(flags & SIG_FLOAT),
+            dtype = self.json(dtype),
+            inverted = bool(flags & SIG_INVERTED),
+            minimum = minimum,
+            maximum = maximum,
+            unit = self.json(unit),
+            choices = choices,
+            receivers = self.json(receivers),
+            comment = comments_decode(self.json(comment)),
+            is_multiplexer = bool(flags & SIG_MULTIPLEXER),
+            multiplexer_ids = self.json(mux_ids),
+            multiplexer_signal = self.json(mux_signal)
+        )
+
+
+class lazy_messages(OrderedDict):
+    '''
+    Drop-in replacement for oleomgr.messages which only builds
+    a cantools message the first time it is accessed
+    '''
+    def __init__(self, source: bundle):
+        super().__init__()
+        self.source = source
+        self.pending = {}
+        self.names = {}
+
+        for index, (frame_id, name) in enumerate(source.names()):
+            self.pending[frame_id] = index
+            self.names[frame_id] = name
+            OrderedDict.__setitem__(self, frame_id, None)
+
+    def name(self, key):
+        '''
+        Name of a message, without building it if it was not accessed yet
+        '''
+        if key in self.pending:
+            return self.names[key]
+        return self[key].name
+
+    def __getitem__(self, key):
+        if key in self.pending:
+            OrderedDict.__setitem__(self, key, self.source.build_message(self.pending.pop(key)))
+        return OrderedDict.__getitem__(self, key)
+
+    def __setitem__(self, key, value):
+        self.pending.pop(key, None)
+        OrderedDict.__setitem__(self, key, value)
+
+    def __delitem__(self, key):
+        self.pending.pop(key, None)
+        OrderedDict.__delitem__(self, key)
+
+    def get(self, key, default = None):
+        if key in self:
+            return self[key]
+        return default
+
+    def pop(self, key, *default):
+        if key in self:
+            value = self[key]
+            del self[key]
+            return value
+        return OrderedDict.pop(self, key, *default)
+
+    def popitem(self, last = True):
+        key = next(reversed(self)) if last else next(iter(self))
+        return key, self.pop(key)
+
+    def values(self):
+        return [self[key] for key in self]
+
+    def items(self):
+        return [(key, self[key]) for key in self]
+
+    def __reduce__(self):
+        # copies/pickles become a plain, fully built OrderedDict
+        return (OrderedDict, (), None, None, iter(self.items()))
+
+
+def read_bundle(fname):
+    '''
+    Open a bundle, returning a lazily built OrderedDict of frame ID -> message
+    '''
+    return lazy_messages(bundle(fname))
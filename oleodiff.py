@@ -0,0 +1,90 @@
+from tkinter import Toplevel, Button, Scrollbar, Label
+from tkinter.ttk import Treeview
+
+
+
+class oleodiff:
+    '''
+    Window to display the candidate bit ranges found by comparing
+    captures (cantools.logdiff), best first
+
+    The selected candidate can be turned into a new signal of its message
+    '''
+    MAX_ROWS = 500
+
+    def __init__(self, master, owner, diff):
+        self.owner = owner
+        self.master = master
+        self.diff = diff
+
+        self.win = Toplevel(master)
+        self.win.wm_title("Compare captures - " + " / ".join(diff.names))
+        self.win.geometry("900x500")
+
+        self.win.rowconfigure(1, weight=1)
+        self.win.columnconfigure(0, weight=1)
+
+        self.message = Label(self.win, text="Bit ranges which differ between the captures, best first. Select one to create a signal from it")
+        self.message.grid(row=0, column=0, columnspan=3)
+
+        columns = ("id", "bits", "score", "shift", "toggle", "new")
+        self.t = Treeview(self.win, columns=columns, show="headings")
+        self.t.heading("id", text="ID")
+        self.t.heading("bits", text="Bits")
+        self.t.heading("score", text="Score")
+        self.t.heading("shift", text="Shift")
+        self.t.heading("toggle", text="Toggle change")
+        self.t.heading("new", text="Values in one capture only")
+        self.t.column("id", width=150)
+        self.t.column("bits", width=80)
+        self.t.column("score", width=60)
+        self.t.column("shift", width=60)
+        self.t.column("toggle", width=90)
+        self.t.column("new", width=400)
+        self.t.grid(row=1, column=0, columnspan=2, sticky="nesw")
+        self.scrollbar = Scrollbar(self.win, orient="vertical", command=self.t.yview)
+        self.scrollbar.grid(row=1, column=2, sticky="ns")
+        self.t.configure(yscrollcommand=self.scrollbar.set)
+
+        for i, candidate in enumerate(diff.candidates[:self.MAX_ROWS]):
+            self.t.insert("", "end", iid=str(i), values=self.candidate_row(candidate))
+
+        only_in = [self.owner.omgr.to_hex(mid) + " (" + ", ".join(names) + ")" for mid, names in sorted(diff.only_in.items())]
+        if len(only_in) > 0:
+            self.only_in = Label(self.win, text="IDs in only some captures: " + ", ".join(only_in), wraplength=850, justify="left")
+            self.only_in.grid(row=2, column=0, columnspan=3, sticky="w")
+
+        self.create = Button(self.win, text="Create signal", command=self.create_signal)
+        self.create.grid(row=3, column=0)
+        self.close = Button(self.win, text="Close", command=self.win.destroy)
+        self.close.grid(row=3, column=1)
+
+
+    def candidate_row(self, candidate):
+        '''
+        Treeview values of one candidate, bits in the selected bit numbering
+        '''
+        mid = candidate.frame_id
+        name = self.owner.omgr.to_hex(mid)
+        if mid in self.owner.omgr.messages:
+            name = name + " - " + self.owner.omgr.messages[mid].name
+
+        bits = self.owner.omgr.yml_bits_encode(candidate.to_signal(), output_mode=self.owner.bit_display_mode)
+        new_values = []
+        for capture, values in candidate.new_values.items():
+            if len(values) > 0:
+                new_values.append(capture + ": " + " ".join(str(x) for x in values))
+
+        return (name, bits, "{:.2f}".format(candidate.score), "{:.2f}".format(candidate.shift),
+                "{:.2f}".format(candidate.toggle_change), "; ".join(new_values))
+
+
+    def create_signal(self):
+        '''
+        Add the selected candidate as a new signal of its message
+        '''
+        selection = self.t.selection()
+        if len(selection) == 0:
+            return
+
+        self.owner.addSignalFromCandidate(self.diff.candidates[int(selection[0])])
@@ -1,8 +1,14 @@
 from typing import OrderedDict
-import yaml, sys, math, cantools, pprint, copy, traceback, csv
+import yaml, sys, math, cantools, pprint, copy, traceback, csv, json, hashlib, os
 from cantools.database.can.signal import NamedSignalValue
 from os import listdir
 from os.path import isfile, join
+import oleobundle
+
+try:
+    from yaml import CDumper as YAML_DUMPER
+except ImportError:
+    from yaml import Dumper as YAML_DUMPER
 
 '''
 OpenLEO database and CAN message generation scripts
@@ -25,6 +31,8 @@ class oleomgr:
     TAB4 = "    "
     MODE_OLEO = 1           # 1.7 1.6 1.5
     MODE_CANT = 2           # 1.0 1.1 1.2
+    MANIFEST_NAME = ".oleomux_manifest"
+    MANIFEST_VERSION = 2
 
     def __init__(self, owner, config):
         self.messages = OrderedDict()
@@ -39,6 +47,14 @@ class oleomgr:
 
         self.owner = owner
         self.vehicle_networks = {}
+        self.yaml_folders = {}
+
+        # frame IDs changed/deleted since the last load or save
+        self.modified = set()
+        self.deleted = set()
+
+        # cantools database mirroring self.messages, built by as_database()
+        self.database = None
 
         
 
@@ -282,6 +298,109 @@ class oleomgr:
         Clear the internal db
         '''
         self.messages = OrderedDict()
+        self.yaml_folders = {}
+        self.database = None
+        self.mark_clean()
+
+
+    def mark_modified(self, mid):
+        '''
+        Flag a message as changed since the last load/save
+        Called by the editors whenever a message, signal or choice is changed
+        '''
+        self.modified.add(mid)
+        self.deleted.discard(mid)
+        self.refresh_message(mid)
+
+
+    def mark_deleted(self, mid):
+        '''
+        Flag a message as deleted, so its file is removed on the next save
+        '''
+        self.modified.discard(mid)
+        self.deleted.add(mid)
+
+        if self.database is not None:
+            for message in self.database.messages:
+                if message.frame_id == mid and mid not in self.messages:
+                    self.database.remove_message(message)
+                    break
+
+
+    def message_name(self, mid):
+        '''
+        Name of a message, read from the bundle index if the message
+        was loaded from a bundle and not built yet
+        '''
+        if isinstance(self.messages, oleobundle.lazy_messages):
+            return self.messages.name(mid)
+        return self.messages[mid].name
+
+
+    def as_database(self):
+        '''
+        A cantools database of all loaded messages, for decoding. It is
+        built on first use and kept up to date by refresh_message()
+        '''
+        if self.database is None:
+            self.database = cantools.database.can.Database(messages = list(self.messages.values()), strict = False)
+        return self.database
+
+
+    def refresh_message(self, mid):
+        '''
+        Rebuild the codec of one edited message, and patch only its
+        entries in the live database (if any) rather than rebuilding it
+        '''
+        if mid not in self.messages:
+            return
+
+        try:
+            if self.database is not None:
+                self.database.refresh_message(self.messages[mid])
+            else:
+                self.messages[mid].refresh(strict = False)
+        except:
+            self.log("Could not rebuild codec of " + self.to_hex(mid) + ", the definition is probably incomplete")
+            self.log("DMP", str(traceback.format_exc()))
+
+
+    def mark_imported(self, mids, was_empty):
+        '''
+        Update the change tracking after an import: a load into an empty
+        database starts clean, merged messages count as modified
+        '''
+        # bulk change, rebuild the live database on next use
+        self.database = None
+
+        if was_empty:
+            self.mark_clean()
+        else:
+            # freshly built messages, no need to refresh them again
+            self.modified.update(mids)
+            self.deleted.difference_update(mids)
+
+
+    def mark_clean(self):
+        '''
+        Forget all changes, e.g. after a full load or save
+        '''
+        self.modified = set()
+        self.deleted = set()
+
+
+    def yaml_write(self, fname, tree):
+        '''
+        Atomically write a yaml file (temp file + rename), using
+        the C dumper if libyaml is available
+        '''
+        tmp_name = fname + ".tmp"
+        f = open(tmp_name, "w")
+        try:
+            yaml.dump(tree, f, Dumper=YAML_DUMPER)
+        finally:
+            f.close()
+        os.replace(tmp_name, fname)
 
 
     def get_comment(self, comment, lang):
@@ -313,11 +432,16 @@ class oleomgr:
         self.log("Loaded " + str(len(db.messages)) + " messages")
 
         added = 0
+        was_empty = len(self.messages) == 0
+        added_ids = []
         for message in db.messages:
             if message.frame_id not in self.messages:
                 print(message.frame_id, type(message.frame_id))
                 added += 1
                 self.messages[message.frame_id] = message
+                added_ids.append(message.frame_id)
+
+        self.mark_imported(added_ids, was_empty)
         
         self.log("Actually added " + str(added) + " messages")
 
@@ -433,10 +557,13 @@ class oleomgr:
         return True
 
 
-    def export_to_yaml_oleo(self, fname, include_list, comment_src = None, callback = None):
+    def export_to_yaml_oleo(self, fname, include_list, comment_src = None, callback = None, only_modified = False):
         '''
         Export from internal cantools data structure
         to YAML file format
+
+        With only_modified, a folder export only writes the messages
+        changed since the last load/save and removes files of deleted ones
         '''
 
         mode = 0
@@ -460,8 +587,13 @@ class oleomgr:
             mode = 1
 
         ctr = 1
+        written = set()
  
         for mid in self.messages:
+            if mode == 1 and only_modified and mid not in self.modified:
+                ctr += 1
+                continue
+
             message = self.messages[mid]
             yaml_tree = {}
 
@@ -532,26 +664,45 @@ class oleomgr:
 
             #pprint.pprint(yaml.dump(yaml_tree[0xF6]))
             if mode == 0:
-                f = open(fname, "w")
                 self.log("Exporting yaml " + str(self.to_hex(message.frame_id)))
-                yaml.dump(yaml_tree[message.frame_id], f)
-                f.close()
+                self.yaml_write(fname, yaml_tree[message.frame_id])
                 return True
             
             else:
                 self.log("Exporting yaml " + str(self.to_hex(message.frame_id)))
-                f = open(fname + "/" + self.to_hex(message.frame_id) + ".yml", "w")
-                yaml.dump(yaml_tree[message.frame_id], f)
-                f.close()
+                self.yaml_write(fname + "/" + self.to_hex(message.frame_id) + ".yml", yaml_tree[message.frame_id])
+                written.add(mid)
+
+                # the frame ID was changed in the editor, so the old file is stale
+                if mid != message.frame_id:
+                    self.yaml_remove(fname, mid)
 
             if callback is not None:
                 callback(ctr)
 
             ctr += 1
+
+        if mode == 1:
+            for mid in self.deleted:
+                if mid not in self.messages:
+                    self.yaml_remove(fname, mid)
+            self.deleted = set()
+
+        self.modified -= written
         
         return True
 
 
+    def yaml_remove(self, folder, mid):
+        '''
+        Remove the YAML file of a message from an export folder
+        '''
+        path = folder + "/" + self.to_hex(mid) + ".yml"
+        if isfile(path):
+            self.log("Removing yaml " + str(self.to_hex(mid)))
+            os.remove(path)
+
+
     def export_to_yaml(self, fname, include_list, comment_src = None, callback = None):
         '''
         Export from internal cantools data structure
@@ -694,123 +845,150 @@ class oleomgr:
             return False
 
 
-    def import_from_yaml_oleo(self, file_list, callback = None):
+    def parse_yaml_oleo(self, file_name):
         '''
-        Import from oleo YAML to internal cantools data structure
+        Parse a single oleo YAML file into a cantools message
+        Returns None if the file could not be loaded
         '''
-        tree = {}
-        ctr = 1
+        return self.message_from_yaml_oleo(self.load_yaml_oleo(file_name), file_name)
 
-        for file_name in file_list:
-            try:
-                #if self.owner.configuration["debug"] == 1:
-                #    self.log("Opening " + str(file_name))
-                f = open(file_name)
-                f_contents = f.readlines()
-                f_contents = "".join(f_contents)
-                msg = yaml.safe_load(f_contents)
-            except:
-                msg = None
-                self.log("DMP", str(traceback.format_exc()))
 
-            msg_signals = []
+    def load_yaml_oleo(self, file_name):
+        '''
+        Load a single oleo YAML file as a dict, None if it could not be loaded
+        '''
+        try:
+            #if self.owner.configuration["debug"] == 1:
+            #    self.log("Opening " + str(file_name))
+            f = open(file_name)
+            f_contents = f.readlines()
+            f_contents = "".join(f_contents)
+            f.close()
+            msg = yaml.safe_load(f_contents)
+        except:
+            msg = None
+            self.log("DMP", str(traceback.format_exc()))
 
-            if msg is None:
-                self.log("Failed to load " + str(file_name))
-                continue
+        return msg
 
-            if "signals" not in msg:
-                self.log("Missing SIGNAL definitions for message " + str(file_name))
-            
-            for signal in msg["signals"]:
-                if self.owner.configuration["debug"] == 1:
-                    print(signal)
-                result = self.yml_bits_decode(msg["signals"][signal]["bits"])
-                if not result:
-                    continue
 
-                bit_start, bit_length = result
-
-                # decode comment fields of choices
-                choices = self.dget(msg["signals"][signal], "values", {})
-                choices_loaded = {}
-                if choices is not None:
-                    for choice in choices:
-                        if type(choices[choice]) == dict:
-                            # new format
-                            if "comment" in choices[choice] and "name" in choices[choice]:
-                                choices_loaded[choice] = NamedSignalValue(value=choice, name=choices[choice]["name"], comments=self.yml_comment_decode(choices[choice]["comment"]))
-                                #print("New: ", choices[choice]["name"])
-                            # legacy format
-                            elif "en" in choices[choice]:
-                                choices_loaded[choice] = NamedSignalValue(value=choice, name=choices[choice]["en"], comments=self.yml_comment_decode(choices[choice]))
-                                #print("Old: ", choices[choice["en"]])
-                            else:
-                                pass
-                                #print("SHOULDNT GET HERE, INVALID FILES")
+    def message_from_yaml_oleo(self, msg, file_name):
+        '''
+        Build a cantools message from a loaded oleo YAML file
+        Returns None if there is nothing to build from
+        '''
+        msg_signals = []
+
+        if msg is None:
+            self.log("Failed to load " + str(file_name))
+            return None
+
+        if "signals" not in msg:
+            self.log("Missing SIGNAL definitions for message " + str(file_name))
+        
+        for signal in msg["signals"]:
+            if self.owner.configuration["debug"] == 1:
+                print(signal)
+            result = self.yml_bits_decode(msg["signals"][signal]["bits"])
+            if not result:
+                continue
+
+            bit_start, bit_length = result
+
+            # decode comment fields of choices
+            choices = self.dget(msg["signals"][signal], "values", {})
+            choices_loaded = {}
+            if choices is not None:
+                for choice in choices:
+                    if type(choices[choice]) == dict:
+                        # new format
+                        if "comment" in choices[choice] and "name" in choices[choice]:
+                            choices_loaded[choice] = NamedSignalValue(value=choice, name=choices[choice]["name"], comments=self.yml_comment_decode(choices[choice]["comment"]))
+                            #print("New: ", choices[choice]["name"])
+                        # legacy format
+                        elif "en" in choices[choice]:
+                            choices_loaded[choice] = NamedSignalValue(value=choice, name=choices[choice]["en"], comments=self.yml_comment_decode(choices[choice]))
+                            #print("Old: ", choices[choice["en"]])
                         else:
-                            choices_loaded[choice] = NamedSignalValue(value=choice, name=choices[choice])
-                            #print("Other type ", type(choice))
-                stype = self.dget(msg["signals"][signal], "type", "uint")
+                            pass
+                            #print("SHOULDNT GET HERE, INVALID FILES")
+                    else:
+                        choices_loaded[choice] = NamedSignalValue(value=choice, name=choices[choice])
+                        #print("Other type ", type(choice))
+            stype = self.dget(msg["signals"][signal], "type", "uint")
+            is_signed = False
+            is_decimal = False
+
+            if stype == "uint":
                 is_signed = False
                 is_decimal = False
-
-                if stype == "uint":
-                    is_signed = False
-                    is_decimal = False
-                if stype == "sint":
-                    is_signed = True
-                    is_decimal = False
-                if stype == "float" or stype == "double":
-                    is_signed = True
-                    is_decimal = True
-                
-                if "is_signed" in msg["signals"][signal]:
-                    if msg["signals"][signal]["is_signed"]:
-                        stype = "sint"
-
-                msg_signals.append(
-                    cantools.database.can.Signal(
-                        name = signal,
-                        byte_order = self.dget(msg["signals"][signal], "endian", "big_endian"), 
-                        start = bit_start,
-                        length = bit_length,
-                        scale = self.dget(msg["signals"][signal], "factor", 1),
-                        offset = self.dget(msg["signals"][signal], "offset", 0),
-                        is_signed = is_signed,
-                        is_float = is_decimal,
-                        dtype = stype,
-                        inverted = self.dget(msg["signals"][signal], "inverted", False),
-                        minimum = self.dget(msg["signals"][signal], "min", None),
-                        maximum = self.dget(msg["signals"][signal], "max", None),
-                        unit = self.dget(msg["signals"][signal], "units", ""),
-                        choices = choices_loaded,
-                        receivers = self.dget(msg, "receivers", None),
-                        comment = self.yml_comment_decode(self.dget(msg["signals"][signal], "comment", ""))
-                    )
+            if stype == "sint":
+                is_signed = True
+                is_decimal = False
+            if stype == "float" or stype == "double":
+                is_signed = True
+                is_decimal = True
+            
+            if "is_signed" in msg["signals"][signal]:
+                if msg["signals"][signal]["is_signed"]:
+                    stype = "sint"
+
+            msg_signals.append(
+                cantools.database.can.Signal(
+                    name = signal,
+                    byte_order = self.dget(msg["signals"][signal], "endian", "big_endian"), 
+                    start = bit_start,
+                    length = bit_length,
+                    scale = self.dget(msg["signals"][signal], "factor", 1),
+                    offset = self.dget(msg["signals"][signal], "offset", 0),
+                    is_signed = is_signed,
+                    is_float = is_decimal,
+                    dtype = stype,
+                    inverted = self.dget(msg["signals"][signal], "inverted", False),
+                    minimum = self.dget(msg["signals"][signal], "min", None),
+                    maximum = self.dget(msg["signals"][signal], "max", None),
+                    unit = self.dget(msg["signals"][signal], "units", ""),
+                    choices = choices_loaded,
+                    receivers = self.dget(msg, "receivers", None),
+                    comment = self.yml_comment_decode(self.dget(msg["signals"][signal], "comment", ""))
                 )
-
-            frame_id = msg["id"]
-            if type(frame_id) is not int:
-                frame_id = int(frame_id, 16)
-
-            periodicity = self.dget(msg, "periodicity", None)
-            if type(periodicity) == str:
-                periodicity.replace("ms", "")
-
-            tree[frame_id] = cantools.database.can.Message(
-                strict = False,
-                frame_id = frame_id,
-                is_extended_frame = False,
-                name = msg["name"],
-                length = self.dget(msg, "length", 8),
-                signals = msg_signals,
-                mtype = self.dget(msg, "type", "can"),
-                comment = self.yml_comment_decode(self.dget(msg, "comment", "")),
-                senders = self.dget(msg, "senders", 8),
-                cycle_time = periodicity
             )
 
+        frame_id = msg["id"]
+        if type(frame_id) is not int:
+            frame_id = int(frame_id, 16)
+
+        periodicity = self.dget(msg, "periodicity", None)
+        if type(periodicity) == str:
+            periodicity.replace("ms", "")
+
+        return cantools.database.can.Message(
+            strict = False,
+            frame_id = frame_id,
+            is_extended_frame = False,
+            name = msg["name"],
+            length = self.dget(msg, "length", 8),
+            signals = msg_signals,
+            mtype = self.dget(msg, "type", "can"),
+            comment = self.yml_comment_decode(self.dget(msg, "comment", "")),
+            senders = self.dget(msg, "senders", 8),
+            cycle_time = periodicity
+        )
+
+
+    def import_from_yaml_oleo(self, file_list, callback = None):
+        '''
+        Import from oleo YAML to internal cantools data structure
+        '''
+        tree = {}
+        ctr = 1
+
+        for file_name in file_list:
+            message = self.parse_yaml_oleo(file_name)
+
+            if message is not None:
+                tree[message.frame_id] = message
+
             if callback is not None:
                 callback(ctr)
 
@@ -818,13 +996,18 @@ class oleomgr:
 
         self.ignored_messages = 0
         self.added_messages = 0
+        was_empty = len(self.messages) == 0
+        added_ids = []
 
         for message in tree:
             if message not in self.messages:
                 self.added_messages += 1
                 self.messages[message] = tree[message]
+                added_ids.append(message)
             else:
                 self.ignored_messages += 1
+
+        self.mark_imported(added_ids, was_empty)
         
         self.log("Imported " + str(self.added_messages) + " messages, " + str(self.ignored_messages) + " messages already exist and were skipped")
 
@@ -836,6 +1019,284 @@ class oleomgr:
             return False
 
 
+    def manifest_encode(self, data):
+        '''
+        Make loaded YAML data storable as JSON: dicts become lists of
+        key/value pairs, so integer keys (choices) survive the round trip
+        '''
+        if isinstance(data, dict):
+            return {"pairs": [[self.manifest_encode(k), self.manifest_encode(v)] for k, v in data.items()]}
+        if isinstance(data, list):
+            return [self.manifest_encode(x) for x in data]
+        if data is None or isinstance(data, (str, int, float, bool)):
+            return data
+        raise TypeError("Cannot store " + str(type(data)) + " in the manifest")
+
+
+    def manifest_decode(self, data):
+        '''
+        Invert the operation above
+        '''
+        if isinstance(data, dict):
+            return {self.manifest_decode(k): self.manifest_decode(v) for k, v in data["pairs"]}
+        if isinstance(data, list):
+            return [self.manifest_decode(x) for x in data]
+        return data
+
+
+    def manifest_load(self, folder):
+        '''
+        Load the import manifest of a YAML folder
+        Returns an empty manifest if missing, unreadable or outdated
+
+        The manifest only holds JSON (checksums and the loaded YAML data),
+        as the folder is shared: it must never be able to run code
+        '''
+        try:
+            f = open(join(folder, self.MANIFEST_NAME), "r", encoding="utf-8")
+            manifest = json.load(f)
+            f.close()
+
+            if type(manifest) is dict and manifest.get("version") == self.MANIFEST_VERSION:
+                return manifest["files"]
+
+            self.log("Manifest in " + str(folder) + " is outdated, rebuilding")
+        except FileNotFoundError:
+            pass
+        except:
+            self.log("Manifest in " + str(folder) + " is unreadable or outdated, rebuilding")
+
+        return {}
+
+
+    def manifest_save(self, folder, files):
+        '''
+        Write the import manifest of a YAML folder (atomically)
+        '''
+        tmp_name = join(folder, self.MANIFEST_NAME + ".tmp")
+
+        try:
+            f = open(tmp_name, "w", encoding="utf-8")
+            json.dump({"version": self.MANIFEST_VERSION, "files": files}, f)
+            f.close()
+            os.replace(tmp_name, join(folder, self.MANIFEST_NAME))
+            return True
+        except:
+            self.log("Could not write manifest to " + str(folder))
+            self.log("DMP", str(traceback.format_exc()))
+            return False
+
+
+    def manifest_message(self, entry, path):
+        '''
+        Build the message of an unchanged file from the YAML data cached
+        in its manifest entry, or parse the file if nothing was cached
+        '''
+        if entry.get("yaml") is None:
+            return self.parse_yaml_oleo(path)
+
+        try:
+            return self.message_from_yaml_oleo(self.manifest_decode(entry["yaml"]), path)
+        except:
+            self.log("DMP", str(traceback.format_exc()))
+            return self.parse_yaml_oleo(path)
+
+
+    def import_from_yaml_folder(self, folder, callback = None):
+        '''
+        Import (or re-import) all YAML files in a folder
+
+        A manifest of path, mtime, size and content hash -> loaded YAML data
+        is kept next to the files, so only added or changed files are parsed.
+        When the folder was imported before, messages of changed files
+        are replaced and messages of deleted files are dropped.
+
+        Returns a dict of the frame IDs added, changed and removed
+        '''
+        folder = str(folder)
+        changes = {"added": [], "changed": [], "removed": []}
+
+        file_names = sorted([f for f in listdir(folder) if isfile(join(folder, f)) and not f.startswith(self.MANIFEST_NAME) and not f.endswith(".tmp")])
+        manifest = self.manifest_load(folder)
+        manifest_out = {}
+
+        # frame IDs owned by each file during the previous import of this folder
+        previous = self.yaml_folders.get(folder, None)
+        current = {}
+        was_empty = len(self.messages) == 0
+
+        parsed = 0
+        ctr = 1
+
+        for file_name in file_names:
+            path = join(folder, file_name)
+            entry = manifest.get(file_name, None)
+            modified = True
+            message = None
+
+            try:
+                st = os.stat(path)
+            except:
+                self.log("DMP", str(traceback.format_exc()))
+                continue
+
+            if entry is not None and entry["mtime"] == st.st_mtime_ns and entry["size"] == st.st_size:
+                modified = False
+            else:
+                try:
+                    f = open(path, "rb")
+                    digest = hashlib.sha1(f.read()).hexdigest()
+                    f.close()
+                except:
+                    self.log("DMP", str(traceback.format_exc()))
+                    continue
+
+                if entry is not None and entry["hash"] == digest:
+                    # touched (e.g. by a git checkout), but the contents are the same
+                    entry = dict(entry, mtime=st.st_mtime_ns, size=st.st_size)
+                    modified = False
+                else:
+                    msg = self.load_yaml_oleo(path)
+                    message = self.message_from_yaml_oleo(msg, path)
+                    parsed += 1
+
+                    if message is None:
+                        entry = None
+                    else:
+                        try:
+                            data = self.manifest_encode(msg)
+                        except TypeError:
+                            # not cacheable, parsed again on the next import
+                            data = None
+
+                        entry = {
+                            "mtime": st.st_mtime_ns,
+                            "size": st.st_size,
+                            "hash": digest,
+                            "frame_id": message.frame_id,
+                            "yaml": data
+                        }
+
+            if callback is not None:
+                callback(ctr)
+            ctr += 1
+
+            if entry is None:
+                continue
+
+            manifest_out[file_name] = entry
+            frame_id = entry["frame_id"]
+            current[file_name] = frame_id
+
+            if previous is not None and file_name in previous and previous[file_name] == frame_id and frame_id in self.messages:
+                if modified:
+                    self.messages[frame_id] = message
+                    changes["changed"].append(frame_id)
+                continue
+
+            if previous is not None and file_name in previous and previous[file_name] in self.messages:
+                # the file now describes a different frame ID
+                self.messages.pop(previous[file_name])
+                changes["removed"].append(previous[file_name])
+
+            if frame_id not in self.messages:
+                if message is None:
+                    message = self.manifest_message(entry, path)
+                    if message is None:
+                        continue
+                self.messages[frame_id] = message
+                changes["added"].append(frame_id)
+
+        if previous is not None:
+            for file_name in previous:
+                if file_name not in current and previous[file_name] in self.messages:
+                    self.messages.pop(previous[file_name])
+                    changes["removed"].append(previous[file_name])
+
+        self.yaml_folders[folder] = current
+
+        if previous is None:
+            self.mark_imported(changes["added"], was_empty)
+        else:
+            if changes["added"] or changes["changed"] or changes["removed"]:
+                self.database = None
+
+            # reloaded messages match the files on disk again
+            for key in changes:
+                for mid in changes[key]:
+                    self.modified.discard(mid)
+                    self.deleted.discard(mid)
+
+        if parsed > 0 or len(manifest_out) != len(manifest):
+            self.manifest_save(folder, manifest_out)
+
+        self.log("Folder " + folder + ": parsed " + str(parsed) + " of " + str(len(file_names)) + " files, " +
+                 str(len(changes["added"])) + " added, " + str(len(changes["changed"])) + " changed, " +
+                 str(len(changes["removed"])) + " removed")
+
+        for key in changes:
+            if len(changes[key]) > 0:
+                self.log(key.capitalize() + ": " + ", ".join([self.to_hex(mid) for mid in changes[key]]))
+
+        if len(changes["added"]) > 0:
+            self.check_message_structure()
+
+        return changes
+
+
+    def export_to_bundle(self, fname):
+        '''
+        Export all loaded messages to a compiled bundle file
+        '''
+        fname = str(fname)
+        if not fname.endswith(".olb"):
+            fname = fname + ".olb"
+
+        try:
+            self.check_message_structure()
+            count = oleobundle.write_bundle(fname, self.messages.values())
+            self.log("Exported " + str(count) + " messages to bundle " + fname)
+            return True
+        except:
+            self.log("Failed to export bundle " + fname)
+            self.log("DMP", str(traceback.format_exc()))
+            return False
+
+
+    def import_from_bundle(self, fname):
+        '''
+        Import a compiled bundle file
+
+        Messages are only built when first accessed, and the bundle
+        is already sorted and structured so no checks are needed
+        '''
+        try:
+            messages = oleobundle.read_bundle(fname)
+        except:
+            self.log("Failed to load bundle " + str(fname))
+            self.log("DMP", str(traceback.format_exc()))
+            return False
+
+        if len(self.messages) == 0:
+            self.messages = messages
+            self.database = None
+            self.mark_clean()
+            self.log("Loaded " + str(len(messages)) + " messages from bundle")
+            return True
+
+        # merge into the existing messages, which needs everything built
+        added = 0
+        for mid in messages:
+            if mid not in self.messages:
+                self.messages[mid] = messages[mid]
+                self.mark_modified(mid)
+                added += 1
+
+        self.log("Imported " + str(added) + " messages from bundle, " + str(len(messages) - added) + " messages already exist and were skipped")
+        self.check_message_structure()
+        return True
+
+
     def import_from_yaml(self, file_list, callback = None):
         '''
         Import from YAML to internal cantools data structure
@@ -929,13 +1390,18 @@ class oleomgr:
 
             self.ignored_messages = 0
             self.added_messages = 0
+            was_empty = len(self.messages) == 0
+            added_ids = []
 
             for message in tree:
                 if message not in self.messages:
                     self.added_messages += 1
                     self.messages[message] = tree[message]
+                    added_ids.append(message)
                 else:
                     self.ignored_messages += 1
+
+            self.mark_imported(added_ids, was_empty)
             
             self.log("Imported " + str(self.added_messages) + " messages, " + str(self.ignored_messages) + " messages already exist and were skipped")
 
@@ -148,6 +148,7 @@ class message_editor:
             self.app.omgr.messages[self.mid].senders = self.svs["senders"].get().split(",")
             self.app.omgr.messages[self.mid].cycle_time = self.svs["periodicity"].get()
             self.app.omgr.messages[self.mid].mtype = self.mtype_cmb.get()
+            self.app.omgr.mark_modified(self.mid)
 
             self.app.reload_msg_list()
         except:
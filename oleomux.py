@@ -3,16 +3,18 @@ from tkinter.simpledialog import askstring
 from tkinter.ttk import Combobox, Treeview
 from typing import OrderedDict
 
-from source_handler import CanPrintHandler, InvalidFrame, CANHandler, SerialHandlerNew, ArdLogHandler
+from source_handler import CanPrintHandler, InvalidFrame, CANHandler, SerialHandlerNew, LogFileHandler
 from recordclass import recordclass
+from cantools.database.can.dispatch import FrameIdDispatcher
 
 from functools import partial
-import cantools, pprint, serial, can, csv, numexpr, threading, sys, traceback, time, serial.tools.list_ports, yaml, os, datetime
+import cantools, cantools.logdiff, cantools.logexport, cantools.logquery, cantools.signalstore, pprint, serial, can, csv, numexpr, threading, sys, traceback, time, serial.tools.list_ports, yaml, os, datetime
 from os import listdir
 from os.path import isfile, join
 
 from oleomgr import oleomgr
 from oleotree import oleotree
+from oleodiff import oleodiff
 from oleodefs import CANDef
 from oleomsgeditor import message_editor
 from oleosigeditor import signal_editor, choice_editor
@@ -123,12 +125,13 @@ class oleomux:
     }
 
     active_message = 0
-    active_message_hex = 0
+    active_slot = -1
 
     filter_senders : list = None
     filter_receivers : list = None
     filter_messages : list = None
     log_filter = None
+    yaml_folder = None
 
 
     def log(self, ma, msg = None):
@@ -186,11 +189,61 @@ class oleomux:
         if fd == () or fd is None:
             return
 
-        file_list = [(fd + "/" + f) for f in listdir(fd) if isfile(join(fd, f))]
-        self.omgr.import_from_yaml_oleo(file_list, callback = partial(self.update_progress, len(file_list)))
+        self.yaml_folder = fd
+        file_count = len([f for f in listdir(fd) if isfile(join(fd, f))])
+        self.omgr.import_from_yaml_folder(fd, callback = partial(self.update_progress, file_count))
+        self.reload_internal_from_omgr()
+
+
+    def reloadYAMLfolder(self):
+        '''
+        Re-import the last YAML folder, only parsing files
+        which were added or changed since the last import
+        '''
+        if self.yaml_folder is None:
+            self.importYAMLfolder()
+            return
+
+        changes = self.omgr.import_from_yaml_folder(self.yaml_folder)
+        self.status['text'] = "Reloaded: " + str(len(changes["added"])) + " added, " + str(len(changes["changed"])) + " changed, " + str(len(changes["removed"])) + " removed"
         self.reload_internal_from_omgr()
     
 
+    def importBundle(self):
+        '''
+        Import a compiled database bundle
+        '''
+        f = filedialog.askopenfilename(initialdir = "", 
+                                                    title = "Select a database bundle", 
+                                                    filetypes = (("Oleomux bundle", 
+                                                                    "*.olb*"), 
+                                                                ("all files", 
+                                                                    "*.*"))) 
+        if f == () or f == None or f == '':
+            return
+
+        if not self.omgr.import_from_bundle(f):
+            messagebox.showerror(title="Oh no!", message="Could not load the bundle, check the log for details")
+            return
+        self.reload_internal_from_omgr()
+
+
+    def exportBundle(self):
+        '''
+        Export all loaded messages to a compiled database bundle
+        '''
+        fname = filedialog.asksaveasfilename(title = "Choose filename for the bundle...",
+                                        filetypes = (("Oleomux bundle", "*.olb"), 
+                                                     ("all files", "*.*"))) 
+        if fname == () or fname == None or fname == '':
+            return
+
+        if self.omgr.export_to_bundle(fname):
+            messagebox.showinfo(title="OK", message="Export to bundle done!")
+        else:
+            messagebox.showerror(title="Oh no!", message="The export could not be completed.")
+
+
     def saveYAMLall(self):
         '''
         Show a tickbox view of all the loaded messages
@@ -209,7 +262,9 @@ class oleomux:
             if fd == () or fd is None:
                 return
 
-            result = self.omgr.export_to_yaml_oleo(fd, results, callback = partial(self.update_progress, len(results)))
+            # saving back into the folder we loaded from only writes what changed
+            only_modified = fd == self.yaml_folder
+            result = self.omgr.export_to_yaml_oleo(fd, results, callback = partial(self.update_progress, len(results)), only_modified = only_modified)
             if result:
                 messagebox.showinfo(title="OK", message="Export to YAML done!")
             else:
@@ -220,6 +275,29 @@ class oleomux:
             return
 
 
+    def saveYAMLchanges(self):
+        '''
+        Write only the modified/deleted messages back to the loaded YAML folder
+        '''
+        if self.yaml_folder is None:
+            self.saveYAMLall()
+            return
+
+        changed = len(self.omgr.modified) + len(self.omgr.deleted)
+        if changed == 0:
+            self.status['text'] = "No changes to save"
+            return
+
+        include_list = {}
+        for mid in self.omgr.messages:
+            include_list[self.omgr.messages[mid].frame_id] = 1
+
+        if self.omgr.export_to_yaml_oleo(self.yaml_folder, include_list, only_modified = True):
+            self.status['text'] = "Saved " + str(changed) + " changed messages to " + str(self.yaml_folder)
+        else:
+            messagebox.showerror(title="Oh no!", message="The export could not be completed.")
+
+
     def saveYAMLselected(self):
         '''
         Export the currently selected message to YAML
@@ -361,6 +439,7 @@ class oleomux:
         Clean the messages stored in the internal DB and UI
         '''
         self.omgr.clean()
+        self.yaml_folder = None
         self.reload_internal_from_omgr()
 
 
@@ -420,6 +499,23 @@ class oleomux:
         self.reload_msg_list()
 
 
+    def filter_by_log(self, *largs):
+        '''
+        Only show messages present in the loaded log, from its index
+        '''
+        if self.source_handler is None or not hasattr(self.source_handler, "index"):
+            messagebox.showerror(title="Oh no!", message="Load a CAN log first")
+            return
+
+        if self.source_handler.index is None:
+            messagebox.showerror(title="Oh no!", message="The log is still being indexed, try again in a moment")
+            return
+
+        self.filter_messages = [x for x in self.source_handler.index.ids if x in self.omgr.messages]
+        self.log("Showing " + str(len(self.filter_messages)) + " messages present in the log")
+        self.reload_msg_list()
+
+
     def clear_filters(self, *largs):
         '''
         Clear any filters that have been set, show everything
@@ -484,7 +580,7 @@ class oleomux:
             if include_filter:
                 self.message_ids.append(self.omgr.to_hex(message, 3))
                 self.message_ints.append(message)
-                self.message_names.append(self.omgr.messages[message].name)
+                self.message_names.append(self.omgr.message_name(message))
             else:
                 continue
 
@@ -599,6 +695,10 @@ class oleomux:
         except:
             self.log("Configuration file could not be saved.")
 
+        if self.signal_store is not None:
+            self.signal_store.close()
+            self.signal_store = None
+
 
     # Init window
     def __init__(self, master):
@@ -617,6 +717,7 @@ class oleomux:
         self.simDelayMs =  1
         self.sim_ok = False
         self.reading_thread = None
+        self.signal_store = None
 
         self.win_msg_editor = None
         self.win_sig_editor = None
@@ -658,10 +759,15 @@ class oleomux:
         filemenu.add_separator()
         filemenu.add_command(label="Import YAML (file)", command=self.importYAMLfile)
         filemenu.add_command(label="Import YAML (folder)", command=self.importYAMLfolder)
+        filemenu.add_command(label="Reload YAML (folder)", command=self.reloadYAMLfolder)
+        filemenu.add_command(label="Save changes (YAML folder)", command=self.saveYAMLchanges)
         filemenu.add_command(label="Export YAML (multiple)", command=self.saveYAMLall)
         filemenu.add_command(label="Export YAML (only selected)", command=self.saveYAMLselected)
         filemenu.add_command(label="Export C Code", command=self.exportCoptions)
         filemenu.add_separator()
+        filemenu.add_command(label="Import bundle", command=self.importBundle)
+        filemenu.add_command(label="Export bundle", command=self.exportBundle)
+        filemenu.add_separator()
         filemenu.add_command(label="Export list of signals", command=self.generateSignalList)
         self.menubar.add_cascade(label= "File", underline=0, menu= filemenu)
 
@@ -679,12 +785,20 @@ class oleomux:
         toolsmenu.add_command(label="Filter by sender...", command=self.filter_by_sender)
         toolsmenu.add_command(label="Filter by receiver...", command=self.filter_by_receiver)
         toolsmenu.add_command(label="Filter messages by vehicle...", command=self.filter_by_vehicle)
+        toolsmenu.add_command(label="Filter messages by loaded log", command=self.filter_by_log)
         toolsmenu.add_command(label="Clear filters", command=self.clear_filters)
         toolsmenu.add_separator()
         #self.menubar.add_command(label="Load CAN Map", command=self.loadCSV)  
         toolsmenu.add_command(label="Clear loaded messages", command=self.clean)  
-        toolsmenu.add_command(label="Load Oleomux CAN log", command=self.loadSim)
+        toolsmenu.add_command(label="Load CAN log (oleomux, candump, ASC, TRC, BLF)", command=self.loadSim)
         toolsmenu.add_command(label="Load candump console log", command=self.loadSimCanDump)
+        toolsmenu.add_command(label="Show loaded log summary", command=self.logSummary)
+        toolsmenu.add_command(label="Seek in loaded log...", command=self.seekSim)
+        toolsmenu.add_command(label="Export decoded log...", command=self.exportDecodedLog)
+        toolsmenu.add_command(label="Search log...", command=self.searchLog)
+        toolsmenu.add_command(label="Compare captures...", command=self.compareCaptures)
+        self.record_signals = BooleanVar(master)
+        toolsmenu.add_checkbutton(label="Record signals to SQLite...", var=self.record_signals, command=self.recordSignalsToggle)
         toolsmenu.add_separator()
         self.bit_type = IntVar(master)
         self.bit_type.set(self.configuration["bit_ordering"])
@@ -852,6 +966,11 @@ class oleomux:
         self.status.pack(fill="both", expand=True)
         self.frame.grid(row=6, column=0, columnspan=10, sticky="sew")
 
+        # optional bundle to load at startup (e.g. for capture units)
+        if "startup_bundle" in self.configuration and self.configuration["startup_bundle"]:
+            if self.omgr.import_from_bundle(self.configuration["startup_bundle"]):
+                self.reload_internal_from_omgr()
+
         self.log("Initialisation complete - ready for work")
 
 
@@ -895,6 +1014,7 @@ class oleomux:
                     return False
 
         self.omgr.messages.pop(self.active_message, 0)
+        self.omgr.mark_deleted(self.active_message)
         self.active_message -= 1
         if self.active_message < 0:
             self.active_message = 0
@@ -916,6 +1036,7 @@ class oleomux:
                     return False
 
         self.omgr.messages[self.active_message].signals.pop(ref)
+        self.omgr.mark_modified(self.active_message)
         self.CANChangeFields(False)
 
 
@@ -997,6 +1118,7 @@ class oleomux:
                     self.can_connex = False
                     self.reading_thread = None
                     self.log("Simulation end of file. Reload to start again")
+                    self.log("Frames: " + str(can_stats["frames"]) + ", identical to previous: " + str(can_stats["repeated"]))
                     self.master.after(50, self.parse_can_data)
                     return
 
@@ -1015,15 +1137,15 @@ class oleomux:
                     if not self.winView == None:
                         self.winViewUpdateFields()
 
-                    if self.active_message_hex in can_flags:
-                        if can_flags[self.active_message_hex]:
+                    if self.active_slot != -1:
+                        if can_flags[self.active_slot]:
 
-                            msg = can_messages[self.active_message_hex]
-                            self.log("Update: " + str(self.active_message_hex))
+                            msg = can_messages[self.active_slot]
+                            self.log("Update: " + str(self.active_message))
                             for p in self.canFields:
                                 p.update(msg)
 
-                            can_flags[self.active_message_hex] = False
+                            can_flags[self.active_slot] = False
 
                             # Update binary and hex representations
                             z = 0
@@ -1063,7 +1185,7 @@ class oleomux:
             filename = filedialog.askopenfilename(initialdir = "/home/rob/Software/car_projects/CAN Dumps", 
                                           title = "Select a CAN message LOG", 
                                           filetypes = (("CAN Dumps", 
-                                                       "*.csv*"), 
+                                                       "*.csv* *.log *.asc *.trc *.blf"), 
                                                        ("all files", 
                                                         "*.*"))) 
             if not filename:
@@ -1073,7 +1195,7 @@ class oleomux:
                 if self.source_handler is not None and self.source_handler.adapter_type == "log":
                     self.source_handler.open(filename=filename)
                 else:
-                    self.source_handler = ArdLogHandler(filename, self) # pass self to allow access to simDelayMs
+                    self.source_handler = LogFileHandler(filename, self) # pass self to allow access to simDelayMs
                 self.status['text'] = "Simulation file loaded"
                 self.log("Requested to open " + str(filename))
         except:
@@ -1100,6 +1222,255 @@ class oleomux:
             self.status['text'] = "Failed to load simulation file"
 
 
+    def logSummary(self):
+        if self.source_handler is None or not hasattr(self.source_handler, "index"):
+            self.log("SIM", "No log loaded")
+            return
+
+        for line in self.source_handler.summary():
+            self.log("SIM", line)
+
+
+    def seekSim(self):
+        if self.source_handler is None or not hasattr(self.source_handler, "seek"):
+            self.log("SIM", "No log loaded")
+            return
+
+        answer = askstring("Seek", "Seconds from the start of the log:")
+        if answer is None:
+            return
+
+        try:
+            if self.source_handler.seek(float(answer)) is not None:
+                self.status['text'] = "Simulation continues at " + answer + " s"
+        except:
+            self.log("DMP", traceback.format_exc())
+
+
+    def exportDecodedLog(self):
+        '''
+        Decode a log with the loaded definitions and export the signals
+        of each message to a Parquet or npz file
+        '''
+        if self.source_handler is not None and self.source_handler.adapter_type == "log":
+            filename = self.source_handler.filename
+        else:
+            filename = filedialog.askopenfilename(title = "Select a CAN log to export",
+                                          filetypes = (("CAN Dumps",
+                                                       "*.csv* *.log *.asc *.trc *.blf"),
+                                                       ("all files",
+                                                        "*.*")))
+        if not filename:
+            return
+
+        fd = filedialog.askdirectory(initialdir = "",
+                                     title = "Choose a folder for the exported signals")
+        if fd == () or not fd:
+            return
+
+        database = self.omgr.as_database()
+
+        def export():
+            try:
+                summary = cantools.logexport.export_log(filename, database, fd)
+                self.log("EXP", "Exported " + str(summary.decoded) + " of " + str(summary.frames) + " frames to " + fd)
+                for name, rows in sorted(summary.rows.items()):
+                    self.log("EXP", "  " + summary.files[name] + ": " + str(rows) + " rows")
+                self.status['text'] = "Log export done"
+            except:
+                self.log("DMP", traceback.format_exc())
+                self.status['text'] = "Log export failed"
+
+        self.status['text'] = "Exporting decoded log..."
+        threading.Thread(target=export, daemon=True).start()
+
+
+    def searchLog(self):
+        '''
+        Search a log, decoded with the loaded definitions, for the
+        intervals where a query holds and offer to replay from the first
+        '''
+        if self.source_handler is not None and self.source_handler.adapter_type == "log":
+            filename = self.source_handler.filename
+        else:
+            filename = filedialog.askopenfilename(title = "Select a CAN log to search",
+                                          filetypes = (("CAN Dumps",
+                                                       "*.csv* *.log *.asc *.trc *.blf"),
+                                                       ("all files",
+                                                        "*.*")))
+        if not filename:
+            return
+
+        answer = askstring("Search log", "Query, e.g. rising(DOOR == OPEN) and SPEED > 0:")
+        if not answer:
+            return
+
+        try:
+            query = cantools.logquery.Query(answer)
+        except cantools.logquery.QueryError as e:
+            messagebox.showerror(title="Invalid query", message=str(e))
+            return
+
+        database = self.omgr.as_database()
+
+        def search():
+            try:
+                matches = query.search_log(filename, database)
+            except cantools.logquery.QueryError as e:
+                self.log("QRY", str(e))
+                self.status['text'] = "Log search failed"
+                return
+            except:
+                self.log("DMP", traceback.format_exc())
+                self.status['text'] = "Log search failed"
+                return
+
+            self.log("QRY", str(len(matches)) + " matches of '" + answer + "' in " + filename)
+            for start, end in matches[:100]:
+                if start == end:
+                    self.log("QRY", "  " + str(round(start, 6)))
+                else:
+                    self.log("QRY", "  " + str(round(start, 6)) + " - " + str(round(end, 6)))
+            self.status['text'] = "Log search done, " + str(len(matches)) + " matches"
+            self.master.after(0, partial(self.searchLogDone, filename, matches))
+
+        self.status['text'] = "Searching log..."
+        threading.Thread(target=search, daemon=True).start()
+
+
+    def searchLogDone(self, filename, matches):
+        '''
+        Offer to continue the replay of the searched log at its first match
+        '''
+        if not matches:
+            messagebox.showinfo(title="Search log", message="No matches found.")
+            return
+
+        if self.source_handler is None or getattr(self.source_handler, "filename", None) != filename \
+           or not hasattr(self.source_handler, "seek"):
+            return
+
+        if not messagebox.askyesno(title="Search log",
+                                   message=str(len(matches)) + " matches found, replay from the first?"):
+            return
+
+        if self.source_handler.index is None:
+            self.log("SIM", "Log is still being indexed, cannot replay from the match yet")
+            return
+
+        try:
+            first = self.source_handler.index.first_timestamp or 0
+            self.source_handler.seek(matches[0][0] - first)
+            self.status['text'] = "Simulation continues at the first match"
+        except:
+            self.log("DMP", traceback.format_exc())
+
+
+    def compareCaptures(self):
+        '''
+        Compare two or more logs, or time windows of one log, and list
+        the bit ranges which differ between them
+        '''
+        filenames = filedialog.askopenfilenames(title = "Select the CAN logs to compare (or one log to compare time windows of)",
+                                                filetypes = (("CAN Dumps",
+                                                             "*.csv* *.log *.asc *.trc *.blf"),
+                                                             ("all files",
+                                                              "*.*")))
+        if not filenames:
+            return
+
+        captures = list(filenames)
+        if len(captures) == 1:
+            answer = askstring("Compare captures", "Time windows to compare, in seconds from the start of the log, e.g. 0:30 60:90")
+            if not answer:
+                return
+            captures = [filenames[0] + "@" + window for window in answer.split()]
+
+        if len(captures) < 2:
+            messagebox.showwarning(title="Nope", message="Select at least two logs or time windows to compare")
+            return
+
+        def compare():
+            try:
+                diff = cantools.logdiff.diff_logs(captures)
+            except:
+                self.log("DMP", traceback.format_exc())
+                self.status['text'] = "Capture comparison failed"
+                return
+
+            self.log("DIF", "Compared " + ", ".join(diff.names) + ": " + str(len(diff.candidates)) + " candidates")
+            for candidate in diff.candidates[:20]:
+                self.log("DIF", "  " + str(candidate))
+            self.status['text'] = "Capture comparison done"
+            self.master.after(0, partial(oleodiff, self.master, self, diff))
+
+        self.status['text'] = "Comparing captures..."
+        threading.Thread(target=compare, daemon=True).start()
+
+
+    def addSignalFromCandidate(self, candidate):
+        '''
+        Create a big endian signal from a candidate bit range of a capture
+        comparison and open it in the signal editor
+        '''
+        mid = candidate.frame_id
+        if mid not in self.omgr.messages:
+            messagebox.showwarning(title="Nope", message="Message " + self.omgr.to_hex(mid) + " is not defined, create it first")
+            return
+
+        signal = candidate.to_signal()
+        bits = self.omgr.yml_bits_encode(signal, output_mode = self.bit_display_mode)
+        signal.name = "New signal " + bits
+        self.omgr.messages[mid].signals.append(signal)
+        self.omgr.mark_modified(mid)
+        if mid == self.active_message:
+            self.reload_signal_ui()
+
+        if self.win_sig_editor is not None:
+            if self.win_sig_editor.created == 1:
+                self.win_sig_editor.win.destroy()
+        self.win_sig_editor = signal_editor(self.master, self, signal.name, mid, len(self.omgr.messages[mid].signals) - 1)
+
+
+    def recordSignalsToggle(self):
+        '''
+        Start or stop recording the changes of all decoded signals of
+        received frames to an SQLite signal store
+        '''
+        if self.signal_store is not None:
+            store = self.signal_store
+            self.signal_store = None
+            try:
+                store.close()
+                self.log("STO", "Recorded " + str(store.samples_added) + " samples to " + store.path)
+            except:
+                self.log("DMP", traceback.format_exc())
+            self.record_signals.set(False)
+            self.status['text'] = "Signal recording stopped"
+            return
+
+        self.record_signals.set(False)
+        fname = filedialog.asksaveasfilename(title = "Choose a signal store to record to...",
+                                             defaultextension = ".sqlite",
+                                             filetypes = (("SQLite signal store", "*.sqlite *.db"),
+                                                          ("all files", "*.*")))
+        if not fname:
+            return
+
+        try:
+            self.signal_store = cantools.signalstore.SignalStore(fname,
+                                                                 self.omgr.as_database(),
+                                                                 changes_only=True)
+        except:
+            self.log("DMP", traceback.format_exc())
+            self.status['text'] = "Could not open the signal store"
+            return
+
+        self.record_signals.set(True)
+        self.log("STO", "Recording signal changes to " + fname)
+        self.status['text'] = "Recording signals to " + os.path.basename(fname)
+
+
     def startSim(self):
         if self.serial_connex:
             if self.source_handler.is_running():
@@ -1176,8 +1547,9 @@ class oleomux:
         '''
         self.active_message_old = self.active_message
         self.active_message_index =  int(self.messageType.current())
-        self.active_message_hex = self.message_ids[ self.active_message_index ]
         self.active_message = self.message_ints[ self.active_message_index ]
+        with can_messages_lock:
+            self.active_slot = can_slot(self.active_message)
         self.messageID.current(self.messageType.current())
 
         self.CANChangeFields()
@@ -1190,8 +1562,9 @@ class oleomux:
         '''
         self.active_message_old = self.active_message
         self.active_message_index =  int(self.messageID.current())
-        self.active_message_hex = self.message_ids[ self.active_message_index ]
         self.active_message = self.message_ints [ self.active_message_index ]
+        with can_messages_lock:
+            self.active_slot = can_slot(self.active_message)
         self.messageType.current(self.messageID.current())
 
         self.CANChangeFields()
@@ -1270,6 +1643,7 @@ class oleomux:
             return
         
         self.omgr.messages[id] = cantools.database.can.Message(frame_id = id, name="Unspecified " + str(result), length=8, signals=[])
+        self.omgr.mark_modified(id)
         self.reload_msg_list()
         # TODO: save changes if the window is open?
         if self.win_msg_editor is not None:
@@ -1291,6 +1665,7 @@ class oleomux:
             return False
       
         self.omgr.messages[self.active_message].signals.append(cantools.database.can.Signal(start=start, name="New signal " + str(result), length=lng))
+        self.omgr.mark_modified(self.active_message)
         self.reload_signal_ui()
 
         # TODO: save changes if the window is open?
@@ -1325,6 +1700,7 @@ class oleomux:
         
         try:
             self.omgr.messages[mid].signals.pop(sid)
+            self.omgr.mark_modified(mid)
             self.reload_signal_ui()
         except:
             self.log("Could not delete signal " + str(mid) + " , " + str(sid))
@@ -1643,7 +2019,7 @@ class oleomux:
             except:
                 # can happen if this gets called and the window isn't open
                 return
-            current_frame_id = self.message_ids[active_index]
+            current_frame_id = self.message_ints[active_index]
 
             j = 0
             offset = -1
@@ -1653,7 +2029,7 @@ class oleomux:
                     # the index will match with message index in the main view, so we don't need to store separately here
                     if current_frame_id == message:
                         offset = j
-                    items.append(self.omgr.to_hex(message) + " - " + self.omgr.messages[message].name)
+                    items.append(self.omgr.to_hex(message) + " - " + self.omgr.message_name(message))
                     j += 1
 
             if len(items) > 0:    
@@ -1698,7 +2074,8 @@ class oleomux:
             self.overview_cmbs_signals[row]['values'] = ["Choose..."]
 
         self.overview_cmbs_signals[row].current(0)
-        self.overview_messages_subscribed[row] = self.message_ids[active_index]
+        with can_messages_lock:
+            self.overview_messages_subscribed[row] = can_slot(current_frame_id)
 
         self.winViewUpdateSignals(row)
 
@@ -1719,18 +2096,19 @@ class oleomux:
         '''
         Update all the values displayed in the window
         '''
-        ctr = 0
-        for row in self.overview_messages_subscribed:
-            if row == -1:
+        updated = []
+        for ctr, slot in enumerate(self.overview_messages_subscribed):
+            if slot == -1:
                 # message not been set yet
                 continue
             
-            if row in can_flags_overview:
-                if can_flags_overview[row]:
-                    self.overview_output_svars[ctr].set(self.can_to_formatted(can_messages[row], int(row, 16), self.overview_selected_signal[ctr]))
-                    can_flags_overview[row] = False
-            
-            ctr += 1
+            if can_flags_overview[slot]:
+                self.overview_output_svars[ctr].set(self.can_to_formatted(can_messages[slot], can_slots.frame_ids[slot], self.overview_selected_signal[ctr]))
+                updated.append(slot)
+
+        # clear afterwards, several rows can show signals of the same message
+        for slot in updated:
+            can_flags_overview[slot] = False
 
 
     def overViewDestroyed(self, x):
@@ -1761,14 +2139,33 @@ should_redraw = threading.Event()
 stop_reading = threading.Event()
 eof_data = threading.Event()
 
-can_messages = {}
-can_flags = {}
-can_flags_overview = {}
+# live tables, indexed by the slot can_slots gives each frame ID
+can_slots = FrameIdDispatcher()
+can_messages = []
+can_flags = []
+can_flags_overview = []
+# last raw payload of each slot, and how many frames were repeats
+can_payloads = []
+can_stats = {"frames": 0, "repeated": 0}
 can_messages_lock = threading.Lock()
 
 thread_exception = None
 thread_crashed = False
 
+def can_slot(frame_id):
+    '''
+    Slot of frame_id in the live tables, added on first use.
+    Call with can_messages_lock held
+    '''
+    slot = can_slots.slot(frame_id)
+    if slot == -1:
+        slot = can_slots.add(frame_id, frame_id)
+        can_messages.append("")
+        can_flags.append(False)
+        can_flags_overview.append(False)
+        can_payloads.append(None)
+    return slot
+
 # Convert [ 8E, 7F ] to [ 0 1 1 0 1 0 ] etc
 def can_to_bin(data):
     out = []
@@ -1804,11 +2201,27 @@ def reading_loop(parent):
                 except EOFError:
                     break
 
+                store = parent.signal_store
+                if store is not None:
+                    # the time from the log when replaying one, else the time of reception
+                    timestamp = parent.source_handler.timestamp
+                    if timestamp is None:
+                        timestamp = time.time()
+                    store.add_frame(timestamp, frame_id, bytes([int(x) for x in data]))
+
                 # Add the frame to the can_messages dict and flag that it changed
+                payload = tuple(data)
                 with can_messages_lock:
-                    can_messages[frame_id] = can_to_bin(data)
-                    can_flags[frame_id] = True
-                    can_flags_overview[frame_id] = True
+                    slot = can_slot(frame_id)
+                    can_stats["frames"] += 1
+                    if can_payloads[slot] == payload:
+                        # identical to the last frame, nothing to convert or redraw
+                        can_stats["repeated"] += 1
+                        continue
+                    can_payloads[slot] = payload
+                    can_messages[slot] = can_to_bin(data)
+                    can_flags[slot] = True
+                    can_flags_overview[slot] = True
 
             time.sleep(0.2)
 
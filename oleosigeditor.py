@@ -169,6 +169,7 @@ class signal_editor:
             # make a new one
             new_choice = len(self.app.omgr.messages[self.mid].signals[self.sid].choices)
             self.app.omgr.messages[self.mid].signals[self.sid].choices[new_choice] = NamedSignalValue(new_choice, "New choice " + str(new_choice), {})
+            self.app.omgr.mark_modified(self.mid)
             self.reload_choices()
             self.choice_editor = choice_editor(self.master, self.app, self, "Edit new choice value", self.mid, self.sid, new_choice)
             return
@@ -227,6 +228,7 @@ class signal_editor:
         self.app.omgr.messages[self.mid].signals[self.sid].dtype = self.dtype_cmb.get()
         self.app.omgr.messages[self.mid].signals[self.sid].inverted = self.svs["inverted"].get()
         # self.app.messages[self.mid].signals[self.sid].choices = xx
+        self.app.omgr.mark_modified(self.mid)
 
         self.app.reload_signal_ui()
     
@@ -353,6 +355,7 @@ class choice_editor:
         comments_joined = self.app.omgr.yml_comment_decode(comments_collection)
 
         self.app.omgr.messages[self.mid].signals[self.sid].choices[self.cid].comments = comments_joined
+        self.app.omgr.mark_modified(self.mid)
 
         self.app.reload_signal_ui()
         self.sig_editor.reload_choices()
@@ -364,6 +367,7 @@ class choice_editor:
         '''
         try:
             self.app.omgr.messages[self.mid].signals[self.sid].choices.pop(self.cid)
+            self.app.omgr.mark_modified(self.mid)
         except:
             self.log("Failed to delete signal choice")
             messagebox.showerror(title="Sacre bleu", message="Failed to delete signal choice")
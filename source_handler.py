@@ -1,6 +1,7 @@
 from binascii import unhexlify
 from tkinter import E
 import csv, os, serial, time, re, datetime, traceback, threading
+from cantools import logformats, logindex
 
 try:
     import can
@@ -26,6 +27,8 @@ class SourceHandler:
     cs = None
     filter_log = None
     owner = None
+    # time (in seconds) of the last frame returned by get_message, if the source has one
+    timestamp = None
 
     def to_hex(self, raw_val, lng=3):
         return "{0:0{1}x}".format(raw_val, lng).upper()
@@ -64,7 +67,7 @@ class SourceHandler:
         """Get CAN id and CAN data.
 
         Returns:
-            A tuple containing the id (as hex) and data (list of ints)
+            A tuple containing the id (as int) and data (list of ints)
 
         Raises:
             InvalidFrame
@@ -172,15 +175,16 @@ class CANHandler(SourceHandler):
             return False
 
         inp = self.packets.pop(0)
+        self.timestamp = inp[0]
 
         if self.filter_log is not None:
             if inp[1] not in self.filter_log:
                 # skip logging only if we explicitly filtered it out
-                return self.to_hex(inp[1]), inp[2:]
+                return inp[1], inp[2:]
         
         self.cs.writerow([inp[0], inp[1], *inp[2:]])
         
-        return self.to_hex(inp[1]), inp[2:]
+        return inp[1], inp[2:]
 
 
 class SerialHandlerNew(SourceHandler):
@@ -336,11 +340,11 @@ class SerialHandlerNew(SourceHandler):
         if self.filter_log is not None:
             if id not in self.filter_log:
                 # skip logging only if we explicitly filtered it out
-                return self.to_hex(id), msg_data
+                return id, msg_data
         
         self.cs.writerow([timestamp, id, *msg_data])
         
-        return self.to_hex(id), msg_data
+        return id, msg_data
 
 
 class SerialHandler(SourceHandler):
@@ -402,7 +406,7 @@ class SerialHandler(SourceHandler):
         frame = line.split(" ", maxsplit=1)
 
         #try:
-        frame_id = frame[0]  # get the ID from the 'ID=246' string
+        frame_id = int(frame[0], 16)  # get the ID from the 'ID=246' string
 
         #frame_length = int(frame[2][4:])  # get the length from the 'LEN=8' string
 
@@ -489,10 +493,10 @@ class ArdLogHandler(SourceHandler):
                 self.is_timestamped = False
                 print("[SIM] Selected simulation has no timestamps. Delay set to " + str(self.owner.simDelayMs/1000.0))
             
-        can_id = line[self.is_offset]
-
-        if not self.is_hexa:
-            can_id = self.to_hex(int(can_id))
+        if self.is_hexa:
+            can_id = int(line[self.is_offset], 16)
+        else:
+            can_id = int(line[self.is_offset])
 
         if can_id not in self.ids_present:
             self.ids_present[can_id] = 1
@@ -510,6 +514,129 @@ class ArdLogHandler(SourceHandler):
         return can_id, bytes
             
 
+class LogFileHandler(SourceHandler):
+    '''
+    Reader for CAN logs in any format known to cantools.logformats
+    (oleomux CSV, candump, Vector ASC / BLF, PCAN TRC), detected from
+    the file contents
+    '''
+    def __init__(self, file_name, owner):
+        self.adapter_type = "log"
+        self.filename = file_name
+        self.owner = owner
+        self.ids_present = {}
+        self.reader = None
+        self.frames = None
+        self.index = None
+        self.open()
+
+
+    def open(self, bus="", filename=""):
+        if filename != "" and filename != self.filename:
+            self.filename = filename
+            self.index = None
+        self.bus = bus
+        self.reader = logformats.open_log(self.filename)
+        self.frames = iter(self.reader)
+        self.log("Opening " + str(self.filename) + " (" + self.reader.name + " log)")
+        self.load_index()
+
+
+    def load_index(self):
+        '''
+        Load the sidecar index of the log, giving the IDs present without
+        a replay. It is built in one pass (and saved) the first time, in
+        the background as that can take a while for long logs
+        '''
+        self.ids_present = {}
+        if self.index is not None and self.index.is_valid():
+            self.log_index()
+            return
+
+        self.index = None
+        filename = self.filename
+        format_name = self.reader.name
+
+        def build():
+            try:
+                index = logindex.load_index(filename, format_name)
+            except:
+                self.log("Failed to index " + str(filename))
+                self.log(traceback.format_exc())
+                return
+
+            # another log may have been opened meanwhile
+            if filename == self.filename:
+                self.index = index
+                self.log_index()
+
+        self.log("Indexing " + str(filename) + "...")
+        threading.Thread(target=build, daemon=True).start()
+
+
+    def log_index(self):
+        self.log("Log holds " + str(self.index.frames) + " frames of " + str(len(self.index.ids)) + " IDs")
+
+
+    def summary(self):
+        '''
+        One line per ID: count, lengths and inter-arrival times
+        '''
+        if self.index is None:
+            return ["Log is still being indexed"]
+
+        lines = []
+        for frame_id in sorted(self.index.ids):
+            stats = self.index.ids[frame_id]
+            line = self.to_hex(frame_id) + ": " + str(stats.count) + " frames, DLC " + ",".join(str(x) for x in sorted(stats.lengths))
+            if stats.min_interval is not None:
+                line += ", interval {:.1f}-{:.1f} ms".format(stats.min_interval * 1000, stats.max_interval * 1000)
+            lines.append(line)
+        return lines
+
+
+    def seek(self, seconds):
+        '''
+        Continue the replay from (just before) the given number of
+        seconds into the log. Returns the frame number, or None if the log
+        is still being indexed
+        '''
+        if self.index is None:
+            self.log("Log is still being indexed, cannot seek yet")
+            return None
+
+        target = seconds
+        if self.index.first_timestamp is not None:
+            target = self.index.first_timestamp + seconds
+        checkpoint = self.index.checkpoint_at_time(target)
+        self.frames = (frame for batch in self.reader.batches(checkpoint.offset, checkpoint.state) for frame in batch)
+        self.log("Replay continues at frame " + str(checkpoint.frame_number))
+        return checkpoint.frame_number
+
+
+    def close(self):
+        self.frames = None
+
+
+    def get_message(self):
+        # introduce a fake message delay
+        time.sleep(self.owner.simDelayMs/1000.0)
+
+        try:
+            frame = next(self.frames)
+        except StopIteration:
+            return -1
+
+        self.timestamp = frame.timestamp
+
+        if frame.frame_id not in self.ids_present:
+            self.ids_present[frame.frame_id] = 1
+        else:
+            self.ids_present[frame.frame_id] += 1
+
+        return frame.frame_id, list(frame.data)
+
+
 class CandumpHandler(SourceHandler):
     """Parser for text files generated by candump."""
 
@@ -602,4 +729,4 @@ class CanPrintHandler(SourceHandler):
 
         print(hex_can_id, hex_can_data)
 
-        return hex_can_id, hex_can_data
+        return int(hex_can_id, 16), hex_can_data